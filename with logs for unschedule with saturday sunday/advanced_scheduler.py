@@ -1,29 +1,89 @@
 import json
 import csv
-from datetime import datetime, timedelta
+import io
+import hashlib
 from typing import List, Dict, Set, Tuple, Optional
 import random
 from collections import defaultdict
 from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.cell_range import CellRange
+from openpyxl.worksheet.dimensions import SheetFormatProperties
 import os
 import copy
 import math
+import heapq
+import time
+from concurrent.futures import ProcessPoolExecutor
+from time_grid import (compute_slot_quantum, slot_range, schedule_type, window_boundaries,
+                       parse_patterns, pattern_label, pinned_slot, combined_sections, parse_clock, StartTable, DEFAULT_QUANTUM,
+                       SCHOOL_START, SCHOOL_END, BREAK_START, BREAK_END)
+from export_bundle import ExportBundle
+from schedule_snapshot import ScheduleSnapshot, is_snapshot, write_snapshot
+from excel_styles import (COURSE_COLORS, WEEK_DAYS, HEADER_FILL, CENTER_ALIGN, THIN_BORDER, solid_fill, course_color,
+                          course_fill, time_labels)
+
+# schedule_class places sessions without a day over its original 6:00 AM-9:00 PM range, minus the lunch break
+SCHEDULE_CLASS_WINDOWS = ((6 * 60, BREAK_START), (BREAK_END, 21 * 60))
 
 class AdvancedSchoolScheduler:
-    def __init__(self):
+    def __init__(self, room_mode: str = 'all', precheck: bool = True, day_windows: Optional[Dict] = None,
+                 room_capacity: Optional[Dict] = None, employee_capacity: Optional[Dict] = None,
+                 employee_limits: Optional[Dict] = None, rooms: Optional[list] = None):
         self.rooms = {
             1: {"type": "lab", "capacity": 30, "available": True},
             2: {"type": "lecture", "capacity": 50, "available": True}
         }
+        # Room list (same shape as sample_data.rooms / room.json); its RoomTypes are used by
+        # the time-first engine when a session asks for a room-type pool
+        self.room_list = rooms
+        if rooms is not None:
+            self.rooms = {room['RoomID']: room for room in rooms}
+        # Concurrent sessions a room or employee can host (gyms, large halls, online rooms); default 1.
+        # This is not the seat 'capacity' above. A self.rooms entry may also give 'concurrency'.
+        self.room_capacity = room_capacity or {}
+        self.employee_capacity = employee_capacity or {}
+        # Per-employee teaching limits, e.g. {77: {'available': {'Monday': (('08:00', '12:00'),)},
+        # 'max_daily': 240, 'max_consecutive': 180}}; 'available' lists the only days/windows the
+        # employee can teach, limits are in minutes. Any of the three keys may be left out.
+        self.employee_limits = employee_limits or {}
+        self._availability_masks = {}  # (employee_id, day, quantum) -> bytearray, 1 per available slot
+        self._available_starts = {}    # (employee_id, duration, Type, day) -> starts inside the availability
         self.employees = {}  # Will store employee schedules
         self.sections = {}   # Will store section schedules
         self.room_schedules = {}  # Will store room schedules
         self.schedule = []
         self.conflicts = []
         self.unscheduled_classes = []  # Track classes that could not be scheduled
+        # 'all': every listed roomid is occupied together; 'any': the list is a pool of
+        # alternatives and one room per session is picked by bipartite matching.
+        # A classschedule entry can override this with its own 'roommode' key.
+        self.room_mode = room_mode
+        # Run analyze_infeasibility before every engine and keep provably impossible requests out of the search
+        self.precheck = precheck
+        self.infeasible_requests = []
+        # Log file of the backtracking engine; generate_schedule_parallel gives every component its own
+        self.log_file = 'logs.txt'
+        # Grid resolution in minutes, recomputed per run from the input (see _configure_slot_quantum)
+        self.slot_quantum = DEFAULT_QUANTUM
+        # (kind, key, day) -> bytearray with one counter per slot; kind is 'section', 'employee' or 'room'
+        self._occupancy = {}
+        # Optional per-day teaching windows, {day: {Type: ((start, end), ...)}}; other days use time_grid.TYPE_WINDOWS
+        self.day_windows = day_windows or {}
+        # Unscheduled count -> number of GRASP constructions that ended with it (last generate_schedule_grasp run)
+        self.grasp_distribution = {}
+        # Candidate start times per (duration, Type, day calendar), rebuilt with the slot quantum
+        self.start_table = StartTable(self.slot_quantum, self.day_windows)
+        # Start times for schedule_class, whose sessions have no day (day None)
+        self.schedule_class_table = StartTable(self.slot_quantum, {None: {'regular': SCHEDULE_CLASS_WINDOWS}})
+
+    def _settings(self) -> dict:
+        """Constructor arguments needed to recreate this scheduler in a worker process."""
+        return {'room_mode': self.room_mode, 'precheck': self.precheck, 'day_windows': self.day_windows,
+                'room_capacity': self.room_capacity, 'employee_capacity': self.employee_capacity,
+                'employee_limits': self.employee_limits, 'rooms': self.room_list}
         
     def parse_duration(self, duration_str: str) -> int:
         """Convert duration string (e.g., '1:30') to minutes"""
@@ -38,6 +98,10 @@ class AdvancedSchoolScheduler:
         hours = minutes // 60
         mins = minutes % 60
         return f"{hours:02d}:{mins:02d}"
+
+    def format_duration(self, minutes: int) -> str:
+        """Convert minutes to duration string (e.g., '1:30')"""
+        return f"{minutes // 60}:{minutes % 60:02d}"
     
     def is_time_conflict(self, start1: int, duration1: int, start2: int, duration2: int) -> bool:
         """Check if two time slots conflict"""
@@ -55,6 +119,7 @@ class AdvancedSchoolScheduler:
         roomids = class_info['roomid']
         if not isinstance(roomids, list):
             roomids = [roomids]
+        day = class_info.get('day')
         # Check section conflicts
         if section in self.sections:
             for existing_class in self.sections[section]:
@@ -66,7 +131,7 @@ class AdvancedSchoolScheduler:
                         'conflicting_class': existing_class
                     })
         # Check employee conflicts
-        if employee_id in self.employees:
+        if employee_id in self.employees and not self._pool_has_free_room('employee', employee_id, day, start_time, duration):
             for existing_class in self.employees[employee_id]:
                 if existing_class != class_info and self.is_time_conflict(
                     start_time, duration, existing_class['start_time'], existing_class['duration']):
@@ -77,6 +142,8 @@ class AdvancedSchoolScheduler:
                     })
         # Check room conflicts (by roomid)
         for roomid in roomids:
+            if self._pool_has_free_room('room', roomid, day, start_time, duration):
+                continue
             if roomid in self.room_schedules:
                 for existing_class in self.room_schedules[roomid]:
                     if existing_class != class_info and self.is_time_conflict(
@@ -89,46 +156,18 @@ class AdvancedSchoolScheduler:
         return conflicts
     
     def find_available_slot(self, duration: int, section: str, employee_id: int, roomids) -> tuple:
-        school_start = 6 * 60  # 6:00 AM
-        school_end = 21 * 60   # 9:00 PM
+        """
+        Earliest start from self.schedule_class_table (6:00 AM-9:00 PM without the lunch break,
+        wider than the engines' school day) where the section, employee and every listed room
+        are free. Sessions placed this way have no day, so every day's counters must leave room.
+        """
         if not isinstance(roomids, list):
             roomids = [roomids]
-        for start_time in range(school_start, school_end - duration + 1, 30):
-            end_time = start_time + duration
-            # Skip if overlaps with break
-            if self.is_in_break_time(start_time, duration):
-                continue
-            # Section
-            section_conflict = False
-            if section in self.sections:
-                for existing_class in self.sections[section]:
-                    if self.is_time_conflict(start_time, duration, existing_class['start_time'], existing_class['duration']):
-                        section_conflict = True
-                        break
-            if section_conflict:
-                continue
-            # Employee
-            employee_conflict = False
-            if employee_id in self.employees:
-                for existing_class in self.employees[employee_id]:
-                    if self.is_time_conflict(start_time, duration, existing_class['start_time'], existing_class['duration']):
-                        employee_conflict = True
-                        break
-            if employee_conflict:
-                continue
-            # Room (all rooms in the list must be available)
-            room_conflict = False
-            for roomid in roomids:
-                if roomid in self.room_schedules:
-                    for existing_class in self.room_schedules[roomid]:
-                        if self.is_time_conflict(start_time, duration, existing_class['start_time'], existing_class['duration']):
-                            room_conflict = True
-                            break
-                if room_conflict:
-                    break
-            if room_conflict:
-                continue
-            return start_time, end_time
+        for start_time in self.schedule_class_table.starts(duration):
+            if (self._is_free_every_day('section', section, start_time, duration)
+                    and self._is_free_every_day('employee', employee_id, start_time, duration)
+                    and all(self._is_free_every_day('room', roomid, start_time, duration) for roomid in roomids)):
+                return start_time, start_time + duration
         return None, None
     
     def schedule_class(self, ClassID: int, coursename: str, section: str, duration: int, roomids, employee_id: int) -> dict:
@@ -153,17 +192,7 @@ class AdvancedSchoolScheduler:
         if conflicts:
             self.conflicts.extend(conflicts)
             return None
-        if section not in self.sections:
-            self.sections[section] = []
-        self.sections[section].append(class_info)
-        if employee_id not in self.employees:
-            self.employees[employee_id] = []
-        self.employees[employee_id].append(class_info)
-        for roomid in roomids:
-            if roomid not in self.room_schedules:
-                self.room_schedules[roomid] = []
-            self.room_schedules[roomid].append(class_info)
-        self.schedule.append(class_info)
+        self._register_class(class_info)
         return class_info
     
     def _count_section_classes_per_day(self, section: str) -> dict:
@@ -177,14 +206,17 @@ class AdvancedSchoolScheduler:
         return day_counts
 
     def generate_schedule(self, class_data: list) -> list:
+        class_data = self._prepare_run(class_data)
         self.schedule = []
-        self.sections = {}
-        self.employees = {}
-        self.room_schedules = {}
+        self._rebuild_indexes()
         self.conflicts = []
-        unscheduled_classes = []
+        # Pinned sessions are preloaded, then meeting patterns (MWF/TTh entries) go first, each as one (pattern, start) choice
+        _, failed_patterns = self._place_fixed(self._collect_requests(class_data))
+        unscheduled_classes = list(self.infeasible_requests) + [self._unscheduled_entry(r) for r in failed_patterns]
         # Track used days for each (section, ClassID)
         used_days_per_course = {}
+        for c in self.schedule:
+            used_days_per_course.setdefault((c['section'], c['ClassID']), set()).add(c['day'])
         for class_group in class_data:
             for course in class_group['Courses']:
                 coursename = course.get('coursename', '')
@@ -194,7 +226,7 @@ class AdvancedSchoolScheduler:
                 if key not in used_days_per_course:
                     used_days_per_course[key] = set()
                 for schedule_item in course['classschedule']:
-                    if 'roomid' not in schedule_item or 'employeeid' not in schedule_item:
+                    if 'roomid' not in schedule_item or 'employeeid' not in schedule_item or not self._is_searched(schedule_item):
                         continue
                     days = schedule_item.get('day', ['Monday'])
                     if isinstance(days, str):
@@ -213,7 +245,10 @@ class AdvancedSchoolScheduler:
                             self.parse_duration(schedule_item['duration']),
                             schedule_item['roomid'],
                             schedule_item['employeeid'],
-                            day
+                            day,
+                            room_mode=schedule_item.get('roommode', self.room_mode),
+                            sched_type=schedule_type(schedule_item),
+                            sections=combined_sections(section, schedule_item)
                         )
                         if scheduled:
                             used_days_per_course[key].add(day)
@@ -230,48 +265,34 @@ class AdvancedSchoolScheduler:
                             'day': days
                         })
         self.unscheduled_classes = unscheduled_classes  # Store for later use
+        self.assign_rooms_by_matching()
         return self.schedule
 
-    def schedule_class_with_day(self, ClassID: int, coursename: str, section: str, duration: int, roomids, employee_id: int, day: str) -> dict:
+    def schedule_class_with_day(self, ClassID: int, coursename: str, section: str, duration: int, roomids, employee_id: int, day: str, room_mode: str = 'all', sched_type: str = 'regular', sections: Optional[list] = None) -> dict:
         if not isinstance(roomids, list):
             roomids = [roomids]
-        school_start = 8 * 60  # 8:00 AM
-        school_end = 17 * 60   # 5:00 PM
-        for start_time in range(school_start, school_end - duration + 1, 30):
+        any_room = room_mode == 'any'
+        school_start = self.start_table.windows(sched_type, day)[0][0]  # 8:00 AM for regular classes
+        # Candidate starts are already inside school hours, clear of the break and inside the employee's availability
+        req = {'employee_id': employee_id, 'duration': duration, 'type': sched_type}
+        for start_time in self._candidate_starts(req, day):
             end_time = start_time + duration
-            # Skip if overlaps with break
-            if self.is_in_break_time(start_time, duration):
-                continue
-            # Section
-            section_conflict = False
-            if section in self.sections:
-                for existing_class in self.sections[section]:
-                    if existing_class.get('day') == day and self.is_time_conflict(start_time, duration, existing_class['start_time'], existing_class['duration']):
-                        section_conflict = True
-                        break
-            if section_conflict:
+            # Section (every section of a combined session)
+            if not all(self._is_free('section', s, day, start_time, duration) for s in sections or [section]):
                 continue
             # Employee
-            employee_conflict = False
-            if employee_id in self.employees:
-                for existing_class in self.employees[employee_id]:
-                    if existing_class.get('day') == day and self.is_time_conflict(start_time, duration, existing_class['start_time'], existing_class['duration']):
-                        employee_conflict = True
-                        break
-            if employee_conflict:
+            if not self._is_free('employee', employee_id, day, start_time, duration):
                 continue
-            # Room (all rooms in the list must be available)
-            room_conflict = False
-            for roomid in roomids:
-                if roomid in self.room_schedules:
-                    for existing_class in self.room_schedules[roomid]:
-                        if existing_class.get('day') == day and self.is_time_conflict(start_time, duration, existing_class['start_time'], existing_class['duration']):
-                            room_conflict = True
-                            break
-                if room_conflict:
-                    break
-            if room_conflict:
+            if not self._within_employee_limits(employee_id, day, start_time, duration):
                 continue
+            if any_room:
+                # Any-of pool: one compatible room must remain free for every overlapping session
+                if not self._any_room_available(roomids, day, start_time, duration):
+                    continue
+            else:
+                # Room (all rooms in the list must be available)
+                if any(self._room_busy(roomid, day, start_time, duration) for roomid in roomids):
+                    continue
             class_info = {
                 'ClassID': ClassID,
                 'coursename': coursename,
@@ -279,27 +300,24 @@ class AdvancedSchoolScheduler:
                 'start_time': start_time,
                 'end_time': end_time,
                 'duration': duration,
-                'roomid': roomids,
+                'roomid': [] if any_room else roomids,
                 'employee_id': employee_id,
                 'day': day,
                 'start_time_str': self.format_time(start_time),
                 'end_time_str': self.format_time(end_time)
             }
+            if any_room:
+                class_info['room_mode'] = 'any'
+                class_info['room_options'] = roomids
+            if sched_type != 'regular':
+                class_info['type'] = sched_type
+            if sections and len(sections) > 1:
+                class_info['sections'] = sections
             conflicts = self.detect_conflicts(class_info)
             if conflicts:
                 self.conflicts.extend(conflicts)
                 break
-            if section not in self.sections:
-                self.sections[section] = []
-            self.sections[section].append(class_info)
-            if employee_id not in self.employees:
-                self.employees[employee_id] = []
-            self.employees[employee_id].append(class_info)
-            for roomid in roomids:
-                if roomid not in self.room_schedules:
-                    self.room_schedules[roomid] = []
-                self.room_schedules[roomid].append(class_info)
-            self.schedule.append(class_info)
+            self._register_class(class_info)
             return class_info
         # If not scheduled, force schedule in the first available slot (ignore conflicts)
         start_time = school_start
@@ -311,23 +329,21 @@ class AdvancedSchoolScheduler:
             'start_time': start_time,
             'end_time': end_time,
             'duration': duration,
-            'roomid': roomids,
+            'roomid': roomids[:1] if any_room else roomids,
             'employee_id': employee_id,
             'day': day,
             'start_time_str': self.format_time(start_time),
             'end_time_str': self.format_time(end_time)
         }
-        if section not in self.sections:
-            self.sections[section] = []
-        self.sections[section].append(class_info)
-        if employee_id not in self.employees:
-            self.employees[employee_id] = []
-        self.employees[employee_id].append(class_info)
-        for roomid in roomids:
-            if roomid not in self.room_schedules:
-                self.room_schedules[roomid] = []
-            self.room_schedules[roomid].append(class_info)
-        self.schedule.append(class_info)
+        if any_room:
+            # Forced placements take the first pool room instead of joining the matching
+            class_info['room_mode'] = 'any'
+            class_info['room_options'] = roomids
+        if sched_type != 'regular':
+            class_info['type'] = sched_type
+        if sections and len(sections) > 1:
+            class_info['sections'] = sections
+        self._register_class(class_info)
         return class_info
     
     def print_schedule(self):
@@ -341,10 +357,10 @@ class AdvancedSchoolScheduler:
         # Group by section
         sections = {}
         for class_info in self.schedule:
-            section = class_info['section']
-            if section not in sections:
-                sections[section] = []
-            sections[section].append(class_info)
+            for section in self._sections_of(class_info):
+                if section not in sections:
+                    sections[section] = []
+                sections[section].append(class_info)
         for section in sorted(sections.keys()):
             print(f"\nSection: {section}")
             print("-" * 50)
@@ -369,7 +385,7 @@ class AdvancedSchoolScheduler:
             for class_info in classes:
                 print(f"  {class_info['start_time_str']} - {class_info['end_time_str']} | "
                       f"Course {class_info['ClassID']} | "
-                      f"Section {class_info['section']} | "
+                      f"Section {self._section_label(class_info)} | "
                       f"Employee {class_info['employee_id']}")
         # Print employee schedules
         print(f"\n" + "="*80)
@@ -385,7 +401,7 @@ class AdvancedSchoolScheduler:
                 room_str = ','.join(str(r) for r in roomids)
                 print(f"  {class_info['start_time_str']} - {class_info['end_time_str']} | "
                       f"Course {class_info['ClassID']} | "
-                      f"Section {class_info['section']} | "
+                      f"Section {self._section_label(class_info)} | "
                       f"Rooms {room_str}")
         # Print conflicts if any
         if self.conflicts:
@@ -400,6 +416,37 @@ class AdvancedSchoolScheduler:
         with open(filename, 'w') as f:
             json.dump(self.schedule, f, indent=2)
         print(f"\nSchedule exported to {filename}")
+
+    def export_schedule_snapshot(self, filename: str = "schedule.snap"):
+        """Export schedule as a compact columnar binary snapshot (see schedule_snapshot)."""
+        write_snapshot(filename, self.schedule)
+
+    def load_schedule(self, filename: str = "schedule.json") -> list:
+        """
+        Load a solved schedule written by export_schedule or export_schedule_snapshot,
+        without solving again: sets self.schedule, sizes the slot grid to its times and
+        rebuilds the section, employee and room indexes, so every export works as after a run.
+        """
+        if is_snapshot(filename):
+            with ScheduleSnapshot(filename) as snapshot:
+                schedule = snapshot.classes()
+        else:
+            with open(filename) as f:
+                schedule = json.load(f)
+        if not isinstance(schedule, list):
+            raise ValueError(f"{filename} is not an exported schedule (expected a list of placed classes)")
+        for idx, c in enumerate(schedule):
+            missing = [key for key in ('section', 'start_time', 'duration', 'roomid', 'employee_id') if key not in c]
+            if missing:
+                raise ValueError(f"{filename}: class {idx} has no {', '.join(missing)}; is this class data rather than a solved schedule?")
+            c.setdefault('end_time', c['start_time'] + c['duration'])
+        self.schedule = schedule
+        self.conflicts = []
+        self.unscheduled_classes = []
+        self._set_slot_quantum(compute_slot_quantum([v for c in self.schedule for v in (c['start_time'], c['duration'])]))
+        self._rebuild_indexes()
+        print(f"\nLoaded {len(self.schedule)} scheduled classes from {filename}")
+        return self.schedule
     
     def export_schedule_csv(self, filename: str = "schedule.csv"):
         """Export schedule to CSV file (one row per class)"""
@@ -420,77 +467,25 @@ class AdvancedSchoolScheduler:
         if not self.schedule:
             print("No schedule to export")
             return
-
-        # Get all unique rooms (handling both single roomid and lists)
-        roomids = set()
-        for c in self.schedule:
-            if isinstance(c['roomid'], list):
-                roomids.update(c['roomid'])
-            else:
-                roomids.add(c['roomid'])
-        roomids = sorted(roomids)
-
-        # Get all unique sections
-        sections = sorted(set(c['section'] for c in self.schedule))
-
-        # Get all unique employees
-        employees = sorted(set(c['employee_id'] for c in self.schedule))
-
-        # Create weekly grids
-        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-        hours = ['08:00', '09:00', '10:00', '11:00', '12:00', '13:00', '14:00', '15:00', '16:00', '17:00']
-
+        buckets = self._weekly_buckets()
         # Create separate files for each view
-        self._export_weekly_grid_by_category(filename.replace('.csv', '_by_section.csv'), 'section', sections, roomids, employees, days, hours)
-        self._export_weekly_grid_by_category(filename.replace('.csv', '_by_room.csv'), 'room', roomids, sections, employees, days, hours)
-        self._export_weekly_grid_by_category(filename.replace('.csv', '_by_employee.csv'), 'employee', employees, sections, roomids, days, hours)
+        for kind in ('section', 'room', 'employee'):
+            self._export_weekly_grid_by_category(filename.replace('.csv', f'_by_{kind}.csv'), kind, buckets[kind])
 
-    def _export_weekly_grid_by_category(self, filename, category_type, primary_keys, secondary_keys1, secondary_keys2, days, hours):
+    def _export_weekly_grid_by_category(self, filename, category_type, bucket):
+        """One CSV with a row per (start, day, entity) of category_type, from its _weekly_buckets bucket."""
+        days = self._weekly_days()
+        keys = sorted(bucket, key=str)
         with open(filename, 'w', newline='') as f:
             writer = csv.writer(f)
-            
-            # Write headers
-            headers = ['Time', 'Day', f'{category_type.capitalize()}', 'Classes']
-            writer.writerow(headers)
-            
-            # Write schedule entries
-            for hour in hours:
+            writer.writerow(['Time', 'Day', f'{category_type.capitalize()}', 'Classes'])
+            for start in self._grid_starts():
+                hour = f"{start // 60:02d}:{start % 60:02d}"
                 for day in days:
-                    for key in primary_keys:
-                        cell_content = []
-                        for class_info in self.schedule:
-                            # Handle both string and integer time formats
-                            start_time = class_info.get('start_time', '')
-                            if isinstance(start_time, int):
-                                # Convert minutes since midnight to HH:MM format
-                                hours = start_time // 60
-                                minutes = start_time % 60
-                                start_time = f"{hours:02d}:{minutes:02d}"
-                            
-                            # Skip if required fields are missing
-                            if not all(key in class_info for key in ['roomid', 'employee_id', 'section', 'coursename']):
-                                continue
-                                
-                            class_time = datetime.strptime(start_time, '%H:%M').strftime('%H:%M')
-                            if class_time == hour:
-                                try:
-                                    # Match based on category type
-                                    if category_type == 'section' and class_info['section'] == key:
-                                        roomid_str = ', '.join(str(r) for r in (class_info['roomid'] if isinstance(class_info['roomid'], list) else [class_info['roomid']]))
-                                        cell_content.append(f"{class_info['coursename']} (Room {roomid_str}, Emp {class_info['employee_id']})")
-                                    elif category_type == 'room':
-                                        roomids = class_info['roomid'] if isinstance(class_info['roomid'], list) else [class_info['roomid']]
-                                        if key in roomids:
-                                            cell_content.append(f"{class_info['coursename']} (Sec {class_info['section']}, Emp {class_info['employee_id']})")
-                                    elif category_type == 'employee' and class_info['employee_id'] == key:
-                                        roomid_str = ', '.join(str(r) for r in (class_info['roomid'] if isinstance(class_info['roomid'], list) else [class_info['roomid']]))
-                                        cell_content.append(f"{class_info['coursename']} (Sec {class_info['section']}, Room {roomid_str})")
-                                except (KeyError, TypeError) as e:
-                                    print(f"Warning: Skipping class due to missing or invalid data: {class_info}")
-                                    continue
-                        
-                        writer.writerow([hour, day, key, ' | '.join(cell_content) if cell_content else ''])
-    
+                    for key in keys:
+                        classes = bucket[key].get((day, start), ())
+                        writer.writerow([hour, day, key, ' | '.join(self._weekly_cell_text(category_type, c, short=True) for c in classes)])
+
     def get_schedule_statistics(self) -> Dict:
         """Get statistics about the generated schedule"""
         if not self.schedule:
@@ -531,15 +526,16 @@ class AdvancedSchoolScheduler:
 
     def export_weekly_grid_csv(self, filename: str, filter_type: str, filter_value: str):
         """Export a weekly grid CSV for a section, room, or employee."""
-        # Time slots: 6:00 AM to 9:00 PM (30-min intervals)
+        # Time slots: 6:00 AM to 9:00 PM (one row per slot of the run's grid)
         start_min = 6 * 60
         end_min = 21 * 60
-        time_slots = [start_min + 30 * i for i in range(((end_min - start_min) // 30) + 1)]
-        time_labels = [self.format_time(m) + ' - ' + self.format_time(m + 30) for m in time_slots]
+        quantum = self.slot_quantum
+        time_slots = list(range(start_min, end_min + 1, quantum))
+        time_labels = [self.format_time(m) + ' - ' + self.format_time(m + quantum) for m in time_slots]
         days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
         # Filter classes
         if filter_type == 'section':
-            filtered = [c for c in self.schedule if c['section'] == filter_value]
+            filtered = [c for c in self.schedule if filter_value in self._sections_of(c)]
         elif filter_type == 'room':
             filtered = [c for c in self.schedule if c['roomid'] == filter_value]
         elif filter_type == 'employee':
@@ -552,8 +548,7 @@ class AdvancedSchoolScheduler:
             start = c['start_time']
             end = c['end_time']
             day = c.get('day', '')
-            info = f"{c['coursename']}\n{c['section']}\n{c['roomid']}\nEmp:{c['employee_id']}"
-            n_slots = (end - start) // 30
+            info = f"{c['coursename']}\n{self._section_label(c)}\n{c['roomid']}\nEmp:{c['employee_id']}"
             # Find the slot indices for this class
             slot_indices = [i for i, m in enumerate(time_slots) if start <= m < end]
             for idx, slot_idx in enumerate(slot_indices):
@@ -572,129 +567,116 @@ class AdvancedSchoolScheduler:
                 writer.writerow(row)
         print(f"Exported weekly grid to {filename}")
 
-    def export_all_weekly_grids(self):
-        """Export weekly grid schedules for each section, room, and employee"""
-        # Get all unique sections
-        sections = set(c['section'] for c in self.schedule)
-        
-        # Get all unique rooms (handling both single roomid and lists)
-        rooms = set()
+    def _weekly_buckets(self) -> dict:
+        """
+        Bucket the schedule in one pass for the weekly CSV grids:
+        {'section'|'room'|'employee': {id: {(day, start minute): [classes]}}}.
+        A class is listed on each of its days, in the row of its start time.
+        """
+        buckets = {kind: defaultdict(lambda: defaultdict(list)) for kind in ('section', 'room', 'employee')}
+        for class_info in self.schedule:
+            if not all(key in class_info for key in ['start_time', 'roomid', 'section', 'coursename', 'employee_id']):
+                continue
+            start = class_info['start_time']
+            if not isinstance(start, int):
+                start = self.parse_duration(start)
+            days = class_info.get('day', ['Monday'])
+            for day in ([days] if isinstance(days, str) else days):
+                cell = (day, start)
+                for section in self._sections_of(class_info):
+                    buckets['section'][section][cell].append(class_info)
+                for room in (class_info['roomid'] if isinstance(class_info['roomid'], list) else [class_info['roomid']]):
+                    buckets['room'][room][cell].append(class_info)
+                buckets['employee'][class_info['employee_id']][cell].append(class_info)
+        return buckets
+
+    def _weekly_days(self) -> list:
+        """Day rows of the weekly CSV grids: Monday to Friday, plus the weekend days that have classes."""
+        used = set()
         for c in self.schedule:
-            if isinstance(c['roomid'], list):
-                rooms.update(c['roomid'])
-            else:
-                rooms.add(c['roomid'])
-        
-        # Get all unique employees
-        employees = set(c['employee_id'] for c in self.schedule)
-
-        # Export section schedules
-        for section in sections:
-            filename = f"section_{section}_weekly.csv"
-            self.export_weekly_grid_by_section(section, filename)
-            print(f"Exported weekly grid to {filename}")
-
-        # Export room schedules
-        for room in rooms:
-            filename = f"room_{room}_weekly.csv"
-            self.export_weekly_grid_by_room(room, filename)
-            print(f"Exported weekly grid to {filename}")
-
-        # Export employee schedules
-        for employee in employees:
-            filename = f"employee_{employee}_weekly.csv"
-            self.export_weekly_grid_by_employee(employee, filename)
-            print(f"Exported weekly grid to {filename}")
+            days = c.get('day', [])
+            used.update([days] if isinstance(days, str) else days)
+        return [day for day in WEEK_DAYS if day in used or day not in ('Saturday', 'Sunday')]
 
-    def export_weekly_grid_by_room(self, room_id, filename):
-        """Export weekly grid schedule for a specific room"""
-        # Create weekly grid with 1-hour slots
-        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-        hours = ['08:00', '09:00', '10:00', '11:00', '12:00', '13:00', '14:00', '15:00', '16:00', '17:00']
+    def _weekly_cell_text(self, kind, class_info, short=False) -> str:
+        """Text of a class in an entity's weekly CSV; it names the section, room and employee it is not filed under."""
+        section_word, employee_word = ('Sec', 'Emp') if short else ('Section', 'Employee')
+        roomid_str = ', '.join(str(r) for r in (class_info['roomid'] if isinstance(class_info['roomid'], list) else [class_info['roomid']]))
+        if kind == 'section':
+            detail = f"Room {roomid_str}, {employee_word} {class_info['employee_id']}"
+        elif kind == 'room':
+            detail = f"{section_word} {self._section_label(class_info)}, {employee_word} {class_info['employee_id']}"
+        else:
+            detail = f"{section_word} {self._section_label(class_info)}, Room {roomid_str}"
+        return f"{class_info['coursename']} ({detail})"
+
+    def _weekly_grid_rows(self, kind, cells, days=None, starts=None):
+        """Rows of one entity's weekly CSV (header, then a row per start and day) from its {(day, start): [classes]} cells."""
+        days = days or self._weekly_days()
+        starts = starts or self._grid_starts()
+        yield ['Time', 'Day', 'Classes']
+        for start in starts:
+            hour = f"{start // 60:02d}:{start % 60:02d}"
+            for day in days:
+                classes = cells.get((day, start), ())
+                yield [hour, day, ' | '.join(self._weekly_cell_text(kind, c) for c in classes)]
 
+    def _write_weekly_grid(self, filename, kind, cells, days=None, starts=None):
+        """Write one entity's weekly CSV file."""
         with open(filename, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Time', 'Day', 'Classes'])
-            
-            for hour in hours:
-                for day in days:
-                    classes = []
-                    for class_info in self.schedule:
-                        start_time = class_info.get('start_time', '')
-                        if isinstance(start_time, int):
-                            # Convert minutes since midnight to HH:MM format
-                            hours_val = start_time // 60
-                            minutes = start_time % 60
-                            start_time = f"{hours_val:02d}:{minutes:02d}"
-                        
-                        if not all(key in class_info for key in ['roomid', 'section', 'coursename', 'employee_id']):
-                            continue
-                            
-                        class_time = datetime.strptime(start_time, '%H:%M').strftime('%H:%M')
-                        if class_time == hour:
-                            roomids = class_info['roomid'] if isinstance(class_info['roomid'], list) else [class_info['roomid']]
-                            if room_id in roomids:
-                                classes.append(f"{class_info['coursename']} (Section {class_info['section']}, Employee {class_info['employee_id']})")
-                    
-                    writer.writerow([hour, day, ' | '.join(classes) if classes else ''])
+            csv.writer(f).writerows(self._weekly_grid_rows(kind, cells, days, starts))
+
+    def export_all_weekly_grids(self, bundle: Optional[str] = None, incremental: bool = False):
+        """
+        Export weekly grid schedules for each section, room, and employee. The schedule is
+        bucketed once, so the export is linear in the classes plus the rows written.
+        With bundle (a .zip filename) the CSVs go into that one archive with a manifest.
+        With incremental, files whose content hash matches the previous run's manifest
+        (WEEKLY_MANIFEST) are left as they are. Files the manifest lists for entities that
+        are no longer in the schedule are deleted.
+        """
+        buckets = self._weekly_buckets()
+        days, starts = self._weekly_days(), self._grid_starts()
+        archive = ExportBundle(bundle) if bundle else None
+        last_run = _load_export_manifest(WEEKLY_MANIFEST) if not archive else {}
+        previous = last_run if incremental else {}
+        manifest = {}
+        written = skipped = 0
+        for kind in ('section', 'room', 'employee'):
+            for key, cells in buckets[kind].items():
+                filename = f"{kind}_{key}_weekly.csv"
+                manifest[filename] = digest = _content_hash(
+                    kind, days, [starts.start, starts.stop, starts.step],
+                    sorted((day, start, [self._weekly_cell_text(kind, c) for c in classes])
+                           for (day, start), classes in cells.items()))
+                if previous.get(filename) == digest and os.path.exists(filename):
+                    skipped += 1
+                    continue
+                if archive:
+                    archive.add_csv(filename, self._weekly_grid_rows(kind, cells, days, starts), kind, key,
+                                    sum(len(classes) for classes in cells.values()))
+                else:
+                    self._write_weekly_grid(filename, kind, cells, days, starts)
+                written += 1
+                print(f"Exported weekly grid to {filename}")
+        if archive:
+            archive.close()
+        else:
+            _prune_stale_exports(last_run, manifest, '.')
+            _save_export_manifest(WEEKLY_MANIFEST, manifest)
+        print(f"Weekly grids: {written} written, {skipped} unchanged and skipped")
+
+    def export_weekly_grid_by_room(self, room_id, filename):
+        """Export weekly grid schedule for a specific room"""
+        self._write_weekly_grid(filename, 'room', self._weekly_buckets()['room'].get(room_id, {}))
 
     def export_weekly_grid_by_section(self, section_id, filename):
         """Export weekly grid schedule for a specific section"""
-        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-        hours = ['08:00', '09:00', '10:00', '11:00', '12:00', '13:00', '14:00', '15:00', '16:00', '17:00']
-
-        with open(filename, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Time', 'Day', 'Classes'])
-            
-            for hour in hours:
-                for day in days:
-                    classes = []
-                    for class_info in self.schedule:
-                        start_time = class_info.get('start_time', '')
-                        if isinstance(start_time, int):
-                            hours_val = start_time // 60
-                            minutes = start_time % 60
-                            start_time = f"{hours_val:02d}:{minutes:02d}"
-                        
-                        if not all(key in class_info for key in ['roomid', 'section', 'coursename', 'employee_id']):
-                            continue
-                            
-                        class_time = datetime.strptime(start_time, '%H:%M').strftime('%H:%M')
-                        if class_time == hour and class_info['section'] == section_id:
-                            roomid_str = ', '.join(str(r) for r in (class_info['roomid'] if isinstance(class_info['roomid'], list) else [class_info['roomid']]))
-                            classes.append(f"{class_info['coursename']} (Room {roomid_str}, Employee {class_info['employee_id']})")
-                    
-                    writer.writerow([hour, day, ' | '.join(classes) if classes else ''])
+        self._write_weekly_grid(filename, 'section', self._weekly_buckets()['section'].get(section_id, {}))
 
     def export_weekly_grid_by_employee(self, employee_id, filename):
         """Export weekly grid schedule for a specific employee"""
-        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-        hours = ['08:00', '09:00', '10:00', '11:00', '12:00', '13:00', '14:00', '15:00', '16:00', '17:00']
-
-        with open(filename, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Time', 'Day', 'Classes'])
-            
-            for hour in hours:
-                for day in days:
-                    classes = []
-                    for class_info in self.schedule:
-                        start_time = class_info.get('start_time', '')
-                        if isinstance(start_time, int):
-                            hours_val = start_time // 60
-                            minutes = start_time % 60
-                            start_time = f"{hours_val:02d}:{minutes:02d}"
-                        
-                        if not all(key in class_info for key in ['roomid', 'section', 'coursename', 'employee_id']):
-                            continue
-                            
-                        class_time = datetime.strptime(start_time, '%H:%M').strftime('%H:%M')
-                        if class_time == hour and class_info['employee_id'] == employee_id:
-                            roomid_str = ', '.join(str(r) for r in (class_info['roomid'] if isinstance(class_info['roomid'], list) else [class_info['roomid']]))
-                            classes.append(f"{class_info['coursename']} (Section {class_info['section']}, Room {roomid_str})")
-                    
-                    writer.writerow([hour, day, ' | '.join(classes) if classes else ''])
+        self._write_weekly_grid(filename, 'employee', self._weekly_buckets()['employee'].get(employee_id, {}))
 
     def _get_day_column(self, class_info):
         """Helper method to determine the day column for a class"""
@@ -723,168 +705,147 @@ class AdvancedSchoolScheduler:
                 return 60  # Default to 1 hour if format is invalid
         return 60  # Default to 1 hour for any other case
 
-    def export_schedule_excel(self, filename, filter_func=None):
-        from openpyxl import Workbook
-        from openpyxl.styles import PatternFill, Alignment, Border, Side
-        from openpyxl.utils import get_column_letter
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Schedule"
-        header_fill = PatternFill(start_color='E0E0E0', end_color='E0E0E0', fill_type='solid')
-        center_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        colors = {
-            'GE Entrep': PatternFill(start_color='92D050', end_color='92D050', fill_type='solid'),
-            'GE USELF': PatternFill(start_color='FF69B4', end_color='FF69B4', fill_type='solid'),
-            'GE ArtApp': PatternFill(start_color='00B0F0', end_color='00B0F0', fill_type='solid'),
-            'GE LITE': PatternFill(start_color='FFA500', end_color='FFA500', fill_type='solid'),
-            'NSTP': PatternFill(start_color='FFFF00', end_color='FFFF00', fill_type='solid'),
-            'PE': PatternFill(start_color='FFFF00', end_color='FFFF00', fill_type='solid')
+    def _grid_bounds(self) -> tuple:
+        """(start, end) minutes of the export grid: the school day, widened to cover every placed class."""
+        quantum = self.slot_quantum
+        start = min([SCHOOL_START] + [c['start_time'] for c in self.schedule if isinstance(c.get('start_time'), int)])
+        end = max([SCHOOL_END] + [c['start_time'] + c['duration'] for c in self.schedule if isinstance(c.get('start_time'), int)])
+        return start // quantum * quantum, -(-end // quantum) * quantum
+
+    def _grid_starts(self) -> range:
+        """Start minute of each row of the weekly grid CSVs, one per slot of the run's grid."""
+        grid_start, grid_end = self._grid_bounds()
+        return range(grid_start, grid_end, self.slot_quantum)
+
+    def _excel_layout(self) -> dict:
+        """Grid skeleton shared by every Excel export of this schedule: slot size, first row time and row labels."""
+        quantum = self.slot_quantum
+        grid_start, grid_end = self._grid_bounds()
+        return {
+            'quantum': quantum,
+            'first_slot': grid_start // quantum,
+            'time_labels': time_labels(grid_start, grid_end, quantum),
         }
-        days = ['Time', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        day_to_col = {day: idx+2 for idx, day in enumerate(days[1:])}
-        for col, day in enumerate(days, 1):
-            cell = ws.cell(row=1, column=col)
-            cell.value = day
-            cell.fill = header_fill
-            cell.alignment = center_align
-            cell.border = thin_border
-        time_slots = []
-        time_to_row = {}
-        current_row = 2
-        # Modified to use 1.5-hour blocks starting at 8:00 AM
-        for hour in range(8, 17, 1):  # 8:00 AM to 5:00 PM
-            for minute in [0]:  # Only start at XX:00
-                time_str = f"{hour:02d}:{minute:02d}"
-                time_to_row[time_str] = current_row
-                next_minute = minute + 90  # 1.5-hour blocks
-                next_hour = hour
-                while next_minute >= 60:
-                    next_minute -= 60
-                    next_hour += 1
-                if hour < 12:
-                    current_time = f"{hour}:{minute:02d} AM"
-                elif hour == 12:
-                    current_time = f"12:{minute:02d} PM"
-                else:
-                    current_time = f"{hour-12}:{minute:02d} PM"
-                if next_hour < 12:
-                    next_time = f"{next_hour}:{next_minute:02d} AM"
-                elif next_hour == 12:
-                    next_time = f"12:{next_minute:02d} PM"
-                else:
-                    next_time = f"{next_hour-12}:{next_minute:02d} PM"
-                time_slots.append(f"{current_time} - {next_time}")
-                current_row += 1
-        for idx, time_slot in enumerate(time_slots):
-            cell = ws.cell(row=idx+2, column=1)
-            cell.value = time_slot
-            cell.alignment = center_align
-            cell.border = thin_border
-        merged_tracker = set()
-        for class_info in self.schedule:
-            if filter_func and not filter_func(class_info):
-                continue
+
+    def _excel_entries(self, classes) -> list:
+        """
+        Compact (start_time, duration, days, cell text, coursename) tuples for the
+        classes an Excel sheet shows; classes missing a required field are skipped.
+        """
+        entries = []
+        for class_info in classes:
             if not all(key in class_info for key in ['start_time', 'coursename', 'section', 'employee_id', 'roomid']):
                 continue
             start_time = class_info['start_time']
-            if isinstance(start_time, int):
-                hours = start_time // 60
-                minutes = start_time % 60
-                start_time = f"{hours:02d}:{minutes:02d}"
-            start_row = time_to_row.get(start_time)
-            if not start_row:
-                continue
+            if not isinstance(start_time, int):
+                start_time = self.parse_duration(start_time)
             duration = self._calculate_duration_minutes(class_info.get('duration', '1:00'))
-            num_slots = max(1, duration // 30)
-            end_row = start_row + num_slots - 1
             days_list = class_info.get('day', ['Monday'])
             if isinstance(days_list, str):
                 days_list = [days_list]
-            for day in days_list:
-                col = day_to_col.get(day, 2)
-                roomid_str = ', '.join(str(r) for r in (class_info['roomid'] if isinstance(class_info['roomid'], list) else [class_info['roomid']]))
-                class_text = (
-                    f"{class_info['coursename']}\n"
-                    f"{class_info['section']}\n"
-                    f"{class_info.get('instructor_name', '')}\n"
-                    f"Room {roomid_str}"
-                )
-                color_fill = None
-                for course_type, fill in colors.items():
-                    if course_type in class_info['coursename']:
-                        color_fill = fill
-                        break
-                # Check if all cells in the intended merge range are empty and not already merged
-                can_merge = True
-                for row in range(start_row, end_row + 1):
-                    cell = ws.cell(row=row, column=col)
-                    cell_key = (row, col)
-                    if cell.value not in (None, "") or cell_key in merged_tracker:
-                        can_merge = False
-                        break
-                if can_merge:
-                    # Mark all cells as merged
-                    for row in range(start_row, end_row + 1):
-                        merged_tracker.add((row, col))
-                    print(f"Merging: {class_info['coursename']} | Section: {class_info['section']} | Room: {roomid_str} | Day: {day} | Rows: {start_row}-{end_row} | Col: {col}")
-                    ws.merge_cells(start_row=start_row, start_column=col, end_row=end_row, end_column=col)
-                    cell = ws.cell(row=start_row, column=col)
-                    cell.value = class_text
-                    if color_fill:
-                        cell.fill = color_fill
-                    cell.alignment = center_align
-                    cell.border = thin_border
-                    # Fill merged cells with style only (no value)
-                    for row in range(start_row + 1, end_row + 1):
-                        cell = ws.cell(row=row, column=col)
-                        if color_fill:
-                            cell.fill = color_fill
-                        cell.alignment = center_align
-                        cell.border = thin_border
-        for col in range(1, len(days) + 1):
-            ws.column_dimensions[get_column_letter(col)].width = 25
-        for row in range(1, len(time_slots) + 2):
-            ws.row_dimensions[row].height = 50
-        wb.save(filename)
-        print(f"\nSchedule exported to Excel file: {filename}")
+            roomid_str = ', '.join(str(r) for r in (class_info['roomid'] if isinstance(class_info['roomid'], list) else [class_info['roomid']]))
+            class_text = (
+                f"{class_info['coursename']}\n"
+                f"{self._section_label(class_info)}\n"
+                f"{class_info.get('instructor_name', '')}\n"
+                f"Room {roomid_str}"
+            )
+            entries.append((start_time, duration, days_list, class_text, class_info['coursename']))
+        return entries
+
+    def _entity_buckets(self) -> dict:
+        """Group the schedule by section, room and employee in one pass: {'section': {id: [classes]}, ...}."""
+        buckets = {'section': defaultdict(list), 'room': defaultdict(list), 'employee': defaultdict(list)}
+        for c in self.schedule:
+            if 'section' in c:
+                for section in self._sections_of(c):
+                    buckets['section'][section].append(c)
+            if 'roomid' in c:
+                for room in (c['roomid'] if isinstance(c['roomid'], list) else [c['roomid']]):
+                    buckets['room'][room].append(c)
+            if 'employee_id' in c:
+                buckets['employee'][c['employee_id']].append(c)
+        return buckets
 
-    def export_all_excel_schedules(self):
-        """Export separate Excel schedules for sections, rooms, and employees into a subfolder."""
+    def export_schedule_excel(self, filename, filter_func=None):
+        classes = [c for c in self.schedule if not filter_func or filter_func(c)]
+        _render_schedule_workbook(filename, self._excel_entries(classes), self._excel_layout())
+
+    def export_all_excel_schedules(self, max_workers: Optional[int] = 1, bundle: Optional[str] = None,
+                                   incremental: bool = False):
+        """
+        Export separate Excel schedules for sections, rooms, and employees into a subfolder.
+        The schedule is bucketed once and the grid layout built once for all files. With
+        max_workers other than 1 the workbooks are rendered and saved in a process pool
+        (None = one worker per CPU); each worker only receives its entity's compact entries.
+        With bundle (a .zip filename) the workbooks are rendered in memory and written into
+        that one archive with a manifest instead of as loose files.
+        Each entity's entries are hashed and the hashes kept in EXCEL_MANIFEST inside the
+        folder; with incremental, workbooks whose hash matches the previous run are skipped.
+        Workbooks of entities no longer in the schedule are deleted with their manifest entry.
+        """
         output_dir = 'excel_schedules'
-        if not os.path.exists(output_dir):
+        if not bundle and not os.path.exists(output_dir):
             os.makedirs(output_dir)
-        # Get all unique sections
-        sections = set(c['section'] for c in self.schedule if 'section' in c)
-        # Get all unique rooms
-        rooms = set()
-        for c in self.schedule:
-            if 'roomid' not in c:
-                continue
-            if isinstance(c['roomid'], list):
-                rooms.update(c['roomid'])
-            else:
-                rooms.add(c['roomid'])
-        # Get all unique employees
-        employees = set(c['employee_id'] for c in self.schedule if 'employee_id' in c)
-        # Export schedules
-        for section in sections:
-            filename = os.path.join(output_dir, f"section_{section}_schedule.xlsx")
-            self.export_schedule_excel(filename, filter_func=lambda c, s=section: c.get('section') == s)
-            print(f"Exported Excel schedule for section {section}")
-        for room in rooms:
-            filename = os.path.join(output_dir, f"room_{room}_schedule.xlsx")
-            self.export_schedule_excel(filename, filter_func=lambda c, r=room: (r in c['roomid']) if isinstance(c['roomid'], list) else c['roomid'] == r)
-            print(f"Exported Excel schedule for room {room}")
-        for employee in employees:
-            filename = os.path.join(output_dir, f"employee_{employee}_schedule.xlsx")
-            self.export_schedule_excel(filename, filter_func=lambda c, e=employee: c.get('employee_id') == e)
-            print(f"Exported Excel schedule for employee {employee}")
+        layout = self._excel_layout()
+        manifest_path = os.path.join(output_dir, EXCEL_MANIFEST)
+        last_run = _load_export_manifest(manifest_path) if not bundle else {}
+        previous = last_run if incremental else {}
+        manifest = {}
+        jobs = []
+        entities = []
+        skipped = 0
+        for kind, bucket in self._entity_buckets().items():
+            for key, classes in bucket.items():
+                name = f"{kind}_{key}_schedule.xlsx"
+                filename = f"{output_dir}/{name}" if bundle else os.path.join(output_dir, name)
+                entries = self._excel_entries(classes)
+                manifest[name] = digest = _content_hash(entries, layout)
+                if previous.get(name) == digest and os.path.exists(filename):
+                    skipped += 1
+                    continue
+                jobs.append((filename, entries, layout, bool(bundle)))
+                entities.append((kind, key, len(entries)))
+        started = time.perf_counter()
+        if max_workers == 1 or len(jobs) <= 1:
+            results = [_export_workbook(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(_export_workbook, jobs))
+        for filename, seconds, data in results:
+            print(f"Exported {filename} in {seconds:.2f}s")
+        if bundle:
+            with ExportBundle(bundle) as archive:
+                for (filename, seconds, data), (kind, key, count) in zip(results, entities):
+                    archive.add(filename, data, kind, key, count)
+        else:
+            _prune_stale_exports(last_run, manifest, output_dir)
+            _save_export_manifest(manifest_path, manifest)
+        print(f"Exported {len(jobs)} Excel schedules ({skipped} unchanged and skipped) "
+              f"in {time.perf_counter() - started:.2f}s")
+
+    def export_consolidated_excel(self, filename: str = "all_schedules.xlsx"):
+        """
+        Export every section, room and employee timetable as one sheet of a single workbook.
+        The workbook is written in openpyxl's write-only mode with shared named styles, so
+        each sheet is streamed to disk row by row and memory stays flat however many sheets.
+        """
+        layout = self._excel_layout()
+        wb = Workbook(write_only=True)
+        _add_schedule_styles(wb)
+        titles = set()
+        for kind, bucket in self._entity_buckets().items():
+            for key, classes in bucket.items():
+                # Sheet titles are at most 31 characters and may not contain []:*?/\
+                title = ''.join('-' if ch in '[]:*?/\\' else ch for ch in f"{kind} {key}")[:31]
+                base, n = title, 1
+                while title.lower() in titles:
+                    n += 1
+                    title = f"{base[:31 - len(str(n)) - 1]}~{n}"
+                titles.add(title.lower())
+                _stream_schedule_sheet(wb, title, self._excel_entries(classes), layout)
+        wb.save(filename)
+        print(f"\nConsolidated schedule ({len(titles)} sheets) exported to Excel file: {filename}")
 
     def print_unscheduled_classes(self):
         """Print the list of classes that could not be scheduled."""
@@ -926,14 +887,7 @@ class AdvancedSchoolScheduler:
                 f.write(f"Scheduled: {s.get('coursename', '')} | Section {s.get('section', '')} | Room {s.get('roomid', '')} | Emp {s.get('employee_id', '')} | Day {s.get('day', '')} | Duration {s.get('duration', '')}\n")
             f.write("\nREQUESTED VS ACTUAL:\n")
             # Flatten all courses if needed
-            all_courses = []
-            if isinstance(class_data, list):
-                for entry in class_data:
-                    all_courses.extend(entry['Courses'])
-            elif isinstance(class_data, dict) and 'Courses' in class_data:
-                all_courses = class_data['Courses']
-            else:
-                all_courses = class_data
+            all_courses = list(self._iter_courses(class_data))
             for course in all_courses:
                 for sched in course['classschedule']:
                     sched_day = sched.get('day', '')
@@ -962,16 +916,14 @@ class AdvancedSchoolScheduler:
                             sched['roomid'],
                             sched['employeeid'],
                             sched_day_val,
-                            sched_duration
+                            sched_duration,
+                            schedule_type(sched)
                         )
                         f.write(f"REQUESTED: {course.get('coursename', '')} | Section {course['section']} | Room {sched['roomid']} | Emp {sched['employeeid']} | Day {sched.get('day', '')} | Duration {sched['duration']}\n")
                         f.write(f"  -> UNSCHEDULED | REASON: {reason}\n")
 
-    def _diagnose_unscheduled(self, coursename, section, roomid, employee_id, day, duration):
+    def _diagnose_unscheduled(self, coursename, section, roomid, employee_id, day, duration, sched_type='regular'):
         # Try all possible days and time slots, accumulate all reasons
-        school_start = 8 * 60
-        school_end = 17 * 60
-        slot_step = 30
         if isinstance(roomid, list):
             roomids = roomid
         else:
@@ -980,11 +932,10 @@ class AdvancedSchoolScheduler:
         reasons = set()
         slot_found = False
         for d in days:
-            for start_time in range(school_start, school_end - duration + 1, slot_step):
-                # Check break
-                if self.is_in_break_time(start_time, duration):
-                    reasons.add(f"Break time overlap at {self.format_time(start_time)} on {d}")
-                    continue
+            starts = self.start_table.starts(duration, sched_type, d)
+            if not starts:
+                reasons.add(f"No {sched_type} time window on {d} fits {self.format_duration(duration)}")
+            for start_time in starts:
                 # Section conflict
                 section_conflict = False
                 for c in self.sections.get(section, []):
@@ -1024,13 +975,12 @@ class AdvancedSchoolScheduler:
         return "No available slot (all times conflict with break or out of hours)"
 
     def generate_schedule_backtracking(self, class_data: list) -> bool:
+        class_data = self._prepare_run(class_data)
         # Clear the log file before starting
-        with open('logs.txt', 'w') as f:
+        with open(self.log_file, 'w') as f:
             f.write("=== Scheduling Log ===\n\n")
         self.schedule = []
-        self.sections = {}
-        self.employees = {}
-        self.room_schedules = {}
+        self._rebuild_indexes()
         self.conflicts = []
         self.unscheduled_classes = []
 
@@ -1040,19 +990,19 @@ class AdvancedSchoolScheduler:
             if conflicting_class:
                 conflict_msg += f"  Conflicts with: {conflicting_class['coursename']} | Section {conflicting_class['section']} | Room {conflicting_class['roomid']} | Emp {conflicting_class['employee_id']} | Time {conflicting_class['start_time_str']}-{conflicting_class['end_time_str']}\n"
             print(conflict_msg)  # For debugging
-            with open('logs.txt', 'a') as f:
+            with open(self.log_file, 'a') as f:
                 f.write(conflict_msg)
 
         def log_assignment(req, day, start_time, action):
             msg = f"{action}: {req['coursename']} | Section {req['section']} | Room {req['roomid']} | Emp {req['employee_id']} | Day {day} | Time {self.format_time(start_time)}-{self.format_time(start_time + req['duration'])}\n"
             print(msg)  # For debugging
-            with open('logs.txt', 'a') as f:
+            with open(self.log_file, 'a') as f:
                 f.write(msg)
 
         def log_unscheduled(req, reason):
             msg = f"UNSCHEDULED: {req['coursename']} | Section {req['section']} | Room {req['roomid']} | Emp {req['employee_id']} | Day {req['days']} | Duration {self.format_duration(req['duration'])}\n  Reason: {reason}\n"
             print(msg)  # For debugging
-            with open('logs.txt', 'a') as f:
+            with open(self.log_file, 'a') as f:
                 f.write(msg)
 
         requests = []
@@ -1073,24 +1023,25 @@ class AdvancedSchoolScheduler:
                         'roomid': sched['roomid'],
                         'employee_id': sched['employeeid'],
                         'days': days,
+                        'room_mode': sched.get('roommode', self.room_mode),
+                        'type': schedule_type(sched),
+                        'sections': combined_sections(section, sched),
                         'orig_sched': sched
                     })
 
+        # Pinned sessions and meeting patterns are placed first and stay fixed during the search
+        requests = [req for req in requests if self._is_searched(req['orig_sched'])]
+        _, failed_patterns = self._place_fixed(self._collect_requests(class_data))
+        pattern_unscheduled = [self._unscheduled_entry(r) for r in failed_patterns]
+        used_days_per_course = {}
+        for c in self.schedule:
+            used_days_per_course.setdefault((c['section'], c['ClassID']), set()).add(c['day'])
+
         # Sort by duration AND number of available slots (most constrained first)
         def get_slot_count(req):
-            count = 0
-            for day in req['days']:
-                for start_time in range(school_start, school_end - req['duration'] + 1, slot_step):
-                    if not self.is_in_break_time(start_time, req['duration']):
-                        count += 1
-            return count
+            return sum(len(self._candidate_starts(req, day)) for day in req['days'])
         requests.sort(key=lambda x: (-x['duration'], get_slot_count(x)))
 
-        school_start = 8 * 60  # 8:00 AM
-        school_end = 17 * 60   # 5:00 PM
-        slot_step = 90  # 1.5-hour blocks
-        used_days_per_course = {}
-
         def get_slot_score(start_time, duration, day, section):
             """Score a potential slot based on how well it fills gaps"""
             score = 0
@@ -1129,7 +1080,7 @@ class AdvancedSchoolScheduler:
             best_score = float('-inf')
             best_time = None
             
-            for start_time in range(school_start, school_end - req['duration'] + 1, slot_step):
+            for start_time in self._candidate_starts(req, day):
                 if can_assign(req, day, start_time):
                     score = get_slot_score(start_time, req['duration'], day, req['section'])
                     if score > best_score:
@@ -1139,27 +1090,33 @@ class AdvancedSchoolScheduler:
             return best_time
 
         def can_assign(req, day, start_time):
-            if self.is_in_break_time(start_time, req['duration']):
-                log_conflict(req, day, start_time, "Break time conflict")
-                return False
             key = (req['section'], req['ClassID'])
             if key in used_days_per_course and day in used_days_per_course[key]:
                 log_conflict(req, day, start_time, "Same course/section already scheduled on this day")
                 return False
-            for c in self.sections.get(req['section'], []):
-                if c['day'] == day and self.is_time_conflict(start_time, req['duration'], c['start_time'], c['duration']):
+            for section in req['sections']:
+                if not self._is_free('section', section, day, start_time, req['duration']):
+                    c = self._find_overlap(self.sections.get(section, []), day, start_time, req['duration'])
                     log_conflict(req, day, start_time, "Section time conflict", c)
                     return False
-            for c in self.employees.get(req['employee_id'], []):
-                if c['day'] == day and self.is_time_conflict(start_time, req['duration'], c['start_time'], c['duration']):
-                    log_conflict(req, day, start_time, "Employee time conflict", c)
-                    return False
+            if not self._is_free('employee', req['employee_id'], day, start_time, req['duration']):
+                c = self._find_overlap(self.employees.get(req['employee_id'], []), day, start_time, req['duration'])
+                log_conflict(req, day, start_time, "Employee time conflict", c)
+                return False
+            if not self._within_employee_limits(req['employee_id'], day, start_time, req['duration']):
+                log_conflict(req, day, start_time, "Employee daily or consecutive teaching limit")
+                return False
             roomids = req['roomid'] if isinstance(req['roomid'], list) else [req['roomid']]
+            if req['room_mode'] == 'any':
+                if not self._any_room_available(roomids, day, start_time, req['duration']):
+                    log_conflict(req, day, start_time, f"No free room in pool {roomids}")
+                    return False
+                return True
             for roomid in roomids:
-                for c in self.room_schedules.get(roomid, []):
-                    if c['day'] == day and self.is_time_conflict(start_time, req['duration'], c['start_time'], c['duration']):
-                        log_conflict(req, day, start_time, f"Room {roomid} time conflict", c)
-                        return False
+                if self._room_busy(roomid, day, start_time, req['duration']):
+                    c = self._find_overlap(self.room_schedules.get(roomid, []), day, start_time, req['duration'])
+                    log_conflict(req, day, start_time, f"Room {roomid} time conflict", c)
+                    return False
             return True
 
         def backtrack(idx, visited=None):
@@ -1195,26 +1152,8 @@ class AdvancedSchoolScheduler:
             return False
 
         def assign(req, day, start_time):
-            end_time = start_time + req['duration']
-            class_info = {
-                'ClassID': req['ClassID'],
-                'coursename': req['coursename'],
-                'section': req['section'],
-                'start_time': start_time,
-                'end_time': end_time,
-                'duration': req['duration'],
-                'roomid': req['roomid'],
-                'employee_id': req['employee_id'],
-                'day': day,
-                'start_time_str': self.format_time(start_time),
-                'end_time_str': self.format_time(end_time)
-            }
-            self.schedule.append(class_info)
-            self.sections.setdefault(req['section'], []).append(class_info)
-            self.employees.setdefault(req['employee_id'], []).append(class_info)
-            roomids = req['roomid'] if isinstance(req['roomid'], list) else [req['roomid']]
-            for roomid in roomids:
-                self.room_schedules.setdefault(roomid, []).append(class_info)
+            class_info = self._new_class_info(req, day, start_time)
+            self._register_class(class_info)
             key = (req['section'], req['ClassID'])
             if key not in used_days_per_course:
                 used_days_per_course[key] = set()
@@ -1222,19 +1161,16 @@ class AdvancedSchoolScheduler:
             return class_info
 
         def unassign(req, class_info):
-            self.schedule.remove(class_info)
-            self.sections[req['section']].remove(class_info)
-            self.employees[req['employee_id']].remove(class_info)
-            roomids = req['roomid'] if isinstance(req['roomid'], list) else [req['roomid']]
-            for roomid in roomids:
-                self.room_schedules[roomid].remove(class_info)
+            self._unregister_class(class_info)
             key = (req['section'], req['ClassID'])
             if key in used_days_per_course and class_info['day'] in used_days_per_course[key]:
                 used_days_per_course[key].remove(class_info['day'])
 
         success = backtrack(0)
+        if self.assign_rooms_by_matching() or pattern_unscheduled:
+            success = False
         if not success:
-            self.unscheduled_classes = [
+            self.unscheduled_classes = list(self.infeasible_requests) + pattern_unscheduled + [
                 {
                     'ClassID': req['ClassID'],
                     'coursename': req['coursename'],
@@ -1245,9 +1181,11 @@ class AdvancedSchoolScheduler:
                     'day': req['days']
                 }
                 for req in requests if not any(
-                    c['ClassID'] == req['ClassID'] and c['section'] == req['section'] and c['duration'] == req['duration'] and c['roomid'] == req['roomid'] and c['employee_id'] == req['employee_id'] for c in self.schedule
+                    c['ClassID'] == req['ClassID'] and c['section'] == req['section'] and c['duration'] == req['duration'] and c.get('room_options', c['roomid']) == req['roomid'] and c['employee_id'] == req['employee_id'] for c in self.schedule
                 )
             ]
+        else:
+            self.unscheduled_classes = list(self.infeasible_requests)
         return success
 
     def generate_schedule_genetic(self, class_data, generations=200, pop_size=50) -> bool:
@@ -1257,6 +1195,14 @@ class AdvancedSchoolScheduler:
         """
         import random
         import copy
+        class_data = self._prepare_run(class_data)
+        self.schedule = []
+        self._rebuild_indexes()
+        self.conflicts = []
+        # Pinned sessions and meeting patterns are placed first and are copied into every chromosome
+        _, failed_fixed = self._place_fixed(self._collect_requests(class_data))
+        fixed = list(self.schedule)
+        self.unscheduled_classes = [self._unscheduled_entry(r) for r in failed_fixed]
         requests = []
         for class_group in class_data:
             for course in class_group['Courses']:
@@ -1264,6 +1210,8 @@ class AdvancedSchoolScheduler:
                 section = course['section']
                 ClassID = course['ClassID']
                 for sched in course['classschedule']:
+                    if not self._is_searched(sched):
+                        continue
                     days = sched.get('day', ['Monday'])
                     if isinstance(days, str):
                         days = [days]
@@ -1275,21 +1223,23 @@ class AdvancedSchoolScheduler:
                         'roomid': sched['roomid'],
                         'employee_id': sched['employeeid'],
                         'days': days,
+                        'type': schedule_type(sched),
+                        'sections': combined_sections(section, sched),
                         'orig_sched': sched
                     })
-        school_start = 8 * 60
-        school_end = 17 * 60
-        slot_step = 30
+
         def build_chromosome():
-            chrom = []
+            chrom = copy.deepcopy(fixed)
             used_days_per_course = {}
+            for c in fixed:
+                used_days_per_course.setdefault((c['section'], c['ClassID']), set()).add(c['day'])
             for req in requests:
                 key = (req['section'], req['ClassID'])
                 available_days = [d for d in req['days'] if d not in used_days_per_course.get(key, set())]
                 tries = 0
                 while tries < 10 and available_days:
                     day = random.choice(available_days)
-                    possible_starts = [t for t in range(school_start, school_end - req['duration'] + 1, slot_step)]
+                    possible_starts = self._candidate_starts(req, day)
                     if not possible_starts:
                         tries += 1
                         continue
@@ -1297,7 +1247,7 @@ class AdvancedSchoolScheduler:
                     # Check for conflicts
                     conflict = False
                     for c in chrom:
-                        if c['section'] == req['section'] and c['day'] == day and self.is_time_conflict(start_time, req['duration'], c['start_time'], c['duration']):
+                        if self._shares_section(c, req) and c['day'] == day and self.is_time_conflict(start_time, req['duration'], c['start_time'], c['duration']):
                             conflict = True
                             break
                         if c['employee_id'] == req['employee_id'] and c['day'] == day and self.is_time_conflict(start_time, req['duration'], c['start_time'], c['duration']):
@@ -1331,8 +1281,8 @@ class AdvancedSchoolScheduler:
                 # If tries exhausted or no available days, skip
             return chrom
         def fitness(chrom):
-            if len(chrom) != len(requests):
-                return -10000 * (len(requests) - len(chrom))
+            if len(chrom) != len(requests) + len(fixed):
+                return -10000 * (len(requests) + len(fixed) - len(chrom))
             used_days_per_course = {}
             for a in chrom:
                 key = (a['section'], a['ClassID'])
@@ -1345,7 +1295,7 @@ class AdvancedSchoolScheduler:
                 for j, b in enumerate(chrom):
                     if i == j:
                         continue
-                    if a['section'] == b['section'] and a['day'] == b['day'] and self.is_time_conflict(a['start_time'], a['duration'], b['start_time'], b['duration']):
+                    if self._shares_section(a, b) and a['day'] == b['day'] and self.is_time_conflict(a['start_time'], a['duration'], b['start_time'], b['duration']):
                         return -10000
                     if a['employee_id'] == b['employee_id'] and a['day'] == b['day'] and self.is_time_conflict(a['start_time'], a['duration'], b['start_time'], b['duration']):
                         return -10000
@@ -1370,10 +1320,10 @@ class AdvancedSchoolScheduler:
                     continue
                 inserted = False
                 for day in available_days:
-                    for start_time in range(school_start, school_end - req['duration'] + 1, slot_step):
+                    for start_time in self._candidate_starts(req, day):
                         conflict = False
                         for c in chrom:
-                            if c['section'] == req['section'] and c['day'] == day and self.is_time_conflict(start_time, req['duration'], c['start_time'], c['duration']):
+                            if self._shares_section(c, req) and c['day'] == day and self.is_time_conflict(start_time, req['duration'], c['start_time'], c['duration']):
                                 conflict = True
                                 break
                             if c['employee_id'] == req['employee_id'] and c['day'] == day and self.is_time_conflict(start_time, req['duration'], c['start_time'], c['duration']):
@@ -1418,7 +1368,7 @@ class AdvancedSchoolScheduler:
                 for j, b in enumerate(chrom):
                     if i == j:
                         continue
-                    if a['section'] == b['section'] and a['day'] == b['day'] and self.is_time_conflict(a['start_time'], a['duration'], b['start_time'], b['duration']):
+                    if self._shares_section(a, b) and a['day'] == b['day'] and self.is_time_conflict(a['start_time'], a['duration'], b['start_time'], b['duration']):
                         conflict = True
                         break
                     if a['employee_id'] == b['employee_id'] and a['day'] == b['day'] and self.is_time_conflict(a['start_time'], a['duration'], b['start_time'], b['duration']):
@@ -1429,7 +1379,7 @@ class AdvancedSchoolScheduler:
                     if any(r in b_roomids for r in a_roomids) and a['day'] == b['day'] and self.is_time_conflict(a['start_time'], a['duration'], b['start_time'], b['duration']):
                         conflict = True
                         break
-                if conflict:
+                if conflict and self._is_movable(a):
                     chrom.pop(i)
                 else:
                     i += 1
@@ -1443,6 +1393,7 @@ class AdvancedSchoolScheduler:
         Strictly enforces: no two sessions of the same course/section on the same day.
         """
         import copy
+        class_data = self._prepare_run(class_data)
         requests = []
         for class_group in class_data:
             for course in class_group['Courses']:
@@ -1450,6 +1401,8 @@ class AdvancedSchoolScheduler:
                 section = course['section']
                 ClassID = course['ClassID']
                 for sched in course['classschedule']:
+                    if not self._is_searched(sched):
+                        continue  # pinned sessions and meeting patterns are placed as a whole by the engines
                     days = sched.get('day', ['Monday'])
                     if isinstance(days, str):
                         days = [days]
@@ -1461,11 +1414,14 @@ class AdvancedSchoolScheduler:
                         'roomid': sched['roomid'],
                         'employee_id': sched['employeeid'],
                         'days': days,
+                        'room_mode': sched.get('roommode', self.room_mode),
+                        'type': schedule_type(sched),
+                        'sections': combined_sections(section, sched),
                         'orig_sched': sched
                     })
-        school_start = 8 * 60
-        school_end = 17 * 60
-        slot_step = 30
+        def room_key(info):
+            # The rooms a session asked for: the whole pool of an any-of session, not the room it got
+            return str(info.get('room_options', info['roomid']))
         def get_used_days_per_course(schedule):
             used = {}
             for c in schedule:
@@ -1478,43 +1434,40 @@ class AdvancedSchoolScheduler:
             key = (req['section'], req['ClassID'])
             if key in used_days_per_course and day in used_days_per_course[key]:
                 return False
-            if self.is_in_break_time(start_time, req['duration']):
-                return False
-            for c in schedule:
-                if c is ignore_class:
-                    continue
-                if c['section'] == req['section'] and c['day'] == day and self.is_time_conflict(start_time, req['duration'], c['start_time'], c['duration']):
+            roomids = req['roomid'] if isinstance(req['roomid'], list) else [req['roomid']]
+            overlapping = [c for c in schedule if c is not ignore_class and c['day'] == day
+                           and self.is_time_conflict(start_time, req['duration'], c['start_time'], c['duration'])]
+            for c in overlapping:
+                if self._shares_section(c, req):
                     return False
-                if c['employee_id'] == req['employee_id'] and c['day'] == day and self.is_time_conflict(start_time, req['duration'], c['start_time'], c['duration']):
+                if c['employee_id'] == req['employee_id'] and self._capacity('employee', req['employee_id']) == 1:
                     return False
-                roomids = req['roomid'] if isinstance(req['roomid'], list) else [req['roomid']]
-                c_roomids = c['roomid'] if isinstance(c['roomid'], list) else [c['roomid']]
-                if any(r in c_roomids for r in roomids) and c['day'] == day and self.is_time_conflict(start_time, req['duration'], c['start_time'], c['duration']):
+            if req['room_mode'] == 'any':
+                # Any-of pool: one compatible room must remain free, as in schedule_class_with_day
+                if not self._any_room_available(roomids, day, start_time, req['duration']):
+                    return False
+                roomids = []
+            # Shared rooms: the overlapping sessions must leave a free place (rough count over the whole session)
+            for r in roomids:
+                users = sum(1 for c in overlapping if r in (c['roomid'] if isinstance(c['roomid'], list) else [c['roomid']]))
+                if users >= self._capacity('room', r):
+                    return False
+            if self._capacity('employee', req['employee_id']) > 1:
+                users = sum(1 for c in overlapping if c['employee_id'] == req['employee_id'])
+                if users >= self._capacity('employee', req['employee_id']):
                     return False
             return True
         def assign(req, day, start_time, schedule, used_days_per_course):
-            end_time = start_time + req['duration']
-            class_info = {
-                'ClassID': req['ClassID'],
-                'coursename': req['coursename'],
-                'section': req['section'],
-                'start_time': start_time,
-                'end_time': end_time,
-                'duration': req['duration'],
-                'roomid': req['roomid'],
-                'employee_id': req['employee_id'],
-                'day': day,
-                'start_time_str': self.format_time(start_time),
-                'end_time_str': self.format_time(end_time)
-            }
-            schedule.append(class_info)
+            # Registered like every other engine: an any-of session waits for assign_rooms_by_matching
+            class_info = self._new_class_info(req, day, start_time)
+            self._register_class(class_info)
             key = (req['section'], req['ClassID'])
             if key not in used_days_per_course:
                 used_days_per_course[key] = set()
             used_days_per_course[key].add(day)
             return class_info
         def unassign(class_info, schedule, used_days_per_course):
-            schedule.remove(class_info)
+            self._unregister_class(class_info)
             key = (class_info['section'], class_info['ClassID'])
             if key in used_days_per_course and class_info['day'] in used_days_per_course[key]:
                 used_days_per_course[key].remove(class_info['day'])
@@ -1525,7 +1478,7 @@ class AdvancedSchoolScheduler:
             key = (req['section'], req['ClassID'])
             available_days = [d for d in req['days'] if d not in used_days_per_course.get(key, set())]
             for day in available_days:
-                for start_time in range(school_start, school_end - req['duration'] + 1, slot_step):
+                for start_time in self._candidate_starts(req, day):
                     # Check if can assign directly
                     if can_assign(req, day, start_time, schedule, used_days_per_course):
                         class_info = assign(req, day, start_time, schedule, used_days_per_course)
@@ -1536,7 +1489,7 @@ class AdvancedSchoolScheduler:
                         # Find all blocking classes
                         blocking = []
                         for c in schedule:
-                            if c['section'] == req['section'] and c['day'] == day and self.is_time_conflict(start_time, req['duration'], c['start_time'], c['duration']):
+                            if self._shares_section(c, req) and c['day'] == day and self.is_time_conflict(start_time, req['duration'], c['start_time'], c['duration']):
                                 blocking.append(c)
                             if c['employee_id'] == req['employee_id'] and c['day'] == day and self.is_time_conflict(start_time, req['duration'], c['start_time'], c['duration']):
                                 blocking.append(c)
@@ -1544,11 +1497,12 @@ class AdvancedSchoolScheduler:
                             c_roomids = c['roomid'] if isinstance(c['roomid'], list) else [c['roomid']]
                             if any(r in c_roomids for r in roomids) and c['day'] == day and self.is_time_conflict(start_time, req['duration'], c['start_time'], c['duration']):
                                 blocking.append(c)
+                        blocking = list({id(c): c for c in blocking}.values())  # a class can block on several counts
                         # Try to move all blocking classes recursively
-                        can_move_all = True
-                        for block in blocking:
-                            block_key = (block['section'], block['ClassID'], block['duration'], str(block['roomid']), block['employee_id'])
-                            req_key = (req['section'], req['ClassID'], req['duration'], str(req['roomid']), req['employee_id'])
+                        can_move_all = all(self._is_movable(block) for block in blocking)
+                        for block in (blocking if can_move_all else []):
+                            block_key = (block['section'], block['ClassID'], block['duration'], room_key(block), block['employee_id'])
+                            req_key = (req['section'], req['ClassID'], req['duration'], room_key(req), req['employee_id'])
                             if block_key in visited or req_key in visited:
                                 can_move_all = False
                                 break
@@ -1558,9 +1512,12 @@ class AdvancedSchoolScheduler:
                                 'coursename': block['coursename'],
                                 'section': block['section'],
                                 'duration': block['duration'],
-                                'roomid': block['roomid'],
+                                'roomid': block.get('room_options', block['roomid']),
                                 'employee_id': block['employee_id'],
                                 'days': req['days'],
+                                'room_mode': block.get('room_mode', 'all'),
+                                'type': block.get('type', 'regular'),
+                                'sections': self._sections_of(block),
                                 'orig_sched': None
                             }
                             if not try_schedule_all(schedule, used_days_per_course, [block_req] + unscheduled[1:], visited | {block_key, req_key}):
@@ -1572,29 +1529,23 @@ class AdvancedSchoolScheduler:
                                 return True
                             unassign(class_info, schedule, used_days_per_course)
             return False
-        # Build initial schedule and unscheduled list
-        schedule = copy.deepcopy(self.schedule)
+        # Build initial schedule and unscheduled list; the search works on self.schedule and its
+        # indexes (every move is undone on backtrack), the copy restores it if the search fails
+        original = copy.deepcopy(self.schedule)
+        schedule = self.schedule
         used_days_per_course = get_used_days_per_course(schedule)
-        scheduled_keys = set((c['ClassID'], c['section'], c['duration'], str(c['roomid']), c['employee_id']) for c in schedule)
-        unscheduled = [req for req in requests if (req['ClassID'], req['section'], req['duration'], str(req['roomid']), req['employee_id']) not in scheduled_keys]
+        scheduled_keys = set((c['ClassID'], c['section'], c['duration'], room_key(c), c['employee_id']) for c in schedule)
+        unscheduled = [req for req in requests if (req['ClassID'], req['section'], req['duration'], room_key(req), req['employee_id']) not in scheduled_keys]
         success = try_schedule_all(schedule, used_days_per_course, unscheduled, set())
         if success:
-            # Rebuild all internal structures
-            self.schedule = schedule
-            self.sections = {}
-            self.employees = {}
-            self.room_schedules = {}
-            for c in self.schedule:
-                self.sections.setdefault(c['section'], []).append(c)
-                self.employees.setdefault(c['employee_id'], []).append(c)
-                roomids = c['roomid'] if isinstance(c['roomid'], list) else [c['roomid']]
-                for roomid in roomids:
-                    self.room_schedules.setdefault(roomid, []).append(c)
-            self.unscheduled_classes = []
-            return True
+            self.unscheduled_classes = list(self.infeasible_requests)
+            failed = self.assign_rooms_by_matching()
+            return not failed
         else:
+            self.schedule = original
+            self._rebuild_indexes()
             # Update unscheduled_classes
-            self.unscheduled_classes = [
+            self.unscheduled_classes = list(self.infeasible_requests) + [
                 {
                     'ClassID': req['ClassID'],
                     'coursename': req['coursename'],
@@ -1608,6 +1559,1535 @@ class AdvancedSchoolScheduler:
             ]
             return False
 
+    def _iter_courses(self, class_data):
+        """Yield every course in class data (list of {'Courses': [...]}, a single dict, or bare courses)."""
+        if isinstance(class_data, dict):
+            class_data = class_data.get('Courses', [class_data])
+        for entry in class_data:
+            if 'Courses' in entry:
+                yield from entry['Courses']
+            else:
+                yield entry
+
+    def _rebuild_indexes(self):
+        """Rebuild the section, employee and room indexes and the occupancy counters from self.schedule."""
+        self.sections = {}
+        self.employees = {}
+        self.room_schedules = {}
+        self._occupancy = {}
+        for c in self.schedule:
+            for section in self._sections_of(c):
+                self.sections.setdefault(section, []).append(c)
+            self.employees.setdefault(c['employee_id'], []).append(c)
+            self._mark(c, 1, 'section', 'employee')
+            roomids = c['roomid'] if isinstance(c['roomid'], list) else [c['roomid']]
+            for roomid in roomids:
+                self.room_schedules.setdefault(roomid, []).append(c)
+                self._mark(c, 1, 'room', roomid=roomid)
+
+    def _configure_slot_quantum(self, class_data) -> int:
+        """
+        Set self.slot_quantum to the GCD of every requested duration, the school-day
+        boundaries and the times already on the schedule, and rebuild the occupancy
+        counters if it changed.
+        """
+        requests = self._collect_requests(class_data)
+        values = [req['duration'] for req in requests] + [req['start'] for req in requests if 'start' in req]
+        for c in self.schedule:
+            values += [c['start_time'], c['duration']]
+        types = {req['type'] for req in requests} | {'regular'}
+        quantum = compute_slot_quantum(values, window_boundaries(types, self.day_windows))
+        self._set_slot_quantum(quantum)
+        return quantum
+
+    def _set_slot_quantum(self, quantum):
+        """Switch to a new slot size: fresh start table, occupancy counters rebuilt if the grid changed."""
+        self.start_table = StartTable(quantum, self.day_windows)
+        self.schedule_class_table = StartTable(quantum, {None: {'regular': SCHEDULE_CLASS_WINDOWS}})
+        self._available_starts = {}
+        if quantum != self.slot_quantum:
+            self.slot_quantum = quantum
+            self._rebuild_indexes()
+
+    def _prepare_run(self, class_data) -> list:
+        """Common engine preamble: drop provably impossible requests and size the slot grid."""
+        class_data = self._apply_precheck(class_data)
+        self._configure_slot_quantum(class_data)
+        return class_data
+
+    def _mark(self, class_info, delta, *kinds, roomid=None):
+        """Add delta to the occupancy counters of a class for the given kinds ('section', 'employee', 'room')."""
+        day = class_info.get('day')
+        first, last = slot_range(class_info['start_time'], class_info['duration'], self.slot_quantum)
+        for kind in kinds:
+            if kind == 'room':
+                keys = [roomid]
+            elif kind == 'section':
+                keys = self._sections_of(class_info)
+            else:
+                keys = [class_info['employee_id']]
+            for key in keys:
+                buf = self._occupancy.get((kind, key, day))
+                if buf is None:
+                    buf = self._occupancy[(kind, key, day)] = bytearray(24 * 60 // self.slot_quantum + 1)
+                for i in range(first, last):
+                    buf[i] += delta
+
+    def _capacity(self, kind, key) -> int:
+        """Concurrent sessions a section (always 1), employee or room can host."""
+        if kind == 'room':
+            return self.room_capacity.get(key, self.rooms.get(key, {}).get('concurrency', 1))
+        if kind == 'employee':
+            return self.employee_capacity.get(key, 1)
+        return 1
+
+    def _is_free(self, kind, key, day, start_time, duration) -> bool:
+        """True when every slot of [start_time, start_time + duration) on day is below the capacity of the section/employee/room."""
+        buf = self._occupancy.get((kind, key, day))
+        if buf is None:
+            return True
+        first, last = slot_range(start_time, duration, self.slot_quantum)
+        return max(buf[first:last]) < self._capacity(kind, key)
+
+    def _is_free_every_day(self, kind, key, start_time, duration) -> bool:
+        """_is_free on the counters of every day, for sessions that have no day (schedule_class)."""
+        return all(self._is_free(kind, key, day, start_time, duration)
+                   for k, x, day in self._occupancy if k == kind and x == key)
+
+    def _pool_has_free_room(self, kind, key, day, start_time, duration) -> bool:
+        """
+        Whether a shared employee or room (capacity > 1) can still take a session; one with
+        capacity 1 never can, so any overlap is a conflict. A class without a day
+        (schedule_class) must fit on every day's counters.
+        """
+        if self._capacity(kind, key) == 1:
+            return False
+        if day is None:
+            return self._is_free_every_day(kind, key, start_time, duration)
+        return self._is_free(kind, key, day, start_time, duration)
+
+    def _free_units(self, kind, key, day, start_time, duration) -> int:
+        """How many more sessions fit on every slot of [start_time, start_time + duration)."""
+        buf = self._occupancy.get((kind, key, day))
+        capacity = self._capacity(kind, key)
+        if buf is None:
+            return capacity
+        first, last = slot_range(start_time, duration, self.slot_quantum)
+        return max(0, capacity - max(buf[first:last]))
+
+    def _find_overlap(self, classes, day, start_time, duration):
+        """First class in classes that overlaps [start_time, start_time + duration) on day, or None."""
+        for c in classes:
+            if c.get('day') == day and self.is_time_conflict(start_time, duration, c['start_time'], c['duration']):
+                return c
+        return None
+
+    # Engine name -> method name, used by run_engine and the process-pool workers
+    ENGINES = {
+        'greedy': 'generate_schedule',
+        'backtracking': 'generate_schedule_backtracking',
+        'repair': '_generate_schedule_with_repair',
+        'two_phase': 'generate_schedule_two_phase',
+        'time_first': 'generate_schedule_time_first',
+        'grasp': 'generate_schedule_grasp',
+        'dsatur': 'generate_schedule_dsatur',
+    }
+
+    def run_engine(self, engine: str, class_data) -> list:
+        """Run the named scheduling engine on class_data and return the schedule."""
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {sorted(self.ENGINES)}")
+        getattr(self, self.ENGINES[engine])(class_data)
+        return self.schedule
+
+    def _generate_schedule_with_repair(self, class_data):
+        """Greedy pass followed by global repair of whatever is left unscheduled."""
+        self.generate_schedule(class_data)
+        if self.unscheduled_classes:
+            self.global_repair_schedule(class_data)
+        return self.schedule
+
+    def split_independent_components(self, class_data) -> list:
+        """
+        Split class data into groups of courses that share no section, employee or room.
+        Sections, employees and rooms are nodes of an interaction graph; every class session
+        links its section to its employee and rooms. Each connected component is returned as
+        its own class_data list, largest first, and can be scheduled without looking at the others.
+        """
+        parent = {}
+
+        def find(node):
+            parent.setdefault(node, node)
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        def union(a, b):
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[rb] = ra
+
+        courses = list(self._iter_courses(class_data))
+        for course in courses:
+            section_node = ('section', course['section'])
+            find(section_node)
+            for sched in course.get('classschedule', []):
+                for section in combined_sections(course['section'], sched):
+                    union(section_node, ('section', section))
+                if 'employeeid' in sched:
+                    union(section_node, ('employee', sched['employeeid']))
+                roomids = sched.get('roomid', [])
+                if not isinstance(roomids, list):
+                    roomids = [roomids]
+                for roomid in roomids:
+                    union(section_node, ('room', roomid))
+        components = {}
+        for course in courses:
+            components.setdefault(find(('section', course['section'])), []).append(course)
+        groups = sorted(components.values(), key=lambda c: -sum(len(x.get('classschedule', [])) for x in c))
+        return [[{'Courses': group}] for group in groups]
+
+    def generate_schedule_parallel(self, class_data, engine: str = 'greedy', max_workers: Optional[int] = None) -> list:
+        """
+        Solve each independent component (see split_independent_components) with the chosen
+        engine in a process pool and merge the results into this scheduler. The workers do not
+        share self.log_file: component i logs to logs_component<i>.txt (for 'logs.txt').
+        """
+        components = self.split_independent_components(class_data)
+        root, ext = os.path.splitext(self.log_file)
+        jobs = [(engine, component, self._settings(), f"{root}_component{index}{ext}")
+                for index, component in enumerate(components, 1)]
+        print(f"Split {sum(len(c[0]['Courses']) for c in components)} courses into {len(components)} independent components")
+        if max_workers == 1 or len(jobs) <= 1:
+            results = [_solve_component(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(_solve_component, jobs))
+        self.schedule = []
+        self.conflicts = []
+        self.unscheduled_classes = []
+        self.infeasible_requests = []
+        for schedule, unscheduled, conflicts, infeasible in results:
+            self.schedule.extend(schedule)
+            self.unscheduled_classes.extend(unscheduled)
+            self.conflicts.extend(conflicts)
+            self.infeasible_requests.extend(infeasible)
+        # Components may have been solved on different grids; index the merge on a common one
+        self._set_slot_quantum(compute_slot_quantum([v for c in self.schedule for v in (c['start_time'], c['duration'])]))
+        self._rebuild_indexes()
+        return self.schedule
+
+    def _collect_requests(self, class_data) -> list:
+        """Flatten class data into one request dict per class session."""
+        requests = []
+        for course in self._iter_courses(class_data):
+            for sched in course.get('classschedule', []):
+                if 'roomid' not in sched or 'employeeid' not in sched:
+                    continue
+                days = sched.get('day', ['Monday'])
+                if isinstance(days, str):
+                    days = [days]
+                req = {
+                    'ClassID': course['ClassID'],
+                    'coursename': course.get('coursename', ''),
+                    'section': course['section'],
+                    'duration': self.parse_duration(sched['duration']),
+                    'roomid': sched['roomid'],
+                    'employee_id': sched['employeeid'],
+                    'days': days,
+                    'room_mode': sched.get('roommode', self.room_mode),
+                    'type': schedule_type(sched),
+                    'sections': combined_sections(course['section'], sched),
+                    'orig_sched': sched
+                }
+                pin = pinned_slot(sched)
+                if pin:
+                    # Fixed day and start (and room, when given): preloaded, never searched
+                    req['days'] = [pin[0]]
+                    req['start'] = pin[1]
+                    if pin[2] is not None:
+                        req['roomid'] = [pin[2]]
+                        req['room_mode'] = 'all'
+                elif 'pattern' in sched:
+                    # One variable meeting on every day of one of its patterns, at the same start
+                    req['patterns'] = parse_patterns(sched['pattern'])
+                    req['days'] = list(dict.fromkeys(day for days in req['patterns'] for day in days))
+                requests.append(req)
+        return requests
+
+    def _sections_of(self, info) -> list:
+        """Sections a class or request occupies: all of them for a combined session, else its own."""
+        return info.get('sections') or [info['section']]
+
+    def _section_label(self, info) -> str:
+        """Section text for exports, e.g. '2A/2B/2C' for a combined session."""
+        return '/'.join(str(section) for section in self._sections_of(info))
+
+    def _shares_section(self, a, b) -> bool:
+        """Whether two classes or requests have a section in common."""
+        return not set(self._sections_of(a)).isdisjoint(self._sections_of(b))
+
+    def _is_movable(self, class_info) -> bool:
+        """Whether repair and search moves may take a placed class out of its slot."""
+        return 'pattern' not in class_info and not class_info.get('pinned')
+
+    def _is_searched(self, sched) -> bool:
+        """Whether a classschedule entry is a search variable of its own (not pinned, not a meeting pattern)."""
+        return 'start' not in sched and 'pattern' not in sched
+
+    def _place_pinned(self, requests) -> tuple:
+        """
+        Preload the pinned requests (fixed day and start) into the schedule and the occupancy counters.
+        Returns (the other requests, the pinned requests that collide with an earlier pin).
+        """
+        failed = []
+        for req in requests:
+            if 'start' not in req:
+                continue
+            day, start_time = req['days'][0], req['start']
+            if not self._is_slot_free(req, day, start_time):
+                print(f"Pinned session {req['coursename']} ({req['section']}) on {day} at "
+                      f"{self.format_time(start_time)} collides with another pinned session")
+                failed.append(req)
+                continue
+            class_info = self._new_class_info(req, day, start_time)
+            class_info['pinned'] = True
+            self._register_class(class_info)
+        return [req for req in requests if 'start' not in req], failed
+
+    def _place_fixed(self, requests) -> tuple:
+        """
+        Place everything that is not an ordinary search variable: pinned sessions, then meeting patterns.
+        Returns (the remaining requests, the pinned and pattern requests that could not be placed).
+        """
+        requests, failed_pins = self._place_pinned(requests)
+        requests, failed_patterns = self._place_patterns(requests)
+        return requests, failed_pins + failed_patterns
+
+    def _pattern_starts(self, req, days) -> list:
+        """Start times valid on every day of a pattern."""
+        common = set.intersection(*(set(self._candidate_starts(req, day)) for day in days))
+        return [t for t in self._candidate_starts(req, days[0]) if t in common]
+
+    def _is_pattern_free(self, req, days, start_time) -> bool:
+        """A pattern choice is free when the course has no other session on its days and every meeting slot is free."""
+        course_days = {c['day'] for c in self.sections.get(req['section'], []) if c['ClassID'] == req['ClassID']}
+        return course_days.isdisjoint(days) and all(self._is_slot_free(req, day, start_time) for day in days)
+
+    def _place_pattern(self, req, days, start_time) -> list:
+        """Register one meeting per pattern day at start_time and return them."""
+        meetings = []
+        for day in days:
+            class_info = self._new_class_info(req, day, start_time)
+            class_info['pattern'] = pattern_label(days)
+            self._register_class(class_info)
+            meetings.append(class_info)
+        return meetings
+
+    def _place_patterns(self, requests) -> tuple:
+        """
+        Place every meeting-pattern request as a single variable with domain (pattern, start),
+        most constrained first, taking the first free choice in the listed pattern order.
+        Returns (the requests without patterns, the pattern requests that found no choice).
+        """
+        pattern_requests = [req for req in requests if 'patterns' in req]
+        domains = {id(req): [(days, t) for days in req['patterns'] for t in self._pattern_starts(req, days)]
+                   for req in pattern_requests}
+        failed = []
+        for req in sorted(pattern_requests, key=lambda r: (len(domains[id(r)]), -r['duration'] * len(r['days']))):
+            for days, start_time in domains[id(req)]:
+                if self._is_pattern_free(req, days, start_time):
+                    self._place_pattern(req, days, start_time)
+                    break
+            else:
+                failed.append(req)
+        return [req for req in requests if 'patterns' not in req], failed
+
+    def _unscheduled_entry(self, req) -> dict:
+        """Build the unscheduled_classes record for a request."""
+        return {
+            'ClassID': req['ClassID'],
+            'coursename': req['coursename'],
+            'section': req['section'],
+            'duration': req['duration'],
+            'roomid': req['roomid'],
+            'employee_id': req['employee_id'],
+            'day': req['days']
+        }
+
+    def _new_class_info(self, req, day, start_time) -> dict:
+        end_time = start_time + req['duration']
+        class_info = {
+            'ClassID': req['ClassID'],
+            'coursename': req['coursename'],
+            'section': req['section'],
+            'start_time': start_time,
+            'end_time': end_time,
+            'duration': req['duration'],
+            'roomid': req['roomid'],
+            'employee_id': req['employee_id'],
+            'day': day,
+            'start_time_str': self.format_time(start_time),
+            'end_time_str': self.format_time(end_time)
+        }
+        if req.get('room_mode') == 'any':
+            class_info['roomid'] = []
+            class_info['room_mode'] = 'any'
+            class_info['room_options'] = req['roomid'] if isinstance(req['roomid'], list) else [req['roomid']]
+        if req.get('type', 'regular') != 'regular':
+            class_info['type'] = req['type']
+        if len(self._sections_of(req)) > 1:
+            class_info['sections'] = req['sections']
+        return class_info
+
+    def _register_class(self, class_info):
+        """Add a placed class to the schedule and the section, employee and room indexes."""
+        self.schedule.append(class_info)
+        for section in self._sections_of(class_info):
+            self.sections.setdefault(section, []).append(class_info)
+        self.employees.setdefault(class_info['employee_id'], []).append(class_info)
+        self._mark(class_info, 1, 'section', 'employee')
+        roomids = class_info['roomid'] if isinstance(class_info['roomid'], list) else [class_info['roomid']]
+        for roomid in roomids:
+            self.room_schedules.setdefault(roomid, []).append(class_info)
+            self._mark(class_info, 1, 'room', roomid=roomid)
+
+    def _unregister_class(self, class_info):
+        """Remove a placed class from the schedule and the indexes."""
+        self.schedule.remove(class_info)
+        for section in self._sections_of(class_info):
+            self.sections[section].remove(class_info)
+        self.employees[class_info['employee_id']].remove(class_info)
+        self._mark(class_info, -1, 'section', 'employee')
+        roomids = class_info['roomid'] if isinstance(class_info['roomid'], list) else [class_info['roomid']]
+        for roomid in roomids:
+            self.room_schedules[roomid].remove(class_info)
+            self._mark(class_info, -1, 'room', roomid=roomid)
+
+    def _availability_mask(self, employee_id, day, quantum) -> bytearray:
+        """Slots of a day (at the given slot size) lying wholly inside the employee's availability windows."""
+        key = (employee_id, day, quantum)
+        mask = self._availability_masks.get(key)
+        if mask is None:
+            mask = self._availability_masks[key] = bytearray(24 * 60 // quantum + 1)
+            for start, end in self.employee_limits[employee_id]['available'].get(day, ()):
+                first, last = -(-parse_clock(start) // quantum), parse_clock(end) // quantum
+                mask[first:last] = b'\x01' * max(0, last - first)
+        return mask
+
+    def _filter_available(self, employee_id, day, duration, starts, quantum) -> tuple:
+        """Starts whose whole session falls inside the employee's availability mask."""
+        mask = self._availability_mask(employee_id, day, quantum)
+        return tuple(t for t in starts if all(mask[slice(*slot_range(t, duration, quantum))]))
+
+    def _candidate_starts(self, req, day) -> tuple:
+        """
+        Start-table starts of a request on a day, with the employee's availability applied up front
+        so the engines never generate a start the employee cannot teach.
+        """
+        sched_type = req.get('type', 'regular')
+        starts = self.start_table.starts(req['duration'], sched_type, day)
+        limits = self.employee_limits.get(req['employee_id'])
+        if not limits or 'available' not in limits:
+            return starts
+        key = (req['employee_id'], req['duration'], sched_type, day)
+        filtered = self._available_starts.get(key)
+        if filtered is None:
+            filtered = self._available_starts[key] = self._filter_available(
+                req['employee_id'], day, req['duration'], starts, self.slot_quantum)
+        return filtered
+
+    def _within_employee_limits(self, employee_id, day, start_time, duration) -> bool:
+        """
+        Check the employee's 'max_daily' and 'max_consecutive' minutes with the session added,
+        on the employee's occupancy counters. Consecutive teaching is a sliding-window sum: no
+        window of max_consecutive + 1 slot may be busy in every slot.
+        """
+        limits = self.employee_limits.get(employee_id)
+        if not limits or ('max_daily' not in limits and 'max_consecutive' not in limits):
+            return True
+        q = self.slot_quantum
+        buf = self._occupancy.get(('employee', employee_id, day)) or bytearray(24 * 60 // q + 1)
+        first, last = slot_range(start_time, duration, q)
+        busy = bytearray(1 if v else 0 for v in buf)
+        busy[first:last] = b'\x01' * (last - first)
+        if 'max_daily' in limits and sum(busy) * q > limits['max_daily']:
+            return False
+        if 'max_consecutive' in limits:
+            width = limits['max_consecutive'] // q + 1
+            lo, hi = max(0, first - width + 1), min(len(busy), last + width - 1)
+            window = sum(busy[lo:lo + width])
+            for i in range(lo, hi - width + 1):
+                if i > lo:
+                    window += busy[i + width - 1] - busy[i - 1]
+                if window == width:
+                    return False
+        return True
+
+    def _is_time_free(self, req, day, start_time) -> bool:
+        """Check section and employee availability at (day, start_time); start_time comes from self.start_table."""
+        duration = req['duration']
+        return (all(self._is_free('section', section, day, start_time, duration) for section in self._sections_of(req))
+                and self._is_free('employee', req['employee_id'], day, start_time, duration)
+                and self._within_employee_limits(req['employee_id'], day, start_time, duration))
+
+    def _is_slot_free(self, req, day, start_time) -> bool:
+        """Check section, employee and room availability at (day, start_time); start_time comes from self.start_table."""
+        if not self._is_time_free(req, day, start_time):
+            return False
+        duration = req['duration']
+        roomids = req['roomid'] if isinstance(req['roomid'], list) else [req['roomid']]
+        if req.get('room_mode') == 'any':
+            return self._any_room_available(roomids, day, start_time, duration)
+        return not any(self._room_busy(roomid, day, start_time, duration) for roomid in roomids)
+
+    def _room_busy(self, roomid, day, start_time, duration) -> bool:
+        """Check whether a concrete room assignment overlaps [start_time, start_time + duration) on a day."""
+        return not self._is_free('room', roomid, day, start_time, duration)
+
+    def _pending_room_classes(self, day=None) -> list:
+        """Any-of room classes that have a time but no room yet."""
+        return [c for c in self.schedule if c.get('room_mode') == 'any' and not c['roomid'] and (day is None or c.get('day') == day)]
+
+    def _any_room_available(self, room_options, day, start_time, duration) -> bool:
+        """
+        Check that a session needing one room of room_options can be added at (day, start_time).
+        At every point where the set of overlapping sessions grows, the unroomed any-of sessions
+        plus the new one must still have a perfect bipartite matching into the rooms that are free.
+        """
+        end_time = start_time + duration
+        pending = [c for c in self._pending_room_classes(day)
+                   if self.is_time_conflict(start_time, duration, c['start_time'], c['duration'])]
+        pool = set(room_options)
+        for c in pending:
+            pool.update(c['room_options'])
+        points = {start_time}
+        points.update(c['start_time'] for c in pending if start_time < c['start_time'] < end_time)
+        for roomid in pool:
+            for c in self.room_schedules.get(roomid, []):
+                if c.get('day') == day and start_time < c['start_time'] < end_time:
+                    points.add(c['start_time'])
+        for t in sorted(points):
+            # A room hosting k sessions at once is k matching nodes (room, place)
+            units = {r: self._free_units('room', r, day, t, 1) for r in pool}
+            adjacency = {'new': [(r, i) for r in room_options for i in range(units[r])]}
+            for idx, c in enumerate(pending):
+                if c['start_time'] <= t < c['end_time']:
+                    adjacency[idx] = [(r, i) for r in c['room_options'] for i in range(units[r])]
+            if len(hopcroft_karp(adjacency)) < len(adjacency):
+                return False
+        return True
+
+    def assign_rooms_by_matching(self) -> list:
+        """
+        Give every any-of room class a concrete room. Classes are swept per (day, start time);
+        the classes starting together are matched to rooms free for their whole duration with
+        Hopcroft-Karp maximum bipartite matching. Classes left without a room are removed from
+        the schedule, added to unscheduled_classes and returned.
+        """
+        groups = defaultdict(list)
+        for c in self._pending_room_classes():
+            groups[(c['day'], c['start_time'])].append(c)
+        failed = []
+        for key in sorted(groups):
+            group = groups[key]
+            adjacency = {
+                idx: [(r, i) for r in c['room_options']
+                      for i in range(self._free_units('room', r, c['day'], c['start_time'], c['duration']))]
+                for idx, c in enumerate(group)
+            }
+            matching = hopcroft_karp(adjacency)
+            for idx, c in enumerate(group):
+                if idx in matching:
+                    roomid = matching[idx][0]
+                    c['roomid'] = [roomid]
+                    self.room_schedules.setdefault(roomid, []).append(c)
+                    self._mark(c, 1, 'room', roomid=roomid)
+                else:
+                    failed.append(c)
+        for c in failed:
+            self._unregister_class(c)
+            self.unscheduled_classes.append({
+                'ClassID': c['ClassID'],
+                'coursename': c['coursename'],
+                'section': c['section'],
+                'duration': c['duration'],
+                'roomid': c['room_options'],
+                'employee_id': c['employee_id'],
+                'day': c['day'],
+                'reason': 'No room left in the any-of pool'
+            })
+        return failed
+
+    def _find_free_start(self, req, day) -> Optional[int]:
+        """Return the earliest conflict-free start time for a request on a day, or None."""
+        for start_time in self._candidate_starts(req, day):
+            if self._is_slot_free(req, day, start_time):
+                return start_time
+        return None
+
+    def assign_days_bin_packing(self, requests, fixed=()) -> tuple:
+        """
+        Phase 1 of the two-phase mode: give every request a day by first-fit-decreasing
+        bin packing against per-section, per-employee and per-room daily minute capacities.
+        A bin holds the minutes of one Type on one day, sized by that day's teaching windows
+        (see _daily_minutes), so Saturday/Sunday and day_windows overrides are respected.
+        fixed holds already placed classes (pins, pattern meetings): their days and minutes
+        are loaded into the bins before packing.
+        Returns ({day: [requests]}, [requests that fit on none of their days]).
+        """
+        load = defaultdict(int)
+        used_days_per_course = defaultdict(set)
+        by_day = defaultdict(list)
+        unassigned = []
+
+        def bin_size(b):
+            # Sessions a bin can run side by side: the summed capacity of a pool, or one room/employee's
+            if b[0] == 'room_pool':
+                return sum(self._capacity('room', roomid) for roomid in b[1])
+            return self._capacity(b[0], b[1])
+
+        def bins_of(info, day):
+            # The bins a request or placed class fills on a day
+            slot = (day, info.get('type', 'regular'))
+            bins = [('section', section) + slot for section in self._sections_of(info)] + [('employee', info['employee_id']) + slot]
+            if info.get('room_mode') == 'any':
+                # An any-of pool is one bin holding the minutes of all its rooms
+                pool = info.get('room_options', info['roomid'])
+                bins.append(('room_pool', tuple(sorted(pool if isinstance(pool, list) else [pool]))) + slot)
+            else:
+                roomids = info['roomid'] if isinstance(info['roomid'], list) else [info['roomid']]
+                bins += [('room', roomid) + slot for roomid in roomids]
+            return bins
+
+        for class_info in fixed:
+            used_days_per_course[(class_info['section'], class_info['ClassID'])].add(class_info['day'])
+            for b in bins_of(class_info, class_info['day']):
+                load[b] += class_info['duration']
+
+        for req in sorted(requests, key=lambda r: -r['duration']):
+            course_key = (req['section'], req['ClassID'])
+            for day in req['days']:
+                if day in used_days_per_course[course_key]:
+                    continue
+                bins = bins_of(req, day)
+                daily_capacity = self._daily_minutes(req['type'], day)
+                if all(load[b] + req['duration'] <= daily_capacity * bin_size(b) for b in bins):
+                    for b in bins:
+                        load[b] += req['duration']
+                    used_days_per_course[course_key].add(day)
+                    by_day[day].append(req)
+                    break
+            else:
+                unassigned.append(req)
+        return dict(by_day), unassigned
+
+    def _daily_minutes(self, sched_type, day) -> int:
+        """Teaching minutes of a Type on a day: the summed length of its windows (day_windows over TYPE_WINDOWS)."""
+        return sum(end - start for start, end in self.start_table.windows(sched_type, day))
+
+    def generate_schedule_two_phase(self, class_data, max_workers: Optional[int] = None) -> list:
+        """
+        Two-phase scheduling: days are fixed first by bin packing (assign_days_bin_packing),
+        then the time placement of each day runs as an independent subproblem in a process pool.
+        Sessions that do not fit in their packed day are retried on their other allowed days.
+        """
+        requests = self._collect_requests(self._prepare_run(class_data))
+        self.schedule = []
+        self._rebuild_indexes()
+        requests, failed_patterns = self._place_fixed(requests)
+        fixed = list(self.schedule)
+        by_day, unassigned = self.assign_days_bin_packing(requests, fixed)
+        jobs = [(day, reqs, self._settings(), [c for c in fixed if c['day'] == day]) for day, reqs in by_day.items()]
+        if max_workers == 1 or len(jobs) <= 1:
+            results = [_place_day(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(_place_day, jobs))
+        self.schedule = fixed
+        self.conflicts = []
+        leftover = list(unassigned)
+        for schedule, failed in results:
+            self.schedule.extend(schedule)
+            leftover.extend(failed)
+        self._rebuild_indexes()
+        used_days_per_course = defaultdict(set)
+        for c in self.schedule:
+            used_days_per_course[(c['section'], c['ClassID'])].add(c['day'])
+        self.unscheduled_classes = list(self.infeasible_requests) + [self._unscheduled_entry(r) for r in failed_patterns]
+        for req in sorted(leftover, key=lambda r: -r['duration']):
+            course_key = (req['section'], req['ClassID'])
+            for day in req['days']:
+                if day in used_days_per_course[course_key]:
+                    continue
+                start_time = self._find_free_start(req, day)
+                if start_time is not None:
+                    self._register_class(self._new_class_info(req, day, start_time))
+                    used_days_per_course[course_key].add(day)
+                    break
+            else:
+                self.unscheduled_classes.append(self._unscheduled_entry(req))
+        self.assign_rooms_by_matching()
+        return self.schedule
+
+    def analyze_infeasibility(self, class_data) -> list:
+        """
+        Pre-solve check of necessary conditions, in one pass over the requests:
+        - a session that fits no teaching window of its Type on any allowed day
+        - more sessions of a course than distinct allowed days (one session per day rule),
+          decided by bipartite matching of sessions to days
+        - weekly minutes of a section, employee or room above the minutes available on
+          its allowed days (teaching windows of the Types it uses, e.g. the school day minus
+          the 12:00-13:00 break); the longest sessions of that entity are reported until the rest fits
+        Returns one unscheduled-style record per impossible request, with a 'reason' and the
+        originating 'request'.
+        """
+        # One-minute grid: only whether a start exists matters here, not the run's slot size
+        start_table = StartTable(1, self.day_windows)
+        report = []
+        excluded = set()
+
+        def weekly_minutes(req):
+            # A meeting pattern needs at least its shortest pattern's worth of meetings
+            return req['duration'] * min((len(days) for days in req.get('patterns', [])), default=1)
+
+        def exclude(req, reason):
+            excluded.add(id(req))
+            entry = self._unscheduled_entry(req)
+            entry['reason'] = reason
+            entry['request'] = req
+            report.append(entry)
+
+        requests = self._collect_requests(class_data)
+        for req in requests:
+            if 'start' in req:
+                continue
+            if not any(start_table.starts(req['duration'], req['type'], day) for day in req['days']):
+                longest_block = max(end - start for start, end in start_table.windows(req['type']))
+                exclude(req, f"Duration {self.format_duration(req['duration'])} is longer than the longest "
+                             f"{req['type']} block ({self.format_duration(longest_block)})")
+                continue
+            limits = self.employee_limits.get(req['employee_id'], {})
+            if req['duration'] > limits.get('max_consecutive', req['duration']):
+                exclude(req, f"Duration {self.format_duration(req['duration'])} is longer than employee "
+                             f"{req['employee_id']}'s {limits['max_consecutive']} min consecutive limit")
+            elif 'available' in limits and not any(
+                    self._filter_available(req['employee_id'], day, req['duration'],
+                                           start_table.starts(req['duration'], req['type'], day), 1)
+                    for day in req['days']):
+                exclude(req, f"Employee {req['employee_id']} is not available for "
+                             f"{self.format_duration(req['duration'])} on any of {req['days']}")
+        by_course = defaultdict(list)
+        for req in requests:
+            if id(req) not in excluded and 'patterns' not in req:
+                by_course[(req['section'], req['ClassID'])].append(req)
+        for (section, class_id), reqs in by_course.items():
+            allowed = set()
+            for req in reqs:
+                allowed.update(req['days'])
+            if len(reqs) <= len(allowed) and all(len(r['days']) == len(allowed) for r in reqs):
+                continue
+            matching = hopcroft_karp({idx: req['days'] for idx, req in enumerate(reqs)})
+            for idx, req in enumerate(reqs):
+                if idx not in matching:
+                    exclude(req, f"Course {class_id} of section {section} has more sessions than allowed days "
+                                 f"({sorted(allowed)})")
+        demand = defaultdict(list)
+        for req in requests:
+            if id(req) in excluded:
+                continue
+            for section in req['sections']:
+                demand[('Section', section)].append(req)
+            demand[('Employee', req['employee_id'])].append(req)
+            if req.get('room_mode') != 'any':
+                roomids = req['roomid'] if isinstance(req['roomid'], list) else [req['roomid']]
+                for roomid in roomids:
+                    demand[('Room', roomid)].append(req)
+        for (kind, key), reqs in demand.items():
+            reqs = [r for r in reqs if id(r) not in excluded]
+            allowed = set()
+            for req in reqs:
+                allowed.update(req['days'])
+            types = {r['type'] for r in reqs}
+            capacity = self._capacity(kind.lower(), key)
+            limits = self.employee_limits.get(key, {}) if kind == 'Employee' else {}
+            if 'available' in limits:
+                allowed &= set(limits['available'])
+            available = 0
+            for day in allowed:
+                per_day = sum(self._daily_minutes(t, day) for t in types) * capacity
+                available += min(per_day, limits.get('max_daily', per_day))
+            total = sum(weekly_minutes(r) for r in reqs)
+            for req in sorted((r for r in reqs if 'start' not in r), key=lambda r: -weekly_minutes(r)):
+                if total <= available:
+                    break
+                exclude(req, f"{kind} {key} needs {total} min per week but only {available} min are "
+                             f"available on {sorted(allowed)}")
+                total -= weekly_minutes(req)
+        return report
+
+    def _apply_precheck(self, class_data) -> list:
+        """
+        Run analyze_infeasibility (when self.precheck is on), store the report in
+        self.infeasible_requests and return class data without the impossible sessions.
+        """
+        courses = list(self._iter_courses(class_data))
+        self.infeasible_requests = []
+        if self.precheck:
+            report = self.analyze_infeasibility(courses)
+            self.infeasible_requests = [{k: v for k, v in entry.items() if k != 'request'} for entry in report]
+            excluded = {id(entry['request']['orig_sched']) for entry in report}
+            if excluded:
+                courses = [
+                    dict(course, classschedule=[s for s in course.get('classschedule', []) if id(s) not in excluded])
+                    for course in courses
+                ]
+        return [{'Courses': courses}]
+
+    def load_room_types(self) -> Dict:
+        """
+        Map RoomID -> RoomType of the teaching rooms in the constructor's rooms list.
+        Rooms without a RoomType are classified from their RoomName with generate_room_json.ROOM_TYPE_MAP;
+        placeholder and non-teaching rooms ('Not Set', 'TBA', faculty rooms, offices) are left out.
+        """
+        from generate_room_json import get_room_type, is_teaching_room
+        room_types = {}
+        for room in self.room_list or []:
+            if not is_teaching_room(room.get('RoomName', '')):
+                continue
+            room_type = room.get('RoomType')
+            if room_type is None:
+                room_type = get_room_type(room.get('RoomName', ''))
+            room_types[room['RoomID']] = room_type
+        return room_types
+
+    def generate_schedule_time_first(self, class_data, pool_by_type: bool = False) -> list:
+        """
+        Time-first, rooms-later engine. Phase 1 places every session against section and
+        employee timetables and, for sessions with a room pool, only a per-slot count of busy
+        rooms of that pool, never a specific room. Phase 2 assigns concrete RoomIDs slot by
+        slot with assign_rooms_by_matching.
+        A session's pool starts from its own roomid list. It is widened to every teaching room
+        of a RoomType only when asked: the session's 'roomtype' key, or pool_by_type=True for
+        the type of its first listed room (types come from the constructor's rooms list).
+        Sessions without a pool that are not in any-of room mode keep all their listed rooms,
+        which are occupied together as in the other engines.
+        """
+        room_types = self.load_room_types()
+        rooms_by_type = defaultdict(list)
+        for roomid, room_type in room_types.items():
+            rooms_by_type[room_type].append(roomid)
+        requests = self._collect_requests(self._prepare_run(class_data))
+        self.schedule = []
+        self._rebuild_indexes()
+        self.conflicts = []
+        requests, failed_pins = self._place_pinned(requests)
+        self.unscheduled_classes = list(self.infeasible_requests) + [self._unscheduled_entry(r) for r in failed_pins]
+        slot_step = self.slot_quantum
+        pool_load = defaultdict(int)  # (pool, day, slot start) -> sessions using a room of the pool
+        pools_of_room = defaultdict(set)  # RoomID -> pools containing it
+        for req in requests:
+            listed = req['roomid'] if isinstance(req['roomid'], list) else [req['roomid']]
+            room_type = req['orig_sched'].get('roomtype')
+            if room_type is None and pool_by_type and listed:
+                room_type = room_types.get(listed[0])
+            options = list(dict.fromkeys(listed + rooms_by_type.get(room_type, [])))
+            if room_type in rooms_by_type or req['room_mode'] == 'any':
+                req['room_pool'] = tuple(sorted(options))
+                req['room_options'] = options
+                for roomid in options:
+                    pools_of_room[roomid].add(req['room_pool'])
+
+        def mark_rooms(roomids, day, slots):
+            # A concrete room in use takes one place from every pool containing it
+            for roomid in roomids:
+                for pool in pools_of_room.get(roomid, ()):
+                    for t in slots:
+                        pool_load[(pool, day, t)] += 1
+
+        used_days_per_course = defaultdict(set)
+        for c in self.schedule:
+            used_days_per_course[(c['section'], c['ClassID'])].add(c['day'])
+            mark_rooms(c['roomid'] if isinstance(c['roomid'], list) else [c['roomid']], c['day'],
+                       range(c['start_time'], c['end_time'], slot_step))
+        pool_capacity = {req['room_pool']: sum(self._capacity('room', roomid) for roomid in req['room_pool'])
+                         for req in requests if 'room_pool' in req}
+        # Meeting patterns first, then most constrained: fewest allowed days, then longest
+        requests.sort(key=lambda r: ('patterns' not in r, len(r['days']), -r['duration']))
+        for req in requests:
+            course_key = (req['section'], req['ClassID'])
+            used = used_days_per_course[course_key]
+            listed = req['roomid'] if isinstance(req['roomid'], list) else [req['roomid']]
+            # Pools this session takes a place from: its own, or those of each room it occupies
+            pools = [req['room_pool']] if 'room_pool' in req else sorted({p for r in listed for p in pools_of_room.get(r, ())})
+            # (days, start) choices: one day per choice, or all days of a meeting pattern
+            if 'patterns' in req:
+                choices = [(days, t) for days in req['patterns'] if used.isdisjoint(days)
+                           for t in self._pattern_starts(req, days)]
+            else:
+                choices = [((day,), t) for day in req['days'] if day not in used
+                           for t in self._candidate_starts(req, day)]
+            for days, start_time in choices:
+                slots = range(start_time, start_time + req['duration'], slot_step)
+                if any(pool_load[(pool, day, t)] >= pool_capacity[pool] for pool in pools for day in days for t in slots):
+                    continue
+                if not all(self._is_time_free(req, day, start_time) for day in days):
+                    continue
+                if 'room_pool' not in req and any(self._room_busy(roomid, day, start_time, req['duration'])
+                                                  for roomid in listed for day in days):
+                    continue
+                for day in days:
+                    class_info = self._new_class_info(req, day, start_time)
+                    if 'room_pool' in req:
+                        for t in slots:
+                            pool_load[(req['room_pool'], day, t)] += 1
+                        class_info['roomid'] = []
+                        class_info['room_mode'] = 'any'
+                        class_info['room_options'] = req['room_options']
+                    else:
+                        mark_rooms(listed, day, slots)
+                    if 'patterns' in req:
+                        class_info['pattern'] = pattern_label(days)
+                    self._register_class(class_info)
+                    used.add(day)
+                break
+            else:
+                self.unscheduled_classes.append(self._unscheduled_entry(req))
+        self.assign_rooms_by_matching()
+        return self.schedule
+
+
+    def schedule_gap_penalty(self, schedule=None) -> int:
+        """Total idle minutes between consecutive classes of each section on each day."""
+        by_section_day = defaultdict(list)
+        for c in (self.schedule if schedule is None else schedule):
+            for section in self._sections_of(c):
+                by_section_day[(section, c.get('day'))].append((c['start_time'], c['start_time'] + c['duration']))
+        penalty = 0
+        for blocks in by_section_day.values():
+            blocks.sort()
+            for (_, prev_end), (start, _) in zip(blocks, blocks[1:]):
+                penalty += max(0, start - prev_end)
+        return penalty
+
+    def _blocking_classes(self, req, day, start_time) -> list:
+        """Placed classes whose section, employee or concrete room overlaps a request at (day, start_time)."""
+        blocking = {}
+        lists = [self.sections.get(section, []) for section in req['sections']] + [self.employees.get(req['employee_id'], [])]
+        if req.get('room_mode') != 'any':
+            roomids = req['roomid'] if isinstance(req['roomid'], list) else [req['roomid']]
+            lists += [self.room_schedules.get(roomid, []) for roomid in roomids]
+        for classes in lists:
+            for c in classes:
+                if c.get('day') == day and self.is_time_conflict(start_time, req['duration'], c['start_time'], c['duration']):
+                    blocking[id(c)] = c
+        return list(blocking.values())
+
+    def _grasp_pass(self, requests, rng, alpha: float = 0.1, repair_budget: int = 200) -> list:
+        """
+        One GRASP construction on an empty schedule. Requests are taken in a randomized
+        most-constrained-first order (uniform pick among the first alpha share of the rest),
+        and each gets a random (day, start) among the alpha share of its cheapest placements
+        (least loaded section day, then earliest start). A short repair then retries every
+        failure by moving one blocking class elsewhere, within repair_budget probes.
+        Returns the requests left unplaced.
+        """
+        requests, pattern_failed = self._place_fixed(requests)
+        used_days = defaultdict(set)
+        for c in self.schedule:
+            used_days[(c['section'], c['ClassID'])].add(c['day'])
+        req_of = {}  # id(class_info) -> request, so blocking classes can be moved again
+
+        def place(req, day, start_time):
+            class_info = self._new_class_info(req, day, start_time)
+            self._register_class(class_info)
+            used_days[(req['section'], req['ClassID'])].add(day)
+            req_of[id(class_info)] = req
+            return class_info
+
+        def unplace(class_info):
+            self._unregister_class(class_info)
+            used_days[(class_info['section'], class_info['ClassID'])].discard(class_info['day'])
+
+        failed = []
+        order = sorted(requests, key=lambda r: (len(r['days']), -r['duration']))
+        while order:
+            req = order.pop(rng.randrange(max(1, int(alpha * len(order)))))
+            course_key = (req['section'], req['ClassID'])
+            day_load = self._count_section_classes_per_day(req['section'])
+            candidates = [
+                (day_load.get(day, 0), start_time, day)
+                for day in req['days'] if day not in used_days[course_key]
+                for start_time in self._candidate_starts(req, day)
+                if self._is_slot_free(req, day, start_time)
+            ]
+            if not candidates:
+                failed.append(req)
+                continue
+            candidates.sort()
+            _, start_time, day = rng.choice(candidates[:max(1, math.ceil(alpha * len(candidates)))])
+            place(req, day, start_time)
+
+        leftover = []
+        for req in failed:
+            course_key = (req['section'], req['ClassID'])
+            repaired = False
+            for day in req['days']:
+                if repaired or repair_budget <= 0:
+                    break
+                if day in used_days[course_key]:
+                    continue
+                for start_time in self._candidate_starts(req, day):
+                    repair_budget -= 1
+                    if repair_budget < 0:
+                        break
+                    blocking = self._blocking_classes(req, day, start_time)
+                    if len(blocking) != 1 or id(blocking[0]) not in req_of:
+                        continue
+                    blocker, blocker_req = blocking[0], req_of[id(blocking[0])]
+                    unplace(blocker)
+                    if self._is_slot_free(req, day, start_time):
+                        class_info = place(req, day, start_time)
+                        blocker_key = (blocker_req['section'], blocker_req['ClassID'])
+                        for blocker_day in blocker_req['days']:
+                            if blocker_day in used_days[blocker_key]:
+                                continue
+                            blocker_start = self._find_free_start(blocker_req, blocker_day)
+                            if blocker_start is not None:
+                                place(blocker_req, blocker_day, blocker_start)
+                                repaired = True
+                                break
+                        if repaired:
+                            break
+                        unplace(class_info)
+                    # Undo: put the blocking class back where it was
+                    self._register_class(blocker)
+                    used_days[(blocker['section'], blocker['ClassID'])].add(blocker['day'])
+            if not repaired:
+                leftover.append(req)
+        return pattern_failed + leftover
+
+    def generate_schedule_grasp(self, class_data, iterations: int = 16, alpha: float = 0.1,
+                                max_workers: Optional[int] = None, seed: Optional[int] = None) -> list:
+        """
+        GRASP: run `iterations` randomized greedy constructions (see _grasp_pass), each with
+        its own seed, in a process pool and keep the one with the fewest unscheduled sessions
+        (ties broken by schedule_gap_penalty). The unscheduled count of every construction is
+        kept in self.grasp_distribution.
+        """
+        class_data = self._prepare_run(class_data)
+        requests = self._collect_requests(class_data)
+        base_seed = random.randrange(1 << 30) if seed is None else seed
+        jobs = [(requests, base_seed + i, alpha, self.slot_quantum, self._settings()) for i in range(iterations)]
+        if max_workers == 1 or len(jobs) <= 1:
+            results = [_grasp_construct(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(_grasp_construct, jobs))
+        distribution = defaultdict(int)
+        for schedule, unscheduled in results:
+            distribution[len(unscheduled)] += 1
+        self.grasp_distribution = dict(sorted(distribution.items()))
+        schedule, unscheduled = min(results, key=lambda r: (len(r[1]), self.schedule_gap_penalty(r[0])))
+        self.schedule = schedule
+        self._rebuild_indexes()
+        self.conflicts = []
+        self.unscheduled_classes = list(self.infeasible_requests) + unscheduled
+        print(f"GRASP: {iterations} constructions, unscheduled per run {self.grasp_distribution}, "
+              f"best {len(unscheduled)}")
+        return self.schedule
+
+    def generate_schedule_dsatur(self, class_data) -> list:
+        """
+        DSatur-style conflict-graph coloring. Sessions are vertices, joined when they share a
+        section, an employee or a room (any-of pools are left to assign_rooms_by_matching).
+        A color is a (day, start) slot from the start table, and two neighbours only clash when
+        their time ranges overlap on the same day (or, for the same course, share the day).
+        The uncolored session with the fewest feasible slots left, then the highest degree, is
+        colored next with its least loaded day and earliest start.
+        The result is an ordinary self.schedule: a starting point for global_repair_schedule,
+        or a GA seed through genetic_scheduler.schedule_to_chromosome.
+        """
+        class_data = self._prepare_run(class_data)
+        self.schedule = []
+        self._rebuild_indexes()
+        self.conflicts = []
+        requests, failed_patterns = self._place_fixed(self._collect_requests(class_data))
+        self.unscheduled_classes = list(self.infeasible_requests) + [self._unscheduled_entry(r) for r in failed_patterns]
+        members = defaultdict(list)
+        for idx, req in enumerate(requests):
+            for section in req['sections']:
+                members[('section', section)].append(idx)
+            if self._capacity('employee', req['employee_id']) == 1:
+                members[('employee', req['employee_id'])].append(idx)
+            if req['room_mode'] != 'any':
+                roomids = req['roomid'] if isinstance(req['roomid'], list) else [req['roomid']]
+                for roomid in roomids:
+                    if self._capacity('room', roomid) == 1:
+                        members[('room', roomid)].append(idx)
+        neighbors = [set() for _ in requests]
+        for group in members.values():
+            for idx in group:
+                neighbors[idx].update(group)
+        for idx, adjacent in enumerate(neighbors):
+            adjacent.discard(idx)
+        domains = [
+            {(day, t) for day in req['days'] for t in self._candidate_starts(req, day)}
+            for req in requests
+        ]
+        heap = [(len(domains[idx]), -len(neighbors[idx]), idx) for idx in range(len(requests))]
+        heapq.heapify(heap)
+        done = set()
+        while heap:
+            size, _, idx = heapq.heappop(heap)
+            if idx in done or size != len(domains[idx]):
+                continue  # stale entry, the session was colored or its domain shrank since
+            done.add(idx)
+            req = requests[idx]
+            day_load = self._count_section_classes_per_day(req['section'])
+            for day, start_time in sorted(domains[idx], key=lambda color: (day_load.get(color[0], 0), color[1], color[0])):
+                if self._is_slot_free(req, day, start_time):
+                    break
+            else:
+                self.unscheduled_classes.append(self._unscheduled_entry(req))
+                continue
+            self._register_class(self._new_class_info(req, day, start_time))
+            end_time = start_time + req['duration']
+            for other in neighbors[idx]:
+                if other in done:
+                    continue
+                other_req = requests[other]
+                domain = domains[other]
+                before = len(domain)
+                same_course = (other_req['section'], other_req['ClassID']) == (req['section'], req['ClassID'])
+                for t in self.start_table.starts(other_req['duration'], other_req['type'], day):
+                    if same_course or (t < end_time and start_time < t + other_req['duration']):
+                        domain.discard((day, t))
+                if len(domain) != before:
+                    heapq.heappush(heap, (len(domain), -len(neighbors[other]), other))
+        self.assign_rooms_by_matching()
+        return self.schedule
+
+    def _match_requests(self, requests) -> tuple:
+        """
+        Pair the placed classes with the requests they came from. Returns ({id(class_info): request},
+        [requests with no placed class]).
+        """
+        placed = defaultdict(list)
+        for c in self.schedule:
+            if self._is_movable(c):
+                placed[(c['section'], c['ClassID'], c['employee_id'], c['duration'])].append(c)
+        req_of = {}
+        unplaced = []
+        for req in requests:
+            bucket = placed[(req['section'], req['ClassID'], req['employee_id'], req['duration'])]
+            if bucket:
+                req_of[id(bucket.pop())] = req
+            else:
+                unplaced.append(req)
+        return req_of, unplaced
+
+    def _place_request(self, req, day, start_time):
+        """
+        Register a request at (day, start_time) if the slot is free and return the class, else None.
+        Any-of requests get a concrete room free for the whole session right away.
+        """
+        if not self._is_time_free(req, day, start_time):
+            return None
+        class_info = self._new_class_info(req, day, start_time)
+        if req.get('room_mode') == 'any':
+            room = next((r for r in class_info['room_options']
+                         if not self._room_busy(r, day, start_time, req['duration'])), None)
+            if room is None:
+                return None
+            class_info['roomid'] = [room]
+        elif any(self._room_busy(roomid, day, start_time, req['duration']) for roomid in class_info['roomid']):
+            return None
+        self._register_class(class_info)
+        return class_info
+
+    def _solve_subproblem(self, requests, node_budget: int = 2000) -> tuple:
+        """
+        Budgeted backtracking of requests against the rest of the schedule, which stays fixed.
+        Requests go most constrained first, each trying its start-table slots and finally being
+        left out, so the search keeps the best partial assignment met within node_budget nodes:
+        most requests placed, then the smallest gap penalty of their sections.
+        Places that assignment and returns ([(class_info, request)], requests left out).
+        """
+        requests = sorted(requests, key=lambda r: (len(r['days']), -r['duration']))
+        sections = {req['section'] for req in requests}
+        budget = [node_budget]
+        best = [(-1, 0), []]
+        path = []
+
+        def course_days(req):
+            return {c['day'] for c in self.sections.get(req['section'], []) if c['ClassID'] == req['ClassID']}
+
+        def dfs(idx, placed):
+            if budget[0] <= 0 or placed + len(requests) - idx < best[0][0]:
+                return
+            budget[0] -= 1
+            if idx == len(requests):
+                gap = self.schedule_gap_penalty([c for s in sections for c in self.sections.get(s, [])])
+                if (placed, -gap) > best[0]:
+                    best[0] = (placed, -gap)
+                    best[1] = [(c['day'], c['start_time'], r) for c, r in path]
+                return
+            req = requests[idx]
+            used = course_days(req)
+            for day in req['days']:
+                if day in used:
+                    continue
+                for start_time in self._candidate_starts(req, day):
+                    class_info = self._place_request(req, day, start_time)
+                    if class_info is None:
+                        continue
+                    path.append((class_info, req))
+                    dfs(idx + 1, placed + 1)
+                    path.pop()
+                    self._unregister_class(class_info)
+                    if budget[0] <= 0:
+                        return
+            dfs(idx + 1, placed)
+
+        dfs(0, 0)
+        placed = [(self._place_request(req, day, start_time), req) for day, start_time, req in best[1]]
+        chosen = {id(req) for _, _, req in best[1]}
+        return placed, [req for req in requests if id(req) not in chosen]
+
+    def improve_schedule_lns(self, class_data, iterations: int = 200, node_budget: int = 2000,
+                             seed: Optional[int] = None) -> list:
+        """
+        Large-neighborhood search on the current schedule. Each iteration frees one structured
+        neighborhood (a section's week, an employee's day or a room's day) together with the
+        unscheduled sessions that belong to it, and re-solves just that part with budgeted
+        backtracking (_solve_subproblem). The move is kept when it lowers the unscheduled count,
+        or keeps it and lowers the section gap penalty; otherwise the old classes are restored.
+        """
+        class_data = self._prepare_run(class_data)
+        rng = random.Random(seed)
+        req_of, unplaced = self._match_requests([r for r in self._collect_requests(class_data) if self._is_searched(r['orig_sched'])])
+        start_unscheduled, start_gap = len(unplaced), self.schedule_gap_penalty()
+        accepted = 0
+        for _ in range(iterations):
+            if not self.schedule and not unplaced:
+                break
+            kind = rng.choice(['section', 'employee_day', 'room_day'])
+            if unplaced and (not self.schedule or rng.random() < 0.7):
+                anchor = rng.choice(unplaced)
+                day = rng.choice(anchor['days'])
+                rooms = anchor['roomid'] if isinstance(anchor['roomid'], list) else [anchor['roomid']]
+            else:
+                anchor = rng.choice(self.schedule)
+                day = anchor['day']
+                rooms = anchor['roomid'] or anchor.get('room_options', [])
+            if kind == 'section':
+                removed = list(self.sections.get(anchor['section'], []))
+                freed = [r for r in unplaced if r['section'] == anchor['section']]
+            elif kind == 'employee_day':
+                removed = [c for c in self.employees.get(anchor['employee_id'], []) if c['day'] == day]
+                freed = [r for r in unplaced if r['employee_id'] == anchor['employee_id'] and day in r['days']]
+            else:
+                if not rooms:
+                    continue
+                room = rng.choice(rooms)
+                removed = [c for c in self.room_schedules.get(room, []) if c['day'] == day]
+                freed = [r for r in unplaced if day in r['days'] and
+                         room in (r['roomid'] if isinstance(r['roomid'], list) else [r['roomid']])]
+            removed = [c for c in removed if id(c) in req_of]
+            if not removed and not freed:
+                continue
+            sections = {c['section'] for c in removed} | {r['section'] for r in freed}
+
+            def local_gap():
+                return self.schedule_gap_penalty([c for s in sections for c in self.sections.get(s, [])])
+
+            before = (len(freed), local_gap())
+            for c in removed:
+                self._unregister_class(c)
+            placed, left = self._solve_subproblem([req_of[id(c)] for c in removed] + freed, node_budget)
+            if (len(left), local_gap()) < before:
+                accepted += 1
+                for c in removed:
+                    del req_of[id(c)]
+                freed_ids = {id(r) for r in freed}
+                unplaced = [r for r in unplaced if id(r) not in freed_ids] + left
+                for class_info, req in placed:
+                    req_of[id(class_info)] = req
+            else:
+                for class_info, _ in placed:
+                    self._unregister_class(class_info)
+                for c in removed:
+                    self._register_class(c)
+        self.unscheduled_classes = list(self.infeasible_requests) + [self._unscheduled_entry(r) for r in unplaced]
+        print(f"LNS: {accepted}/{iterations} moves accepted, unscheduled {start_unscheduled} -> {len(unplaced)}, "
+              f"gap penalty {start_gap} -> {self.schedule_gap_penalty()} min")
+        return self.schedule
+
+def hopcroft_karp(adjacency: Dict) -> Dict:
+    """
+    Maximum bipartite matching. adjacency maps each left vertex to the right vertices it
+    may be matched with; returns {left: right} for the matched pairs.
+    """
+    match_left = {}
+    match_right = {}
+    dist = {}
+
+    def bfs():
+        queue = [u for u in adjacency if u not in match_left]
+        for u in adjacency:
+            dist[u] = 0 if u not in match_left else None
+        found = False
+        for u in queue:
+            for v in adjacency[u]:
+                w = match_right.get(v)
+                if w is None:
+                    found = True
+                elif dist[w] is None:
+                    dist[w] = dist[u] + 1
+                    queue.append(w)
+        return found
+
+    def dfs(u):
+        for v in adjacency[u]:
+            w = match_right.get(v)
+            if w is None or (dist[w] == dist[u] + 1 and dfs(w)):
+                match_left[u] = v
+                match_right[v] = u
+                return True
+        dist[u] = None
+        return False
+
+    while bfs():
+        for u in adjacency:
+            if u not in match_left:
+                dfs(u)
+    return match_left
+
+
+# Content hashes of the last per-entity export, {file name: sha256}
+EXCEL_MANIFEST = '.export_manifest.json'
+WEEKLY_MANIFEST = '.weekly_manifest.json'
+
+
+def _content_hash(*parts) -> str:
+    """Stable sha256 of the JSON form of an export's content."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _load_export_manifest(path) -> dict:
+    """Hashes of the previous export, or {} when there is none or it cannot be read."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_export_manifest(path, manifest):
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def _prune_stale_exports(previous, manifest, output_dir):
+    """Delete the files the previous manifest lists that the new one no longer has (entities gone from the schedule)."""
+    for name in sorted(set(previous) - set(manifest)):
+        path = os.path.join(output_dir, name)
+        # Only plain file names written by the export itself, never a path taken from a damaged manifest
+        if os.path.basename(name) == name and os.path.isfile(path):
+            os.remove(path)
+            print(f"Removed stale export {path}")
+
+
+def _render_schedule_workbook(filename, entries, layout):
+    """Build a timetable workbook (see _build_schedule_workbook) and save it to filename."""
+    _build_schedule_workbook(entries, layout).save(filename)
+    print(f"\nSchedule exported to Excel file: {filename}")
+
+
+def _build_schedule_workbook(entries, layout) -> Workbook:
+    """
+    One weekly timetable workbook: a row per slot of the layout, a column per day,
+    and one merged, colored cell per entry of AdvancedSchoolScheduler._excel_entries.
+    """
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Schedule"
+    days = ['Time'] + list(WEEK_DAYS)
+    day_to_col = {day: idx+2 for idx, day in enumerate(days[1:])}
+    for col, day in enumerate(days, 1):
+        cell = ws.cell(row=1, column=col)
+        cell.value = day
+        cell.fill = HEADER_FILL
+        cell.alignment = CENTER_ALIGN
+        cell.border = THIN_BORDER
+    # One row per slot of the run's grid, wide enough for every placed class
+    quantum = layout['quantum']
+    first_slot = layout['first_slot']
+    time_slots = layout['time_labels']
+    for idx, time_slot in enumerate(time_slots):
+        cell = ws.cell(row=idx+2, column=1)
+        cell.value = time_slot
+        cell.alignment = CENTER_ALIGN
+        cell.border = THIN_BORDER
+    merged_tracker = set()
+    for start_time, duration, days_list, class_text, coursename in entries:
+        slot, last_slot = slot_range(start_time, duration, quantum)
+        if not 0 <= slot - first_slot < len(time_slots):
+            continue
+        start_row = slot - first_slot + 2
+        end_row = start_row + max(1, last_slot - slot) - 1
+        # Shared fills; only courses with a fixed color are filled
+        color_fill = course_fill(coursename, palette=())
+        for day in days_list:
+            col = day_to_col.get(day, 2)
+            # Check if all cells in the intended merge range are empty and not already merged
+            can_merge = True
+            for row in range(start_row, end_row + 1):
+                cell = ws.cell(row=row, column=col)
+                cell_key = (row, col)
+                if cell.value not in (None, "") or cell_key in merged_tracker:
+                    can_merge = False
+                    break
+            if can_merge:
+                # Mark all cells as merged
+                for row in range(start_row, end_row + 1):
+                    merged_tracker.add((row, col))
+                ws.merge_cells(start_row=start_row, start_column=col, end_row=end_row, end_column=col)
+                cell = ws.cell(row=start_row, column=col)
+                cell.value = class_text
+                if color_fill:
+                    cell.fill = color_fill
+                cell.alignment = CENTER_ALIGN
+                cell.border = THIN_BORDER
+                # Fill merged cells with style only (no value)
+                for row in range(start_row + 1, end_row + 1):
+                    cell = ws.cell(row=row, column=col)
+                    if color_fill:
+                        cell.fill = color_fill
+                    cell.alignment = CENTER_ALIGN
+                    cell.border = THIN_BORDER
+    for col in range(1, len(days) + 1):
+        ws.column_dimensions[get_column_letter(col)].width = 25
+    for row in range(1, len(time_slots) + 2):
+        ws.row_dimensions[row].height = 50
+    return wb
+
+
+def _add_schedule_styles(wb):
+    """Register the named styles of the streamed schedule sheets: header, time column, and one per class color."""
+    wb.add_named_style(NamedStyle(name='schedule_header', fill=HEADER_FILL, alignment=CENTER_ALIGN, border=THIN_BORDER))
+    wb.add_named_style(NamedStyle(name='schedule_time', alignment=CENTER_ALIGN, border=THIN_BORDER))
+    wb.add_named_style(NamedStyle(name='schedule_class', alignment=CENTER_ALIGN, border=THIN_BORDER))
+    for color in sorted(set(COURSE_COLORS.values())):
+        wb.add_named_style(NamedStyle(name=f'schedule_class_{color}', fill=solid_fill(color),
+                                      alignment=CENTER_ALIGN, border=THIN_BORDER))
+
+
+def _stream_schedule_sheet(wb, title, entries, layout):
+    """
+    Append one timetable sheet to a write-only workbook, laid out like _build_schedule_workbook.
+    Only this sheet's cell map is held in memory; rows are streamed in order and the merged
+    ranges are recorded for the sheet's tail.
+    """
+    ws = wb.create_sheet(title)
+    for col in range(1, len(WEEK_DAYS) + 2):
+        ws.column_dimensions[get_column_letter(col)].width = 25
+    ws.sheet_format = SheetFormatProperties(defaultRowHeight=50, customHeight=True)
+    quantum = layout['quantum']
+    first_slot = layout['first_slot']
+    time_slots = layout['time_labels']
+    day_to_col = {day: idx + 2 for idx, day in enumerate(WEEK_DAYS)}
+    cells = {}  # (row, col) -> (value, style name)
+    for start_time, duration, days_list, class_text, coursename in entries:
+        slot, last_slot = slot_range(start_time, duration, quantum)
+        if not 0 <= slot - first_slot < len(time_slots):
+            continue
+        start_row = slot - first_slot + 2
+        end_row = start_row + max(1, last_slot - slot) - 1
+        color = course_color(coursename, palette=())
+        style = f'schedule_class_{color}' if color else 'schedule_class'
+        for day in days_list:
+            col = day_to_col.get(day, 2)
+            if any((row, col) in cells for row in range(start_row, end_row + 1)):
+                continue
+            cells[(start_row, col)] = (class_text, style)
+            for row in range(start_row + 1, end_row + 1):
+                cells[(row, col)] = (None, style)
+            if end_row > start_row:
+                ws.merged_cells.add(CellRange(min_col=col, min_row=start_row, max_col=col, max_row=end_row))
+
+    def styled(value, style):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+
+    ws.append([styled(day, 'schedule_header') for day in ('Time',) + WEEK_DAYS])
+    for idx, time_slot in enumerate(time_slots):
+        row = [styled(time_slot, 'schedule_time')]
+        for col in range(2, len(WEEK_DAYS) + 2):
+            entry = cells.get((idx + 2, col))
+            row.append(styled(*entry) if entry else None)
+        ws.append(row)
+    # Finish the sheet's XML now instead of keeping its writer open until the workbook is saved
+    ws.close()
+
+
+def _export_workbook(job):
+    """
+    Process-pool worker: render one workbook from (filename, entries, layout, in_memory).
+    Returns (filename, seconds, data): the .xlsx bytes when in_memory, else None after saving to filename.
+    """
+    filename, entries, layout, in_memory = job
+    started = time.perf_counter()
+    data = None
+    if in_memory:
+        buffer = io.BytesIO()
+        _build_schedule_workbook(entries, layout).save(buffer)
+        data = buffer.getvalue()
+    else:
+        _render_schedule_workbook(filename, entries, layout)
+    return filename, time.perf_counter() - started, data
+
+
+def _place_day(job):
+    """Process-pool worker: place the times of one day's requests, longest first, around the fixed classes."""
+    day, requests, settings, fixed = job
+    scheduler = AdvancedSchoolScheduler(**settings)
+    scheduler._set_slot_quantum(compute_slot_quantum([req['duration'] for req in requests] +
+                                                     [v for c in fixed for v in (c['start_time'], c['duration'])],
+                                                     window_boundaries({req['type'] for req in requests}, scheduler.day_windows)))
+    for class_info in fixed:
+        scheduler._register_class(class_info)
+    failed = []
+    for req in sorted(requests, key=lambda r: -r['duration']):
+        start_time = scheduler._find_free_start(req, day)
+        if start_time is None:
+            failed.append(req)
+        else:
+            scheduler._register_class(scheduler._new_class_info(req, day, start_time))
+    return scheduler.schedule[len(fixed):], failed
+
+
+def _solve_component(job):
+    """Process-pool worker: schedule one independent component with a fresh scheduler."""
+    engine, class_data, settings, log_file = job
+    scheduler = AdvancedSchoolScheduler(**settings)
+    scheduler.log_file = log_file
+    scheduler.run_engine(engine, class_data)
+    return scheduler.schedule, scheduler.unscheduled_classes, scheduler.conflicts, scheduler.infeasible_requests
+
+def _grasp_construct(job):
+    """Process-pool worker: one seeded GRASP construction with its short repair."""
+    requests, seed, alpha, quantum, settings = job
+    scheduler = AdvancedSchoolScheduler(**settings)
+    scheduler._set_slot_quantum(quantum)
+    failed = scheduler._grasp_pass(requests, random.Random(seed), alpha)
+    scheduler.assign_rooms_by_matching()
+    unscheduled = [scheduler._unscheduled_entry(req) for req in failed] + scheduler.unscheduled_classes
+    return scheduler.schedule, unscheduled
+
 def main():
     # Your class data
     class_data = [
@@ -1661,6 +3141,10 @@ def main():
     ]
 
     scheduler = AdvancedSchoolScheduler()
+    # Report provably impossible requests up front; every engine below skips them
+    infeasible = scheduler.analyze_infeasibility(class_data)
+    for entry in infeasible:
+        print(f"Skipping impossible request {entry['coursename'] or entry['ClassID']} (Section {entry['section']}): {entry['reason']}")
     max_attempts = 10
     attempt = 0
     success = False
@@ -1683,7 +3167,10 @@ def main():
         success = scheduler.global_repair_schedule(class_data)
         scheduler.log_strict_schedule_results(class_data, log_filename='logs.txt')
     if success:
-        print("All classes scheduled! Exporting to Excel...")
+        if infeasible:
+            print(f"All feasible classes scheduled ({len(infeasible)} impossible requests skipped). Exporting to Excel...")
+        else:
+            print("All classes scheduled! Exporting to Excel...")
         scheduler.export_all_excel_schedules()
     else:
         print("Could not schedule all classes after all attempts and global repair. See logs.txt for details.")
@@ -0,0 +1,70 @@
+"""
+Shared openpyxl styles, course colors and time-label rows for the Excel exporters.
+Everything here is built once per process and reused by every workbook written.
+"""
+
+from functools import lru_cache
+from zlib import crc32
+
+from openpyxl.styles import PatternFill, Alignment, Border, Side
+
+from time_grid import slot_label
+
+# Fixed cell colors by a substring of the course name (first match wins)
+COURSE_COLORS = {
+    'GE Entrep': '92D050',
+    'GE USELF': 'FF69B4',
+    'GE ArtApp': '00B0F0',
+    'GE LITE': 'FFA500',
+    'NSTP': 'FFFF00',
+    'PE': 'FFFF00',
+}
+# Colors for the other courses, picked by a stable hash of the course name
+COLOR_PALETTE = (
+    'FFB6C1', 'ADD8E6', '90EE90', 'FFD700', 'FFA07A', '20B2AA', '9370DB', 'F08080', 'E0FFFF', 'FFE4E1',
+    'B0E0E6', 'FF6347', '4682B4', 'D2B48C', '9ACD32', '40E0D0', 'FF69B4', 'CD5C5C', '00CED1', '1E90FF',
+    'B22222', 'FF7F50', '6A5ACD', '00FA9A', '7B68EE', '00FF7F', 'DC143C', '00BFFF', 'FF8C00', '8A2BE2',
+)
+WEEK_DAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+HEADER_FILL = PatternFill(start_color='E0E0E0', end_color='E0E0E0', fill_type='solid')
+CENTER_ALIGN = Alignment(horizontal='center', vertical='center', wrap_text=True)
+THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+
+
+@lru_cache(maxsize=None)
+def solid_fill(color) -> PatternFill:
+    """The one solid PatternFill of a hex color."""
+    return PatternFill(start_color=color, end_color=color, fill_type='solid')
+
+
+@lru_cache(maxsize=None)
+def course_color(coursename, palette=COLOR_PALETTE):
+    """
+    Hex color of a course: its COURSE_COLORS match, else a palette entry chosen by the crc32
+    of the name, so a course has the same color in every file and every run. None when
+    nothing matches and the palette is empty.
+    """
+    for course_type, color in COURSE_COLORS.items():
+        if course_type in coursename:
+            return color
+    if not palette:
+        return None
+    return palette[crc32(coursename.encode('utf-8')) % len(palette)]
+
+
+def course_fill(coursename, palette=COLOR_PALETTE):
+    """Shared fill of a course's color, or None when it has none (see course_color)."""
+    color = course_color(coursename, palette)
+    return solid_fill(color) if color else None
+
+
+@lru_cache(maxsize=None)
+def time_labels(grid_start, grid_end, quantum) -> tuple:
+    """Row labels of a grid from grid_start to grid_end in quantum-minute slots ('8:00 AM - 8:30 AM', ...)."""
+    return tuple(slot_label(t, quantum) for t in range(grid_start, grid_end, quantum))
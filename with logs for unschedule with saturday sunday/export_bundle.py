@@ -0,0 +1,75 @@
+"""
+Single-archive output for the per-entity exports.
+Instead of hundreds of loose files, every generated CSV and workbook goes into one zip
+archive together with a manifest.json describing each member.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import zipfile
+
+
+class ExportBundle:
+    """
+    Collects export files in memory and writes them as one zip archive. The archive is
+    assembled in a memory buffer and written to disk with one sequential write on close.
+    manifest.json lists every member: entity kind and id, member path, number of scheduled
+    entries in the member, data row count (CSV members) and sha256 of the member's bytes.
+
+        with ExportBundle('schedules.zip') as bundle:
+            bundle.add_csv('section_2A_weekly.csv', rows, 'section', '2A', entries=12)
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.entries = []
+        self._buffer = io.BytesIO()
+        self._zip = zipfile.ZipFile(self._buffer, 'w', zipfile.ZIP_DEFLATED)
+
+    def add(self, path, data: bytes, kind, key, entries, rows=None):
+        """
+        Add one member holding entries scheduled classes (and rows data rows, for a CSV);
+        workbooks are stored as-is since .xlsx is already compressed.
+        """
+        compress_type = zipfile.ZIP_STORED if path.endswith('.xlsx') else zipfile.ZIP_DEFLATED
+        self._zip.writestr(path, data, compress_type=compress_type)
+        entry = {
+            'kind': kind,
+            'id': key,
+            'path': path,
+            'entries': entries,
+        }
+        if rows is not None:
+            entry['rows'] = rows
+        entry['sha256'] = hashlib.sha256(data).hexdigest()
+        self.entries.append(entry)
+
+    def add_csv(self, path, rows, kind, key, entries):
+        """Add a CSV member from its rows, the first of which is the header."""
+        text = io.StringIO(newline='')
+        writer = csv.writer(text)
+        count = -1
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        self.add(path, text.getvalue().encode('utf-8'), kind, key, entries, max(count, 0))
+
+    def close(self):
+        """Write manifest.json, finish the archive and flush it to filename."""
+        manifest = {'files': self.entries}
+        self._zip.writestr('manifest.json', json.dumps(manifest, indent=2, default=str))
+        self._zip.close()
+        with open(self.filename, 'wb') as f:
+            f.write(self._buffer.getbuffer())
+        print(f"\nExported {len(self.entries)} files to bundle {self.filename}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._zip.close()
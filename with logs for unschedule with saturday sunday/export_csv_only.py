@@ -9,8 +9,29 @@ This script exports the sample data into separate CSV files:
 
 import csv
 import os
-import datetime
+from collections import defaultdict
 from sample_data import sample_class_data, employee_info, rooms
+from time_grid import parse_clock, format_ampm, slot_label
+from export_bundle import ExportBundle
+
+_buckets = None
+
+def entity_buckets():
+    """
+    (course, classschedule entry) pairs of sample_class_data grouped by section, room and
+    employee, in data order: {'section': {id: [...]}, 'room': {...}, 'employee': {...}}.
+    Built on first use with a single pass over the data.
+    """
+    global _buckets
+    if _buckets is None:
+        _buckets = {'section': defaultdict(list), 'room': defaultdict(list), 'employee': defaultdict(list)}
+        for section_data in sample_class_data:
+            for course in section_data['Courses']:
+                for sched in course['classschedule']:
+                    _buckets['section'][course['section']].append((course, sched))
+                    _buckets['room'][sched['roomid']].append((course, sched))
+                    _buckets['employee'][sched['employeeid']].append((course, sched))
+    return _buckets
 
 def export_section_csvs():
     """Export one CSV file per section"""
@@ -49,14 +70,8 @@ def export_room_csvs():
     """Export one CSV file per room"""
     print("\nExporting room CSV files...")
     
-    # Get all unique rooms from the data
-    all_rooms = set()
-    for section_data in sample_class_data:
-        for course in section_data['Courses']:
-            for schedule in course['classschedule']:
-                all_rooms.add(schedule['roomid'])
-    
-    for room_id in sorted(all_rooms):
+    room_buckets = entity_buckets()['room']
+    for room_id in sorted(room_buckets):
         filename = f"room_{room_id.replace(' ', '_')}_weekly.csv"
         
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
@@ -65,21 +80,18 @@ def export_room_csvs():
             
             writer.writeheader()
             
-            for section_data in sample_class_data:
-                for course in section_data['Courses']:
-                    for schedule in course['classschedule']:
-                        if schedule['roomid'] == room_id:
-                            row = {
-                                'ClassID': course['ClassID'],
-                                'coursename': course['coursename'],
-                                'section': course['section'],
-                                'duration': schedule['duration'],
-                                'roomid': schedule['roomid'],
-                                'roomtype': schedule['roomtype'],
-                                'employeeid': schedule['employeeid'],
-                                'day': schedule['day']
-                            }
-                            writer.writerow(row)
+            for course, schedule in room_buckets[room_id]:
+                row = {
+                    'ClassID': course['ClassID'],
+                    'coursename': course['coursename'],
+                    'section': course['section'],
+                    'duration': schedule['duration'],
+                    'roomid': schedule['roomid'],
+                    'roomtype': schedule['roomtype'],
+                    'employeeid': schedule['employeeid'],
+                    'day': schedule['day']
+                }
+                writer.writerow(row)
         
         print(f"Created: {filename}")
 
@@ -87,14 +99,8 @@ def export_employee_csvs():
     """Export one CSV file per employee"""
     print("\nExporting employee CSV files...")
     
-    # Get all unique employees from the data
-    all_employees = set()
-    for section_data in sample_class_data:
-        for course in section_data['Courses']:
-            for schedule in course['classschedule']:
-                all_employees.add(schedule['employeeid'])
-    
-    for employee_id in sorted(all_employees):
+    employee_buckets = entity_buckets()['employee']
+    for employee_id in sorted(employee_buckets):
         filename = f"employee_{employee_id}_weekly.csv"
         
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
@@ -103,21 +109,18 @@ def export_employee_csvs():
             
             writer.writeheader()
             
-            for section_data in sample_class_data:
-                for course in section_data['Courses']:
-                    for schedule in course['classschedule']:
-                        if schedule['employeeid'] == employee_id:
-                            row = {
-                                'ClassID': course['ClassID'],
-                                'coursename': course['coursename'],
-                                'section': course['section'],
-                                'duration': schedule['duration'],
-                                'roomid': schedule['roomid'],
-                                'roomtype': schedule['roomtype'],
-                                'employeeid': schedule['employeeid'],
-                                'day': schedule['day']
-                            }
-                            writer.writerow(row)
+            for course, schedule in employee_buckets[employee_id]:
+                row = {
+                    'ClassID': course['ClassID'],
+                    'coursename': course['coursename'],
+                    'section': course['section'],
+                    'duration': schedule['duration'],
+                    'roomid': schedule['roomid'],
+                    'roomtype': schedule['roomtype'],
+                    'employeeid': schedule['employeeid'],
+                    'day': schedule['day']
+                }
+                writer.writerow(row)
         
         print(f"Created: {filename}")
 
@@ -147,120 +150,86 @@ def print_summary():
     
     print("="*60)
 
+GRID_START = 6 * 60   # 6:00 AM
+GRID_END = 21 * 60    # 9:00 PM
+SLOT_MINUTES = 30
+
 def get_time_slots(start="6:00 AM", end="9:00 PM", interval_minutes=30):
     """Generate a list of time slot strings from start to end in interval_minutes."""
-    slots = []
-    start_dt = datetime.datetime.strptime(start, "%I:%M %p")
-    end_dt = datetime.datetime.strptime(end, "%I:%M %p")
-    curr = start_dt
-    while curr < end_dt:
-        next_slot = curr + datetime.timedelta(minutes=interval_minutes)
-        # Use %I for hour and strip leading zero for Windows compatibility
-        curr_str = curr.strftime('%I:%M %p').lstrip('0')
-        next_str = next_slot.strftime('%I:%M %p').lstrip('0')
-        slots.append(f"{curr_str} - {next_str}")
-        curr = next_slot
-    return slots
+    return [slot_label(t, interval_minutes) for t in range(parse_clock(start), parse_clock(end), interval_minutes)]
 
-time_slots = get_time_slots()
+time_slots = [slot_label(t, SLOT_MINUTES) for t in range(GRID_START, GRID_END, SLOT_MINUTES)]
 days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 
+def duration_minutes(duration):
+    """'1:30' -> 90"""
+    h, m = map(int, duration.split(":"))
+    return h * 60 + m
+
 def time_to_slot_index(start_time, duration):
     """Given a start time (e.g. '8:00 AM') and duration ('1:30'), return the slot indices covered."""
-    start_dt = datetime.datetime.strptime(start_time, "%I:%M %p")
-    h, m = map(int, duration.split(":"))
-    end_dt = start_dt + datetime.timedelta(hours=h, minutes=m)
-    indices = []
-    curr = start_dt
-    while curr < end_dt:
-        slot_str = f"{curr.strftime('%-I:%M %p')} - {(curr + datetime.timedelta(minutes=30)).strftime('%-I:%M %p')}"
-        if slot_str in time_slots:
-            indices.append(time_slots.index(slot_str))
-        curr += datetime.timedelta(minutes=30)
-    return indices
+    start = parse_clock(start_time)
+    first = (start - GRID_START) // SLOT_MINUTES
+    last = -(-(start + duration_minutes(duration) - GRID_START) // SLOT_MINUTES)
+    return list(range(max(first, 0), min(last, len(time_slots))))
 
 def parse_time_24h(time_str):
     """Convert '8:00' or '13:30' to '8:00 AM' or '1:30 PM'"""
-    dt = datetime.datetime.strptime(time_str, "%H:%M")
-    return dt.strftime("%-I:%M %p")
-
-def export_timegrid_csvs():
-    # Helper to get all unique employees, sections, rooms
-    all_employees = set()
-    all_sections = set()
-    all_rooms = set()
-    for section_data in sample_class_data:
-        for course in section_data['Courses']:
-            all_sections.add(course['section'])
-            for sched in course['classschedule']:
-                all_employees.add(sched['employeeid'])
-                all_rooms.add(sched['roomid'])
-
-    def build_grid(filter_type, filter_value):
-        grid = [["" for _ in days] for _ in time_slots]
-        # Filtered courses for this entity
-        filtered_courses = []
-        for section_data in sample_class_data:
-            for course in section_data['Courses']:
-                if filter_type == 'section' and course['section'] != filter_value:
-                    continue
-                for sched in course['classschedule']:
-                    if filter_type == 'employee' and sched['employeeid'] != filter_value:
-                        continue
-                    if filter_type == 'room' and sched['roomid'] != filter_value:
-                        continue
-                    filtered_courses.append((course, sched))
-        # Place each class at the earliest available slot for its day
-        for course, sched in filtered_courses:
-            cell = None
-            if filter_type == 'employee':
-                cell = f"{course['coursename']}\n{course['section']}\n{sched['roomid']}"
-            elif filter_type == 'section':
-                cell = f"{course['coursename']}\n{employee_info.get(sched['employeeid'], sched['employeeid'])}\n{sched['roomid']}"
-            elif filter_type == 'room':
-                cell = f"{course['coursename']}\n{course['section']}\n{employee_info.get(sched['employeeid'], sched['employeeid'])}"
-            day_idx = days.index(sched['day'])
-            h, m = map(int, sched['duration'].split(":"))
-            n_slots = (h * 60 + m) // 30
-            # Find first available slot for this day
-            for slot_idx in range(len(time_slots)):
-                # Check if enough consecutive slots are empty
-                if all(not grid[slot_idx + offset][day_idx] for offset in range(n_slots) if slot_idx + offset < len(time_slots)):
-                    for fill_idx in range(n_slots):
-                        if slot_idx + fill_idx < len(time_slots):
-                            grid[slot_idx + fill_idx][day_idx] = cell
-                    break
-        return grid
-
-    # Export for employees
-    for emp_id in sorted(all_employees):
-        filename = f"employee_{emp_id}_timegrid.csv"
-        grid = build_grid('employee', emp_id)
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(["Time Slot"] + days)
-            for i, slot in enumerate(time_slots):
-                writer.writerow([slot] + grid[i])
-
-    # Export for sections
-    for section in sorted(all_sections):
-        filename = f"section_{section}_timegrid.csv"
-        grid = build_grid('section', section)
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(["Time Slot"] + days)
-            for i, slot in enumerate(time_slots):
-                writer.writerow([slot] + grid[i])
-
-    # Export for rooms
-    for room in sorted(all_rooms):
-        filename = f"room_{room.replace(' ', '_')}_timegrid.csv"
-        grid = build_grid('room', room)
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(["Time Slot"] + days)
-            for i, slot in enumerate(time_slots):
-                writer.writerow([slot] + grid[i])
+    return format_ampm(parse_clock(time_str))
+
+def build_grid(filter_type, filter_value):
+    """
+    Time-slot x day grid of one entity: each class goes into the first run of free slots of
+    its day that is long enough (a run may run off the end of the day), in data order.
+    Free runs are found on a per-day occupancy mask.
+    """
+    n_rows = len(time_slots)
+    grid = [["" for _ in days] for _ in time_slots]
+    masks = [bytearray(n_rows) for _ in days]
+    for course, sched in entity_buckets()[filter_type].get(filter_value, ()):
+        if filter_type == 'employee':
+            cell = f"{course['coursename']}\n{course['section']}\n{sched['roomid']}"
+        elif filter_type == 'section':
+            cell = f"{course['coursename']}\n{employee_info.get(sched['employeeid'], sched['employeeid'])}\n{sched['roomid']}"
+        else:
+            cell = f"{course['coursename']}\n{course['section']}\n{employee_info.get(sched['employeeid'], sched['employeeid'])}"
+        day_idx = days.index(sched['day'])
+        n_slots = duration_minutes(sched['duration']) // SLOT_MINUTES
+        # First-fit: the first n_slots free slots, counting the slots past the end of the day as free
+        slot_idx = (masks[day_idx] + bytes(n_slots)).find(bytes(n_slots))
+        if slot_idx >= n_rows:
+            continue
+        end_idx = min(slot_idx + n_slots, n_rows)
+        masks[day_idx][slot_idx:end_idx] = b'\x01' * (end_idx - slot_idx)
+        for fill_idx in range(slot_idx, end_idx):
+            grid[fill_idx][day_idx] = cell
+    return grid
+
+def timegrid_rows(grid):
+    """CSV rows of a build_grid grid, header first."""
+    yield ["Time Slot"] + days
+    for i, slot in enumerate(time_slots):
+        yield [slot] + grid[i]
+
+def export_timegrid_csvs(bundle=None):
+    """
+    Export one timegrid CSV per employee, section and room. With bundle (a .zip filename)
+    they are written into that one archive with a manifest instead of as loose files.
+    """
+    buckets = entity_buckets()
+    archive = ExportBundle(bundle) if bundle else None
+    for filter_type in ('employee', 'section', 'room'):
+        for key in sorted(buckets[filter_type]):
+            name = key.replace(' ', '_') if filter_type == 'room' else key
+            filename = f"{filter_type}_{name}_timegrid.csv"
+            rows = timegrid_rows(build_grid(filter_type, key))
+            if archive:
+                archive.add_csv(filename, rows, filter_type, key, len(buckets[filter_type][key]))
+                continue
+            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+                csv.writer(csvfile).writerows(rows)
+    if archive:
+        archive.close()
 
     print("Timegrid CSV export completed!")
 
@@ -18,6 +18,14 @@ def get_room_type(room_name):
             return type_id
     return 1  # Default to lecture room
 
+# Placeholder rooms (whole names) and non-teaching rooms (keywords), never offered as an alternative in a room pool
+PLACEHOLDER_ROOMS = ["not set", "room not set", "tba", "sample room", "new room"]
+NON_TEACHING_ROOMS = ["faculty", "office", "accreditation"]
+
+def is_teaching_room(room_name):
+    name = room_name.strip().lower()
+    return name not in PLACEHOLDER_ROOMS and not any(kw in name for kw in NON_TEACHING_ROOMS)
+
 def get_floor(room_code):
     # Try to extract floor from room code like 'EB 201' -> 2
     match = re.search(r"\\b(\d{3,})\\b", room_code)
@@ -301,18 +309,19 @@ room_list = [
     {"RoomID" : 279, "RoomCode" : "ET 257", "RoomName" : "Room 257"}
 ]
 
-output = []
-for room in room_list:
-    room_type = get_room_type(room["RoomName"])
-    floor = get_floor(room["RoomCode"])
-    output.append({
-        "RoomID": room["RoomID"],
-        "RoomType": room_type,
-        "Floor": floor,
-        "RoomName": room["RoomName"]
-    })
+if __name__ == "__main__":
+    output = []
+    for room in room_list:
+        room_type = get_room_type(room["RoomName"])
+        floor = get_floor(room["RoomCode"])
+        output.append({
+            "RoomID": room["RoomID"],
+            "RoomType": room_type,
+            "Floor": floor,
+            "RoomName": room["RoomName"]
+        })
 
-with open("room.json", "w", encoding="utf-8") as f:
-    json.dump(output, f, indent=2, ensure_ascii=False)
+    with open("room.json", "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2, ensure_ascii=False)
 
-print(f"room.json generated with {len(output)} rooms.") 
\ No newline at end of file
+    print(f"room.json generated with {len(output)} rooms.") 
\ No newline at end of file
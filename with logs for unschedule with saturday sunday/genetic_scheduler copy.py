@@ -2,16 +2,19 @@ import random
 import copy
 from typing import List, Dict
 from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 import os
 import json
 from openpyxl.cell.cell import MergedCell
+from collections import defaultdict
+from time_grid import compute_slot_quantum, slot_range, schedule_type, pinned_slot, combined_sections, StartTable, ALL_BOUNDARIES, DEFAULT_QUANTUM, SCHOOL_START, SCHOOL_END
+from excel_styles import WEEK_DAYS, HEADER_FILL, CENTER_ALIGN, THIN_BORDER, course_fill, time_labels
 
 # Scheduler settings for allowing/disallowing conflicts
 SCHEDULER_SETTINGS = {
     "allow_room_conflict": True,      # If True, allows two classes in the same room at the same time
     "allow_employee_conflict": False, # If True, allows an employee to teach two classes at the same time
+    "room_capacity": {},              # RoomID -> sessions the room can host at once (gym, hall, online); default 1
     # Add more settings as needed
 }
 
@@ -24,20 +27,42 @@ def parse_duration(duration_str):
         return int(duration_str) * 60
 
 days_of_week = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
-time_slots = [8*60 + 30*i for i in range(18)]  # 8:00 to 17:30, 30-min slots
+# Slot size in minutes; configure_slot_quantum resizes the grid for each run
+SLOT_QUANTUM = DEFAULT_QUANTUM
+time_slots = list(range(SCHOOL_START, SCHOOL_END, SLOT_QUANTUM))  # 8:00 to 17:00
+# Candidate starts per (duration, Type, day calendar), rebuilt with the slot quantum
+START_TABLE = StartTable(SLOT_QUANTUM)
+GRID_END = 21 * 60  # last row of the Excel export ends at 9:00 PM
+
+def configure_slot_quantum(class_data):
+    """Set SLOT_QUANTUM and time_slots from the durations in class_data (GCD with the day's boundaries)."""
+    global SLOT_QUANTUM, time_slots, START_TABLE
+    durations = [parse_duration(sched['duration']) for course in class_data['Courses'] for sched in course['classschedule']]
+    pinned_starts = [pin[1] for course in class_data['Courses'] for pin in map(pinned_slot, course['classschedule']) if pin]
+    SLOT_QUANTUM = compute_slot_quantum(durations + pinned_starts, ALL_BOUNDARIES)
+    time_slots = list(range(SCHOOL_START, SCHOOL_END, SLOT_QUANTUM))
+    START_TABLE = StartTable(SLOT_QUANTUM)
+    return SLOT_QUANTUM
+
+def room_capacity(roomid):
+    """Sessions a room can host at once (SCHEDULER_SETTINGS["room_capacity"], default 1)."""
+    return SCHEDULER_SETTINGS.get("room_capacity", {}).get(roomid, 1)
 
 def has_conflict(start_time, duration, day, roomid, employeeid, section, assignments):
     end_time = start_time + duration
+    room_users = 0
     for a in assignments:
         if a['assignment']['day'] != day:
             continue
-        # Room conflict
+        # Room conflict once the room's capacity is used up
         if not SCHEDULER_SETTINGS.get("allow_room_conflict", False):
             if a['roomid'] == roomid:
                 s2, d2 = a['assignment']['start_time'], a['duration']
                 e2 = s2 + d2
                 if not (end_time <= s2 or (start_time >= e2)):
-                    return True
+                    room_users += 1
+                    if room_users >= room_capacity(roomid):
+                        return True
         # Employee conflict
         if not SCHEDULER_SETTINGS.get("allow_employee_conflict", False):
             if a['employeeid'] == employeeid:
@@ -45,8 +70,8 @@ def has_conflict(start_time, duration, day, roomid, employeeid, section, assignm
                 e2 = s2 + d2
                 if not (end_time <= s2 or (start_time >= e2)):
                     return True
-        # Section conflict (always enforced)
-        if a['section'] == section:
+        # Section conflict (always enforced); section may list every section of a combined session
+        if not set(a['sections']).isdisjoint(section if isinstance(section, list) else [section]):
             s2, d2 = a['assignment']['start_time'], a['duration']
             e2 = s2 + d2
             if not (end_time <= s2 or (start_time >= e2)):
@@ -54,41 +79,11 @@ def has_conflict(start_time, duration, day, roomid, employeeid, section, assignm
     return False
 
 def find_earliest_available_slot(duration, day, roomid, employeeid, section, assignments, sched_type):
-    # Determine start and end times based on type
-    if sched_type == 'overload':
-        start_time = 17 * 60 + 30  # 5:30 PM
-        end_time = 20 * 60 + 30    # 8:30 PM
-        # Always try 5:30 PM first
-        if not has_conflict(start_time, duration, day, roomid, employeeid, section, assignments):
-            return start_time
-        t = start_time + 30
-        while t + duration <= end_time:
-            if not has_conflict(t, duration, day, roomid, employeeid, section, assignments):
-                return t
-            t += 30
-        return None
-    else:
-        # Morning block: always try 8:00 AM first
-        morning_start = 8 * 60
-        morning_end = 12 * 60  # up to 12:00 PM
-        if not has_conflict(morning_start, duration, day, roomid, employeeid, section, assignments):
-            return morning_start
-        t = morning_start + 30
-        while t + duration <= morning_end:
-            if not has_conflict(t, duration, day, roomid, employeeid, section, assignments):
-                return t
-            t += 30
-        # Afternoon block: always try 1:00 PM first
-        afternoon_start = 13 * 60
-        afternoon_end = 17 * 60  # up to 5:00 PM
-        if not has_conflict(afternoon_start, duration, day, roomid, employeeid, section, assignments):
-            return afternoon_start
-        t = afternoon_start + 30
-        while t + duration <= afternoon_end:
-            if not has_conflict(t, duration, day, roomid, employeeid, section, assignments):
-                return t
-            t += 30
-        return None
+    # Morning block first, then the afternoon (or the evening window for overload)
+    for t in START_TABLE.starts(duration, sched_type, day):
+        if not has_conflict(t, duration, day, roomid, employeeid, section, assignments):
+            return t
+    return None
 
 def find_block_aligned_slot(duration, day, roomid, employeeid, section, assignments, sched_type, day_block_sizes):
     # Determine block size for this day
@@ -97,41 +92,11 @@ def find_block_aligned_slot(duration, day, roomid, employeeid, section, assignme
     else:
         block_size = duration
         day_block_sizes[day] = block_size
-    # Determine start and end times based on type
-    if sched_type == 'overload':
-        start_time = 17 * 60 + 30  # 5:30 PM
-        end_time = 20 * 60 + 30    # 8:30 PM
-        # Always try 5:30 PM first
-        if not has_conflict(start_time, duration, day, roomid, employeeid, section, assignments):
-            return start_time
-        t = start_time + block_size
-        while t + duration <= end_time:
-            if not has_conflict(t, duration, day, roomid, employeeid, section, assignments):
-                return t
-            t += block_size
-        return None
-    else:
-        # Morning block: always try 8:00 AM first
-        morning_start = 8 * 60
-        morning_end = 12 * 60  # up to 12:00 PM
-        if not has_conflict(morning_start, duration, day, roomid, employeeid, section, assignments):
-            return morning_start
-        t = morning_start + block_size
-        while t + duration <= morning_end:
-            if not has_conflict(t, duration, day, roomid, employeeid, section, assignments):
-                return t
-            t += block_size
-        # Afternoon block: always try 1:00 PM first
-        afternoon_start = 13 * 60
-        afternoon_end = 17 * 60  # up to 5:00 PM
-        if not has_conflict(afternoon_start, duration, day, roomid, employeeid, section, assignments):
-            return afternoon_start
-        t = afternoon_start + block_size
-        while t + duration <= afternoon_end:
-            if not has_conflict(t, duration, day, roomid, employeeid, section, assignments):
-                return t
-            t += block_size
-        return None
+    # Starts aligned to the block size from each window start (8:00 AM, 1:00 PM, or 5:30 PM for overload)
+    for t in START_TABLE.aligned_starts(duration, block_size, sched_type, day):
+        if not has_conflict(t, duration, day, roomid, employeeid, section, assignments):
+            return t
+    return None
 
 def random_assignment(class_entry, assignments_so_far=None, section=None, day_block_sizes=None):
     if assignments_so_far is None:
@@ -143,7 +108,7 @@ def random_assignment(class_entry, assignments_so_far=None, section=None, day_bl
     if isinstance(possible_days, str):
         possible_days = [possible_days]
     day = random.choice(possible_days)
-    sched_type = class_entry.get('Type', 'regular').lower()
+    sched_type = schedule_type(class_entry)
     roomid = class_entry['roomid'][0] if isinstance(class_entry['roomid'], list) else class_entry['roomid']
     section_val = section if section is not None else class_entry.get('section', None)
     start_time = find_block_aligned_slot(duration, day, roomid, class_entry['employeeid'], section_val, assignments_so_far, sched_type, day_block_sizes)
@@ -157,8 +122,12 @@ def build_chromosome(class_data):
     day_block_sizes = {}
     for course in class_data['Courses']:
         for sched in course['classschedule']:
-            assignment = random_assignment(sched, assignments, section=course['section'], day_block_sizes=day_block_sizes)
-            room_id_val = sched['roomid']
+            pin = pinned_slot(sched)
+            if pin:
+                assignment = {'day': pin[0], 'start_time': pin[1]}
+            else:
+                assignment = random_assignment(sched, assignments, section=combined_sections(course['section'], sched), day_block_sizes=day_block_sizes)
+            room_id_val = [pin[2]] if pin and pin[2] is not None else sched['roomid']
             possible_rooms = []
             chosen_room = None
             if isinstance(room_id_val, list):
@@ -174,6 +143,7 @@ def build_chromosome(class_data):
                 'ClassID': course['ClassID'],
                 'coursename': course.get('coursename', ''),
                 'section': course['section'],
+                'sections': combined_sections(course['section'], sched),
                 'roomid': chosen_room,
                 'possible_rooms': possible_rooms,
                 'employeeid': sched['employeeid'],
@@ -182,6 +152,8 @@ def build_chromosome(class_data):
                 'Type': sched.get('Type', 'regular'),
                 'name': sched.get('name', None)
             })
+            if pin:
+                assignments[-1]['pinned'] = True  # fixed day/start/room, never mutated
     return assignments
 
 def fitness(chromosome, class_data=None, log_conflicts=True):
@@ -193,6 +165,9 @@ def fitness(chromosome, class_data=None, log_conflicts=True):
     
     # Track all conflicts to summarize them
     all_conflicts = []
+    # Per-slot session counters for rooms that host several sessions at once
+    shared_room_load = defaultdict(lambda: bytearray(24 * 60 // SLOT_QUANTUM + 1))
+    shared_room_first = {}
     
     for i, a in enumerate(chromosome):
         scheduled += 1
@@ -208,14 +183,14 @@ def fitness(chromosome, class_data=None, log_conflicts=True):
         for j, b in enumerate(chromosome):
             if i == j:
                 continue
-            if a['section'] == b['section'] and a['assignment']['day'] == b['assignment']['day']:
+            if not set(a['sections']).isdisjoint(b['sections']) and a['assignment']['day'] == b['assignment']['day']:
                 if is_time_conflict(a, b):
                     score -= 30
                     conflicts += 1
                     if log_conflicts:
                         all_conflicts.append((a, b, "Section time conflict"))
                         
-            if a['roomid'] == b['roomid'] and a['assignment']['day'] == b['assignment']['day']:
+            if a['roomid'] == b['roomid'] and a['assignment']['day'] == b['assignment']['day'] and room_capacity(a['roomid']) == 1:
                 if is_time_conflict(a, b):
                     score -= 30
                     conflicts += 1
@@ -229,6 +204,21 @@ def fitness(chromosome, class_data=None, log_conflicts=True):
                     if log_conflicts:
                         all_conflicts.append((a, b, "Employee time conflict"))
     
+    for a in chromosome:
+        if room_capacity(a['roomid']) > 1:
+            buf = shared_room_load[(a['roomid'], a['assignment']['day'])]
+            shared_room_first.setdefault((a['roomid'], a['assignment']['day']), a)
+            first, last = slot_range(a['assignment']['start_time'], a['duration'], SLOT_QUANTUM)
+            for k in range(first, last):
+                buf[k] += 1
+    for (roomid, day), buf in shared_room_load.items():
+        overflow = sum(max(0, load - room_capacity(roomid)) for load in buf)
+        if overflow:
+            score -= 30 * overflow
+            conflicts += overflow
+            if log_conflicts:
+                all_conflicts.append((shared_room_first[(roomid, day)], None, f"Room {roomid} over capacity"))
+
     score += scheduled
     score += 0.1 * len(used_days)
     
@@ -298,7 +288,10 @@ def is_time_conflict(a, b):
 
 def mutate(chromosome):
     c = copy.deepcopy(chromosome)
-    idx = random.randint(0, len(c) - 1)
+    free = [i for i, gene in enumerate(c) if not gene.get('pinned')]
+    if not free:
+        return c
+    idx = random.choice(free)
     mut_options = ['day', 'time']
     if len(c[idx].get('possible_rooms', [])) > 1:
         mut_options.append('room')
@@ -316,19 +309,7 @@ def mutate(chromosome):
             c[idx]['roomid'] = random.choice(other_rooms)
     else:  # 'time'
         duration = c[idx]['duration']
-        sched_type = c[idx].get('Type', 'regular').lower()
-        if sched_type == 'overload':
-            evening_start = 17 * 60 + 30
-            evening_end = 20 * 60 + 30
-            valid_start_times = [t for t in range(evening_start, evening_end + 1, 30) if t + duration <= evening_end]
-        else:
-            break_start = 12 * 60
-            break_end = 13 * 60
-            valid_start_times = []
-            for t in time_slots:
-                if t + duration <= break_start or t >= break_end:
-                    if t + duration <= 17 * 60:
-                        valid_start_times.append(t)
+        valid_start_times = START_TABLE.starts(duration, schedule_type(c[idx]), c[idx]['assignment']['day'])
         if valid_start_times:
             c[idx]['assignment']['start_time'] = random.choice(valid_start_times)
         else:
@@ -342,6 +323,7 @@ def crossover(parent1, parent2):
     return child
 
 def genetic_algorithm(class_data, generations=100, pop_size=30):
+    configure_slot_quantum(class_data)
     # Don't write to log file at start - we only want final results
     population = [build_chromosome(class_data) for _ in range(pop_size)]
     best_fitness = float('-inf')
@@ -392,6 +374,7 @@ def chromosome_to_schedule(chromosome):
             'course_id': a['ClassID'],
             'coursename': a['coursename'],
             'section': a['section'],
+            'sections': a['sections'],
             'start_time': a['assignment']['start_time'],
             'end_time': a['assignment']['start_time'] + a['duration'],
             'duration': a['duration'],
@@ -407,53 +390,20 @@ def export_schedule_excel(filename, schedule, plotted_set=None):
     wb = Workbook()
     ws = wb.active
     ws.title = "Schedule"
-    header_fill = PatternFill(start_color='E0E0E0', end_color='E0E0E0', fill_type='solid')
-    center_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    days = ['Time', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    days = ['Time'] + list(WEEK_DAYS)
     day_to_col = {day: idx+2 for idx, day in enumerate(days[1:])}
     for col, day in enumerate(days, 1):
         cell = ws.cell(row=1, column=col)
         cell.value = day
-        cell.fill = header_fill
-        cell.alignment = center_align
-        cell.border = thin_border
-    time_slots = []
-    time_to_row = {}
-    current_row = 2
-    for hour in range(8, 21):  # 8:00 AM to 8:30 PM
-        for minute in [0, 30]:
-            time_str = f"{hour:02d}:{minute:02d}"
-            time_to_row[time_str] = current_row
-            next_minute = minute + 30
-            next_hour = hour
-            if next_minute >= 60:
-                next_minute = 0
-                next_hour += 1
-            if hour < 12:
-                current_time = f"{hour}:{minute:02d} AM"
-            elif hour == 12:
-                current_time = f"12:{minute:02d} PM"
-            else:
-                current_time = f"{hour-12}:{minute:02d} PM"
-            if next_hour < 12:
-                next_time = f"{next_hour}:{next_minute:02d} AM"
-            elif next_hour == 12:
-                next_time = f"12:{next_minute:02d} PM"
-            else:
-                next_time = f"{next_hour-12}:{next_minute:02d} PM"
-            time_slots.append(f"{current_time} - {next_time}")
-            current_row += 1
+        cell.fill = HEADER_FILL
+        cell.alignment = CENTER_ALIGN
+        cell.border = THIN_BORDER
+    time_slots = time_labels(SCHOOL_START, GRID_END, SLOT_QUANTUM)  # 8:00 AM to 9:00 PM, cached per slot size
     for idx, time_slot in enumerate(time_slots):
         cell = ws.cell(row=idx+2, column=1)
         cell.value = time_slot
-        cell.alignment = center_align
-        cell.border = thin_border
+        cell.alignment = CENTER_ALIGN
+        cell.border = THIN_BORDER
     if plotted_set is not None:
         # Track plotted classes
         def make_key(class_info):
@@ -465,31 +415,19 @@ def export_schedule_excel(filename, schedule, plotted_set=None):
                 class_info['day'],
                 str(class_info['roomid'])
             )
-    # Define a color palette for courses
-    color_palette = [
-        'FFB6C1', 'ADD8E6', '90EE90', 'FFD700', 'FFA07A', '20B2AA', '9370DB', 'F08080', 'E0FFFF', 'FFE4E1',
-        'B0E0E6', 'FF6347', '4682B4', 'D2B48C', '9ACD32', '40E0D0', 'FF69B4', 'CD5C5C', '00CED1', '1E90FF',
-        'B22222', 'FF7F50', '6A5ACD', '00FA9A', '7B68EE', '00FF7F', 'DC143C', '00BFFF', 'FF8C00', '8A2BE2'
-    ]
-    course_colors = {}
-    color_index = 0
-
     for class_info in schedule:
         start_time = class_info['start_time']
-        if isinstance(start_time, int):
-            hours = start_time // 60
-            minutes = start_time % 60
-            start_time = f"{hours:02d}:{minutes:02d}"
-        start_row = time_to_row.get(start_time)
+        if not isinstance(start_time, int):
+            start_time = parse_duration(start_time)
+        duration = class_info['duration']
+        first_slot, last_slot = slot_range(start_time, duration, SLOT_QUANTUM)
+        row_index = first_slot - SCHOOL_START // SLOT_QUANTUM
+        start_row = row_index + 2 if 0 <= row_index < len(time_slots) else None
         if not start_row:
             print(f"[DEBUG] Skipping class (no start_row): {class_info}")
             continue
-        duration = class_info['duration']
-        # Validate duration is a multiple of 30
-        if duration % 30 != 0:
-            print(f"[WARNING] Class {class_info['coursename']} {class_info['section']} has non-30-min-multiple duration: {duration}")
-            continue
-        num_slots = max(1, duration // 30)
+        # Durations off the grid (e.g. 1:15 on a 30-minute grid) cover every slot they touch
+        num_slots = max(1, last_slot - first_slot)
         end_row = start_row + num_slots - 1
         day = class_info.get('day', 'Monday')
         col = day_to_col.get(day, 2)
@@ -497,7 +435,7 @@ def export_schedule_excel(filename, schedule, plotted_set=None):
         emp_display = class_info.get('name') or f"Emp: {class_info['employeeid']}"
         class_text = (
             f"{class_info['coursename']}\n"
-            f"{class_info['section']}\n"
+            f"{'/'.join(map(str, class_info.get('sections', [class_info['section']])))}\n"
             f"Room {roomid_str}\n"
             f"{emp_display}"
         )
@@ -512,26 +450,22 @@ def export_schedule_excel(filename, schedule, plotted_set=None):
                 break
         if overlap:
             continue  # Skip merging this class
-        # Assign a color for this course if not already assigned
-        course_name = class_info['coursename']
-        if course_name not in course_colors:
-            course_colors[course_name] = color_palette[color_index % len(color_palette)]
-            color_index += 1
-        fill = PatternFill(start_color=course_colors[course_name], end_color=course_colors[course_name], fill_type='solid')
+        # Same color for a course in every file (crc32 of its name), one shared fill per color
+        fill = course_fill(class_info['coursename'])
         cell = ws.cell(row=start_row, column=col)
         if not isinstance(cell, MergedCell):
             cell.value = class_text
         cell.fill = fill
-        cell.alignment = center_align
-        cell.border = thin_border
+        cell.alignment = CENTER_ALIGN
+        cell.border = THIN_BORDER
         if num_slots > 1:
             print(f"[DEBUG] Merging rows {start_row} to {end_row} in column {col} for class {class_info['coursename']} {class_info['section']}")
             ws.merge_cells(start_row=start_row, start_column=col, end_row=end_row, end_column=col)
             for row in range(start_row + 1, end_row + 1):
                 cell = ws.cell(row=row, column=col)
                 cell.fill = fill
-                cell.alignment = center_align
-                cell.border = thin_border
+                cell.alignment = CENTER_ALIGN
+                cell.border = THIN_BORDER
         if plotted_set is not None:
             plotted_set.add((
                 class_info['coursename'],
@@ -655,9 +589,9 @@ if __name__ == "__main__":
     export_schedule_excel(os.path.join('excel_schedules', 'genetic_best_schedule.xlsx'), schedule, plotted_set=plotted_set)
 
     # Export per section
-    sections = set(c['section'] for c in schedule)
+    sections = set(s for c in schedule for s in c.get('sections', [c['section']]))
     for section in sections:
-        filtered = [c for c in schedule if c['section'] == section]
+        filtered = [c for c in schedule if section in c.get('sections', [c['section']])]
         export_schedule_excel(os.path.join('excel_schedules', f'section_{section}_genetic_schedule.xlsx'), filtered, plotted_set=plotted_set)
 
     # Export per employee
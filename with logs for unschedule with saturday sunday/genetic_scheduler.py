@@ -2,12 +2,15 @@ import random
 import copy
 from typing import List, Dict
 from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 import os
 import json
+import time
 from openpyxl.cell.cell import MergedCell
+from time_grid import compute_slot_quantum, slot_range, schedule_type, pinned_slot, combined_sections, StartTable, ALL_BOUNDARIES, DEFAULT_QUANTUM, SCHOOL_START, SCHOOL_END
+from excel_styles import WEEK_DAYS, HEADER_FILL, CENTER_ALIGN, THIN_BORDER, course_fill, time_labels
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 # Helper: parse duration string to minutes
 def parse_duration(duration_str):
@@ -18,7 +21,22 @@ def parse_duration(duration_str):
         return int(duration_str) * 60
 
 days_of_week = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
-time_slots = [8*60 + 30*i for i in range(18)]  # 8:00 to 17:30, 30-min slots
+# Slot size in minutes; configure_slot_quantum resizes the grid for each run
+SLOT_QUANTUM = DEFAULT_QUANTUM
+time_slots = list(range(SCHOOL_START, SCHOOL_END, SLOT_QUANTUM))  # 8:00 to 17:00
+# Candidate starts per (duration, Type, day calendar), rebuilt with the slot quantum
+START_TABLE = StartTable(SLOT_QUANTUM)
+GRID_END = 21 * 60  # last row of the Excel export ends at 9:00 PM
+
+def configure_slot_quantum(class_data):
+    """Set SLOT_QUANTUM and time_slots from the durations in class_data (GCD with the day's boundaries)."""
+    global SLOT_QUANTUM, time_slots, START_TABLE
+    durations = [parse_duration(sched['duration']) for course in class_data['Courses'] for sched in course['classschedule']]
+    pinned_starts = [pin[1] for course in class_data['Courses'] for pin in map(pinned_slot, course['classschedule']) if pin]
+    SLOT_QUANTUM = compute_slot_quantum(durations + pinned_starts, ALL_BOUNDARIES)
+    time_slots = list(range(SCHOOL_START, SCHOOL_END, SLOT_QUANTUM))
+    START_TABLE = StartTable(SLOT_QUANTUM)
+    return SLOT_QUANTUM
 
 def random_assignment(class_entry):
     duration = parse_duration(class_entry['duration'])
@@ -26,19 +44,8 @@ def random_assignment(class_entry):
     if isinstance(possible_days, str):
         possible_days = [possible_days]
     day = random.choice(possible_days)
-    sched_type = class_entry.get('Type', 'regular').lower()
-    if sched_type == 'overload':
-        evening_start = 17 * 60 + 30  # 17:30
-        evening_end = 20 * 60 + 30    # 20:30
-        valid_start_times = [t for t in range(evening_start, evening_end + 1, 30) if t + duration <= evening_end]
-    else:
-        break_start = 12 * 60  # 12:00 PM
-        break_end = 13 * 60    # 1:00 PM
-        valid_start_times = []
-        for t in time_slots:
-            if t + duration <= break_start or t >= break_end:
-                if t + duration <= 17*60:
-                    valid_start_times.append(t)
+    # Starts inside the Type's window (evening for overload, 8-5 minus the break otherwise)
+    valid_start_times = START_TABLE.starts(duration, schedule_type(class_entry), day)
     if not valid_start_times:
         start_time = min(time_slots)  # fallback
     else:
@@ -50,8 +57,9 @@ def build_chromosome(class_data):
     assignments = []
     for course in class_data['Courses']:
         for sched in course['classschedule']:
-            assignment = random_assignment(sched)
-            room_id_val = sched['roomid']
+            pin = pinned_slot(sched)
+            assignment = {'day': pin[0], 'start_time': pin[1]} if pin else random_assignment(sched)
+            room_id_val = [pin[2]] if pin and pin[2] is not None else sched['roomid']
             possible_rooms = []
             chosen_room = None
             if isinstance(room_id_val, list):
@@ -71,6 +79,7 @@ def build_chromosome(class_data):
                 'courseid': course['courseid'],
                 'coursename': course.get('coursename', ''),
                 'section': course['section'],
+                'sections': combined_sections(course['section'], sched),
                 'roomid': chosen_room,
                 'possible_rooms': possible_rooms,
                 'employeeid': sched['employeeid'],
@@ -79,6 +88,8 @@ def build_chromosome(class_data):
                 'Type': sched.get('Type', 'regular'),
                 'allowed_days': allowed_days
             })
+            if pin:
+                assignments[-1]['pinned'] = True  # fixed day/start/room, never mutated
     return assignments
 
 def fitness(chromosome, class_data=None):
@@ -111,7 +122,7 @@ def fitness(chromosome, class_data=None):
         for j, b in enumerate(chromosome):
             if i == j:
                 continue
-            if a['section'] == b['section'] and a['assignment']['day'] == b['assignment']['day']:
+            if not set(a['sections']).isdisjoint(b['sections']) and a['assignment']['day'] == b['assignment']['day']:
                 if is_time_conflict(a, b):
                     score -= 30
                     conflicts += 1
@@ -136,7 +147,7 @@ def fitness(chromosome, class_data=None):
     for times in section_times.values():
         times.sort()
         for i in range(1, len(times)):
-            gap = times[i] - (times[i-1] + 30)  # 30 is the slot size
+            gap = times[i] - (times[i-1] + SLOT_QUANTUM)
             if gap > 0:
                 score -= 0.05 * gap  # Penalize larger gaps more
     # Penalize gaps at the start of the day for each section
@@ -197,7 +208,10 @@ def is_time_conflict(a, b):
 
 def mutate(chromosome):
     c = copy.deepcopy(chromosome)
-    idx = random.randint(0, len(c) - 1)
+    free = [i for i, gene in enumerate(c) if not gene.get('pinned')]
+    if not free:
+        return c
+    idx = random.choice(free)
     mut_options = ['day', 'time']
     if len(c[idx].get('possible_rooms', [])) > 1:
         mut_options.append('room')
@@ -216,19 +230,7 @@ def mutate(chromosome):
             c[idx]['roomid'] = random.choice(other_rooms)
     else:  # 'time'
         duration = c[idx]['duration']
-        sched_type = c[idx].get('Type', 'regular').lower()
-        if sched_type == 'overload':
-            evening_start = 17 * 60 + 30
-            evening_end = 20 * 60 + 30
-            valid_start_times = [t for t in range(evening_start, evening_end + 1, 30) if t + duration <= evening_end]
-        else:
-            break_start = 12 * 60
-            break_end = 13 * 60
-            valid_start_times = []
-            for t in time_slots:
-                if t + duration <= break_start or t >= break_end:
-                    if t + duration <= 17 * 60:
-                        valid_start_times.append(t)
+        valid_start_times = START_TABLE.starts(duration, schedule_type(c[idx]), c[idx]['assignment']['day'])
         if valid_start_times:
             c[idx]['assignment']['start_time'] = random.choice(valid_start_times)
         else:
@@ -241,8 +243,11 @@ def crossover(parent1, parent2):
     child = parent1[:point] + parent2[point:]
     return child
 
-def genetic_algorithm(class_data, generations=100, pop_size=30):
-    population = [build_chromosome(class_data) for _ in range(pop_size)]
+def genetic_algorithm(class_data, generations=100, pop_size=30, initial_population=None):
+    configure_slot_quantum(class_data)
+    # Seed chromosomes (e.g. from schedule_to_chromosome) fill the population first, random ones the rest
+    population = list(initial_population or [])[:pop_size]
+    population += [build_chromosome(class_data) for _ in range(pop_size - len(population))]
     for gen in range(generations):
         population = sorted(population, key=lambda chrom: fitness(chrom, class_data), reverse=True)
         next_gen = population[:4]
@@ -273,6 +278,7 @@ def chromosome_to_schedule(chromosome):
             'course_id': a['courseid'],
             'coursename': a['coursename'],
             'section': a['section'],
+            'sections': a['sections'],
             'start_time': a['assignment']['start_time'],
             'end_time': a['assignment']['start_time'] + a['duration'],
             'duration': a['duration'],
@@ -284,88 +290,83 @@ def chromosome_to_schedule(chromosome):
         })
     return schedule
 
-def export_schedule_excel(filename, schedule):
+def schedule_to_chromosome(schedule, class_data):
+    """
+    Chromosome (gene order of build_chromosome) reproducing a schedule made by another engine,
+    e.g. AdvancedSchoolScheduler.generate_schedule_dsatur, for use as a GA seed.
+    Sessions missing from the schedule keep a random assignment.
+    """
+    chromosome = build_chromosome(class_data)
+    placed = defaultdict(list)
+    for c in schedule:
+        key = (c['section'], c.get('ClassID', c.get('course_id')), c.get('employee_id', c.get('employeeid')), c['duration'])
+        placed[key].append(c)
+    genes = iter(chromosome)
+    for course in class_data['Courses']:
+        for sched in course['classschedule']:
+            gene = next(genes)
+            key = (course['section'], course.get('ClassID', course.get('courseid')), sched['employeeid'], gene['duration'])
+            if not placed[key]:
+                continue
+            c = placed[key].pop(0)
+            if gene.get('pinned'):
+                continue
+            gene['assignment'] = {'day': c['day'], 'start_time': c['start_time']}
+            roomids = c['roomid'] if isinstance(c['roomid'], list) else [c['roomid']]
+            if roomids:
+                gene['roomid'] = roomids[0]
+    return chromosome
+
+def export_schedule_excel(filename, schedule, quantum=None):
+    quantum = quantum or SLOT_QUANTUM
     wb = Workbook()
     ws = wb.active
     ws.title = "Schedule"
-    header_fill = PatternFill(start_color='E0E0E0', end_color='E0E0E0', fill_type='solid')
-    center_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    days = ['Time', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    days = ['Time'] + list(WEEK_DAYS)
     day_to_col = {day: idx+2 for idx, day in enumerate(days[1:])}
     for col, day in enumerate(days, 1):
         cell = ws.cell(row=1, column=col)
         cell.value = day
-        cell.fill = header_fill
-        cell.alignment = center_align
-        cell.border = thin_border
-    time_slots = []
-    time_to_row = {}
-    current_row = 2
-    for hour in range(8, 21):  # 8:00 AM to 8:30 PM
-        for minute in [0, 30]:
-            time_str = f"{hour:02d}:{minute:02d}"
-            time_to_row[time_str] = current_row
-            next_minute = minute + 30
-            next_hour = hour
-            if next_minute >= 60:
-                next_minute = 0
-                next_hour += 1
-            if hour < 12:
-                current_time = f"{hour}:{minute:02d} AM"
-            elif hour == 12:
-                current_time = f"12:{minute:02d} PM"
-            else:
-                current_time = f"{hour-12}:{minute:02d} PM"
-            if next_hour < 12:
-                next_time = f"{next_hour}:{next_minute:02d} AM"
-            elif next_hour == 12:
-                next_time = f"12:{next_minute:02d} PM"
-            else:
-                next_time = f"{next_hour-12}:{next_minute:02d} PM"
-            time_slots.append(f"{current_time} - {next_time}")
-            current_row += 1
+        cell.fill = HEADER_FILL
+        cell.alignment = CENTER_ALIGN
+        cell.border = THIN_BORDER
+    time_slots = time_labels(SCHOOL_START, GRID_END, quantum)  # 8:00 AM to 9:00 PM, cached per slot size
     for idx, time_slot in enumerate(time_slots):
         cell = ws.cell(row=idx+2, column=1)
         cell.value = time_slot
-        cell.alignment = center_align
-        cell.border = thin_border
+        cell.alignment = CENTER_ALIGN
+        cell.border = THIN_BORDER
     for class_info in schedule:
         start_time = class_info['start_time']
-        if isinstance(start_time, int):
-            hours = start_time // 60
-            minutes = start_time % 60
-            start_time = f"{hours:02d}:{minutes:02d}"
-        start_row = time_to_row.get(start_time)
+        if not isinstance(start_time, int):
+            start_time = parse_duration(start_time)
+        duration = class_info['duration']
+        first_slot, last_slot = slot_range(start_time, duration, quantum)
+        row_index = first_slot - SCHOOL_START // quantum
+        start_row = row_index + 2 if 0 <= row_index < len(time_slots) else None
         if not start_row:
             continue
-        duration = class_info['duration']
-        num_slots = max(1, duration // 30)
+        num_slots = max(1, last_slot - first_slot)
         end_row = start_row + num_slots - 1
         day = class_info.get('day', 'Monday')
         col = day_to_col.get(day, 2)
         roomid_str = ', '.join(str(r) for r in (class_info['roomid'] if isinstance(class_info['roomid'], list) else [class_info['roomid']]))
         class_text = (
             f"{class_info['coursename']}\n"
-            f"{class_info['section']}\n"
+            f"{'/'.join(map(str, class_info.get('sections', [class_info['section']])))}\n"
             f"Room {roomid_str}"
         )
         cell = ws.cell(row=start_row, column=col)
         if not isinstance(cell, MergedCell):
             cell.value = class_text
-        cell.alignment = center_align
-        cell.border = thin_border
+        cell.alignment = CENTER_ALIGN
+        cell.border = THIN_BORDER
         if num_slots > 1:
             ws.merge_cells(start_row=start_row, start_column=col, end_row=end_row, end_column=col)
             for row in range(start_row + 1, end_row + 1):
                 cell = ws.cell(row=row, column=col)
-                cell.alignment = center_align
-                cell.border = thin_border
+                cell.alignment = CENTER_ALIGN
+                cell.border = THIN_BORDER
     for col in range(1, len(days) + 1):
         ws.column_dimensions[get_column_letter(col)].width = 25
     for row in range(1, len(time_slots) + 2):
@@ -373,6 +374,38 @@ def export_schedule_excel(filename, schedule):
     wb.save(filename)
     print(f"\nSchedule exported to Excel file: {filename}")
 
+def _export_job(job):
+    """Process-pool worker: write one workbook from (filename, classes, quantum); returns (filename, seconds)."""
+    filename, schedule, quantum = job
+    started = time.perf_counter()
+    export_schedule_excel(filename, schedule, quantum)
+    return filename, time.perf_counter() - started
+
+def export_entity_schedules(schedule, output_dir, max_workers=1):
+    """
+    Write one workbook per section, employee and room. The schedule is bucketed in one pass;
+    with max_workers other than 1 the files are written by a process pool (None = one per CPU),
+    each worker receiving only its entity's classes and the slot size of this run.
+    """
+    buckets = {'section': defaultdict(list), 'employee': defaultdict(list), 'room': defaultdict(list)}
+    for c in schedule:
+        for section in c.get('sections', [c['section']]):
+            buckets['section'][section].append(c)
+        buckets['employee'][c['employeeid']].append(c)
+        for room in (c['roomid'] if isinstance(c['roomid'], list) else [c['roomid']]):
+            buckets['room'][room].append(c)
+    jobs = [(os.path.join(output_dir, f'{kind}_{key}_genetic_schedule.xlsx'), classes, SLOT_QUANTUM)
+            for kind, bucket in buckets.items() for key, classes in bucket.items()]
+    started = time.perf_counter()
+    if max_workers == 1 or len(jobs) <= 1:
+        results = [_export_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_export_job, jobs))
+    for filename, seconds in results:
+        print(f"Exported {filename} in {seconds:.2f}s")
+    print(f"Exported {len(jobs)} Excel schedules in {time.perf_counter() - started:.2f}s")
+
 def log_unscheduled_classes(class_data, schedule, log_filename='logs.txt'):
     with open(log_filename, 'w') as f:
         for course in class_data['Courses']:
@@ -425,27 +458,7 @@ if __name__ == "__main__":
 
     export_schedule_excel(os.path.join(output_dir, 'genetic_best_schedule.xlsx'), schedule)
 
-    # Export per section
-    sections = set(c['section'] for c in schedule)
-    for section in sections:
-        filtered = [c for c in schedule if c['section'] == section]
-        export_schedule_excel(os.path.join(output_dir, f'section_{section}_genetic_schedule.xlsx'), filtered)
-
-    # Export per employee
-    employees = set(c['employeeid'] for c in schedule)
-    for emp in employees:
-        filtered = [c for c in schedule if c['employeeid'] == emp]
-        export_schedule_excel(os.path.join(output_dir, f'employee_{emp}_genetic_schedule.xlsx'), filtered)
-
-    # Export per room
-    rooms = set()
-    for c in schedule:
-        if isinstance(c['roomid'], list):
-            rooms.update(c['roomid'])
-        else:
-            rooms.add(c['roomid'])
-    for room in rooms:
-        filtered = [c for c in schedule if (room in c['roomid'] if isinstance(c['roomid'], list) else c['roomid'] == room)]
-        export_schedule_excel(os.path.join(output_dir, f'room_{room}_genetic_schedule.xlsx'), filtered)
+    # Export per section, employee and room (pass max_workers=None to use every core)
+    export_entity_schedules(schedule, output_dir)
 
     log_unscheduled_classes(class_data, schedule) 
\ No newline at end of file
@@ -1,9 +1,17 @@
+import argparse
 import json
 from advanced_scheduler import AdvancedSchoolScheduler
 
 if __name__ == "__main__":
-    with open("schedule.json", "r") as f:
-        data = json.load(f)
+    parser = argparse.ArgumentParser(description="Schedule the class data in schedule.json and export the Excel timetables.")
+    parser.add_argument('--export-only', metavar='SCHEDULE',
+                        help="skip solving: load a schedule saved with export_schedule (JSON) or export_schedule_snapshot and only export it")
+    args = parser.parse_args()
     scheduler = AdvancedSchoolScheduler()
-    scheduler.generate_schedule(data)
-    scheduler.export_all_excel_schedules() 
\ No newline at end of file
+    if args.export_only:
+        scheduler.load_schedule(args.export_only)
+    else:
+        with open("schedule.json", "r") as f:
+            data = json.load(f)
+        scheduler.generate_schedule(data)
+    scheduler.export_all_excel_schedules()
@@ -0,0 +1,174 @@
+"""
+Compact columnar snapshot of a solved schedule.
+
+Layout (little-endian):
+    header   magic b'SCHSNAP1', then uint32 rows, values, blob length
+    columns  one int32 array of `rows` items per COLUMNS entry
+    offsets  uint32 array of values + 1 byte offsets into the blob
+    blob     UTF-8 JSON text of every distinct value, back to back
+
+start_time and duration are stored as minutes; every other column holds an index into
+the value table (-1 when the class has no such field). Values are JSON, so ids, names,
+room lists and the remaining fields of a class ('extra') round-trip unchanged.
+end_time and the HH:MM strings are derived on load.
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+MAGIC = b'SCHSNAP1'
+HEADER = struct.Struct('<8sIII')
+COLUMNS = ('ClassID', 'coursename', 'section', 'sections', 'day', 'start_time', 'duration',
+           'roomid', 'employee_id', 'extra')
+INT_COLUMNS = ('start_time', 'duration')
+DERIVED = ('end_time', 'start_time_str', 'end_time_str')
+
+
+def _hhmm(minutes) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def is_snapshot(filename) -> bool:
+    """True when filename starts with the snapshot magic."""
+    with open(filename, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_snapshot(filename, schedule):
+    """Write schedule (a list of placed classes) as a columnar snapshot."""
+    value_index = {}
+    blobs = []
+    columns = {name: array('i') for name in COLUMNS}
+    fixed = set(COLUMNS) | set(DERIVED)
+
+    def intern(value):
+        text = json.dumps(value, sort_keys=True, separators=(',', ':'))
+        idx = value_index.get(text)
+        if idx is None:
+            idx = value_index[text] = len(blobs)
+            blobs.append(text.encode('utf-8'))
+        return idx
+
+    for c in schedule:
+        extra = {k: v for k, v in c.items() if k not in fixed}
+        for name in COLUMNS:
+            if name in INT_COLUMNS:
+                columns[name].append(c[name])
+            elif name == 'extra':
+                columns[name].append(intern(extra) if extra else -1)
+            else:
+                columns[name].append(intern(c[name]) if name in c else -1)
+    offsets = array('I', [0])
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+    blob_len = offsets[-1]
+    if sys.byteorder != 'little':
+        for arr in list(columns.values()) + [offsets]:
+            arr.byteswap()
+    with open(filename, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(schedule), len(blobs), blob_len))
+        for name in COLUMNS:
+            columns[name].tofile(f)
+        offsets.tofile(f)
+        f.write(b''.join(blobs))
+    print(f"\nSchedule snapshot ({len(schedule)} classes, {len(blobs)} distinct values) written to {filename}")
+
+
+class ScheduleSnapshot:
+    """
+    Read-only view of a snapshot file. The file is memory-mapped and every column is a
+    memoryview cast to int32 over the mapping, so opening costs no parsing or copying;
+    values are decoded from the table only when a class is built.
+
+        with ScheduleSnapshot('schedule.snap') as snap:
+            starts = snap.columns['start_time']   # zero-copy int view
+            schedule = snap.classes()
+    """
+
+    def __init__(self, filename):
+        self._file = open(filename, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        magic, self.rows, n_values, blob_len = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            view.release()
+            self.close()
+            raise ValueError(f"{filename} is not a schedule snapshot")
+        self._views = [view]
+        pos = HEADER.size
+        self.columns = {}
+        for name in COLUMNS:
+            self.columns[name] = self._int_view(view, pos, self.rows, 'i')
+            pos += self.rows * 4
+        self._offsets = self._int_view(view, pos, n_values + 1, 'I')
+        pos += (n_values + 1) * 4
+        self._blob = view[pos:pos + blob_len]
+        self._views.append(self._blob)
+        self._values = {}
+
+    def _int_view(self, view, pos, count, code):
+        """Zero-copy int view of count items at pos (a byte-swapped copy on big-endian hosts)."""
+        raw = view[pos:pos + count * 4]
+        if sys.byteorder != 'little':
+            swapped = array(code, raw.tobytes())
+            swapped.byteswap()
+            raw.release()
+            return memoryview(swapped)
+        ints = raw.cast(code)
+        self._views += [raw, ints]
+        return ints
+
+    def __len__(self):
+        return self.rows
+
+    def value(self, idx):
+        """Decoded value idx of the table (cached; treat it as read-only), None for -1."""
+        if idx < 0:
+            return None
+        value = self._values.get(idx)
+        if value is None:
+            value = self._values[idx] = json.loads(bytes(self._blob[self._offsets[idx]:self._offsets[idx + 1]]))
+        return value
+
+    def classes(self) -> list:
+        """
+        The schedule as a list of placed-class dicts, as export_schedule writes them.
+        Lists (room ids, sections, ...) are copied so that no two classes share one.
+        """
+        cols = [(name, self.columns[name].tolist()) for name in COLUMNS]
+        schedule = []
+        for row in range(self.rows):
+            c = {}
+            for name, col in cols:
+                idx = col[row]
+                if name in INT_COLUMNS:
+                    c[name] = idx
+                elif idx >= 0:
+                    value = self.value(idx)
+                    if name == 'extra':
+                        c.update((k, list(v) if isinstance(v, list) else v) for k, v in value.items())
+                    else:
+                        c[name] = list(value) if isinstance(value, list) else value
+            c['end_time'] = c['start_time'] + c['duration']
+            c['start_time_str'] = _hhmm(c['start_time'])
+            c['end_time_str'] = _hhmm(c['end_time'])
+            schedule.append(c)
+        return schedule
+
+    def close(self):
+        """Release every view, then unmap and close the file."""
+        for view in reversed(getattr(self, '_views', [])):
+            view.release()
+        self._views = []
+        self.columns = {}
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
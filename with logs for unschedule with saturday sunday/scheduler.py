@@ -2,6 +2,10 @@ import json
 from datetime import datetime, timedelta
 from typing import List, Dict, Set, Tuple
 import random
+from time_grid import compute_slot_quantum, StartTable, DEFAULT_QUANTUM, SCHOOL_START, SCHOOL_END
+
+# This scheduler has no days and no lunch break: one 8:00 AM - 5:00 PM window
+SCHOOL_DAY = ((SCHOOL_START, SCHOOL_END),)
 
 class SchoolScheduler:
     def __init__(self):
@@ -13,6 +17,9 @@ class SchoolScheduler:
         self.sections = {}   # Will store section schedules
         self.room_schedules = {}  # Will store room schedules
         self.schedule = []
+        # Grid resolution in minutes, recomputed per run from the durations (see generate_schedule)
+        self.slot_quantum = DEFAULT_QUANTUM
+        self.start_table = StartTable(self.slot_quantum, {None: {'regular': SCHOOL_DAY}})
         
     def parse_duration(self, duration_str: str) -> int:
         """Convert duration string (e.g., '1:30') to minutes"""
@@ -36,12 +43,8 @@ class SchoolScheduler:
     
     def find_available_slot(self, duration: int, section: str, employee_id: int, room_type: int) -> Tuple[int, int]:
         """Find an available time slot for a class"""
-        # School hours: 8:00 AM to 5:00 PM (9 hours = 540 minutes)
-        school_start = 8 * 60  # 8:00 AM
-        school_end = 17 * 60   # 5:00 PM
-        
-        # Try each 30-minute slot
-        for start_time in range(school_start, school_end - duration, 30):
+        # Try each start on the run's slot grid inside school hours (8:00 AM - 5:00 PM)
+        for start_time in self.start_table.starts(duration):
             end_time = start_time + duration
             
             # Check if this slot conflicts with section schedule
@@ -142,6 +145,10 @@ class SchoolScheduler:
                         'employee_id': schedule_item['employeeid']
                     })
         
+        # Slot size: GCD of every duration and the school-day boundaries, so 1:15 sessions fit the grid
+        self.slot_quantum = compute_slot_quantum([c['duration'] for c in all_classes], SCHOOL_DAY[0])
+        self.start_table = StartTable(self.slot_quantum, {None: {'regular': SCHOOL_DAY}})
+        
         # Sort by duration (descending) to schedule longer classes first
         all_classes.sort(key=lambda x: x['duration'], reverse=True)
         
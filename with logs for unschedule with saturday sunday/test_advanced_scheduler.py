@@ -0,0 +1,276 @@
+import json
+
+from advanced_scheduler import AdvancedSchoolScheduler, hopcroft_karp
+
+
+def course(class_id, section, *sessions, coursename=None):
+    """One course of class data; each session is a classschedule entry."""
+    return {'ClassID': class_id, 'coursename': coursename or f'Course {class_id}', 'section': section,
+            'classschedule': list(sessions)}
+
+
+def session(duration, roomid, employeeid, day='Monday', **extra):
+    return dict(duration=duration, roomid=roomid, employeeid=employeeid, day=[day] if isinstance(day, str) else day,
+                **extra)
+
+
+def overlaps(schedule):
+    """Pairs of placed classes that share a section, employee or room at the same time."""
+    pairs = []
+    for i, a in enumerate(schedule):
+        for b in schedule[i + 1:]:
+            if a['day'] != b['day'] or a['end_time'] <= b['start_time'] or b['end_time'] <= a['start_time']:
+                continue
+            sections_a = set(a.get('sections', [a['section']]))
+            if (sections_a & set(b.get('sections', [b['section']])) or a['employee_id'] == b['employee_id']
+                    or set(a['roomid']) & set(b['roomid'])):
+                pairs.append((a, b))
+    return pairs
+
+
+def test_shared_room_and_employee_capacity_greedy():
+    # Four sections, one room and one employee that can each host two sessions at once
+    data = [{'Courses': [course(i, f'S{i}', session('3:00', [1], 7)) for i in range(4)]}]
+    scheduler = AdvancedSchoolScheduler(room_capacity={1: 2}, employee_capacity={7: 2})
+    scheduler.generate_schedule(data)
+    starts = sorted(c['start_time_str'] for c in scheduler.schedule)
+    assert starts == ['08:00', '08:00', '13:00', '13:00']
+    assert not scheduler.unscheduled_classes
+
+
+def test_schedule_class_without_day_uses_capacity():
+    scheduler = AdvancedSchoolScheduler(room_capacity={1: 2}, employee_capacity={7: 2})
+    placed = [scheduler.schedule_class(i, 'C', f'S{i}', 90, [1], 7) for i in range(3)]
+    assert [c['start_time_str'] for c in placed] == ['06:00', '06:00', '07:30']
+    assert not scheduler.conflicts
+
+
+def test_components_split_on_shared_sections_employees_and_rooms():
+    data = [{'Courses': [
+        course(1, 'A', session('1:00', [1], 7)),
+        course(2, 'B', session('1:00', [2], 7)),   # shares employee 7 with A
+        course(3, 'C', session('1:00', [3], 8)),
+        course(4, 'D', session('1:00', [3], 9)),   # shares room 3 with C
+        course(5, 'E', session('1:00', [5], 10)),
+    ]}]
+    scheduler = AdvancedSchoolScheduler()
+    components = scheduler.split_independent_components(data)
+    assert sorted(sorted(c['section'] for c in group[0]['Courses']) for group in components) == [
+        ['A', 'B'], ['C', 'D'], ['E']]
+    scheduler.generate_schedule_parallel(data, engine='greedy', max_workers=1)
+    assert len(scheduler.schedule) == 5 and not overlaps(scheduler.schedule)
+
+
+def short_saturday_data():
+    # One section, three 1-hour sessions allowed only on a Saturday with a 2-hour window
+    return [{'Courses': [course(i, 'A', session('1:00', [10 + i], 7, day='Saturday')) for i in range(3)]}]
+
+
+def test_day_bins_follow_day_windows():
+    scheduler = AdvancedSchoolScheduler(precheck=False, day_windows={'Saturday': {'regular': ((480, 600),)}})
+    by_day, unassigned = scheduler.assign_days_bin_packing(scheduler._collect_requests(short_saturday_data()))
+    assert len(by_day['Saturday']) == 2 and len(unassigned) == 1
+    # The precheck reaches the same capacity
+    report = scheduler.analyze_infeasibility(short_saturday_data())
+    assert len(report) == 1 and 'only 120 min' in report[0]['reason']
+
+
+def test_two_phase_places_what_fits_the_window():
+    scheduler = AdvancedSchoolScheduler(day_windows={'Saturday': {'regular': ((480, 600),)}})
+    scheduler.generate_schedule_two_phase(short_saturday_data(), max_workers=1)
+    assert sorted(c['start_time_str'] for c in scheduler.schedule) == ['08:00', '09:00']
+    assert len(scheduler.unscheduled_classes) == 1
+
+
+def test_hopcroft_karp_finds_a_perfect_matching():
+    # A greedy pick of room 1 for 'a' would strand 'b'
+    matching = hopcroft_karp({'a': [1, 2], 'b': [1], 'c': [2, 3]})
+    assert matching == {'a': 2, 'b': 1, 'c': 3}
+    assert len(hopcroft_karp({'a': [1], 'b': [1]})) == 1
+
+
+def any_pool_data():
+    # Three sections need one room of the pool [1, 2, 3] for a whole Monday morning
+    return [{'Courses': [course(i, f'S{i}', session('4:00', [1, 2, 3], 10 + i)) for i in range(3)]}]
+
+
+def test_any_mode_repair_places_every_session_once():
+    scheduler = AdvancedSchoolScheduler(room_mode='any')
+    assert scheduler.global_repair_schedule(any_pool_data())
+    assert not scheduler.unscheduled_classes
+    assert sorted(c['start_time_str'] for c in scheduler.schedule) == ['08:00', '08:00', '08:00']
+    assert sorted(c['roomid'][0] for c in scheduler.schedule) == [1, 2, 3]
+    assert not overlaps(scheduler.schedule)
+
+
+def test_any_mode_repair_engine_reports_no_placed_session_as_unscheduled():
+    data = any_pool_data()
+    # A session longer than any teaching block leaves the greedy pass with something to repair
+    data[0]['Courses'].append(course(9, 'S9', session('10:00', [9], 99)))
+    scheduler = AdvancedSchoolScheduler(room_mode='any')
+    scheduler.run_engine('repair', data)
+    placed = {(c['ClassID'], c['section']) for c in scheduler.schedule}
+    assert not placed & {(u['ClassID'], u['section']) for u in scheduler.unscheduled_classes}
+    assert all(len(c['roomid']) == 1 and c['roomid'][0] in c['room_options'] for c in scheduler.schedule)
+    assert not overlaps(scheduler.schedule)
+
+
+ROOMS = [
+    {'RoomID': 0, 'RoomType': 1, 'RoomName': 'Not Set'},
+    {'RoomID': 8, 'RoomType': 1, 'RoomName': 'CEIT Faculty Room'},
+    {'RoomID': 20, 'RoomType': 1, 'RoomName': 'CEIT Room 303'},
+    {'RoomID': 21, 'RoomType': 1, 'RoomName': 'CEIT Room 304'},
+    {'RoomID': 13, 'RoomType': 2, 'RoomName': 'ITE Laboratory 1'},
+]
+
+
+def test_time_first_keeps_requested_rooms():
+    data = [{'Courses': [
+        course(1, 'A', session('2:00', [20], 7)),
+        course(2, 'B', session('2:00', [20], 8)),
+        course(3, 'C', session('2:00', [20, 13], 9)),  # needs both rooms at once
+    ]}]
+    scheduler = AdvancedSchoolScheduler(rooms=ROOMS)
+    scheduler.generate_schedule_time_first(data)
+    rooms = {c['ClassID']: c['roomid'] for c in scheduler.schedule}
+    assert rooms == {1: [20], 2: [20], 3: [20, 13]}
+    assert not overlaps(scheduler.schedule)
+
+
+def test_time_first_type_pool_skips_placeholder_rooms():
+    data = [{'Courses': [course(i, f'S{i}', session('4:00', [20], 10 + i)) for i in range(3)]}]
+    scheduler = AdvancedSchoolScheduler(rooms=ROOMS)
+    scheduler.generate_schedule_time_first(data, pool_by_type=True)
+    morning = sorted(c['roomid'][0] for c in scheduler.schedule if c['start_time_str'] == '08:00')
+    assert morning == [20, 21]
+    assert all(c['roomid'][0] in (20, 21) for c in scheduler.schedule)
+
+
+def test_precheck_reports_impossible_requests():
+    data = [{'Courses': [
+        course(1, 'A', session('5:00', [1], 7)),                               # longer than any block
+        course(2, 'B', session('1:00', [2], 8), session('1:00', [2], 8)),     # two sessions, one day
+        course(3, 'C', session('1:00', [3], 9, day=['Monday', 'Tuesday'])),  # fine
+    ]}]
+    scheduler = AdvancedSchoolScheduler()
+    reasons = {entry['ClassID']: entry['reason'] for entry in scheduler.analyze_infeasibility(data)}
+    assert set(reasons) == {1, 2}
+    assert 'longer than the longest regular block' in reasons[1]
+    assert 'more sessions than allowed days' in reasons[2]
+    scheduler.generate_schedule(data)
+    assert len(scheduler.infeasible_requests) == 2
+    assert sorted(c['ClassID'] for c in scheduler.schedule) == [2, 3]
+
+
+def test_find_available_slot_keeps_the_schedule_class_range():
+    # 6:00 AM-9:00 PM without the lunch break, as before the start table
+    scheduler = AdvancedSchoolScheduler()
+    starts = [scheduler.schedule_class(i, 'C', 'A', 90, [1], 7) for i in range(10)]
+    assert [c and c['start_time_str'] for c in starts] == [
+        '06:00', '07:30', '09:00', '10:30', '13:00', '14:30', '16:00', '17:30', '19:00', None]
+
+
+def test_meeting_pattern_meets_at_one_start_on_every_day():
+    data = [{'Courses': [course(1, 'A', session('1:00', [1], 7, day=[], pattern=['TTh', 'MWF']))]}]
+    # The employee never teaches on Tuesday and only on Friday afternoon, so MWF at 13:00 is the first choice
+    whole_day = (('08:00', '17:00'),)
+    available = {'Monday': whole_day, 'Wednesday': whole_day, 'Thursday': whole_day, 'Friday': (('13:00', '17:00'),)}
+    scheduler = AdvancedSchoolScheduler(employee_limits={7: {'available': available}})
+    scheduler.generate_schedule(data)
+    assert sorted((c['day'], c['start_time_str'], c['pattern']) for c in scheduler.schedule) == [
+        ('Friday', '13:00', 'MWF'), ('Monday', '13:00', 'MWF'), ('Wednesday', '13:00', 'MWF')]
+
+
+def test_pinned_session_keeps_its_day_start_and_room():
+    data = [{'Courses': [
+        course(1, 'A', session('2:00', [1, 2, 3], 7, day='Tuesday', start='1:30 PM', room=2)),
+        course(2, 'A', session('2:00', [2], 8, day='Tuesday')),
+    ]}]
+    for engine in ('greedy', 'dsatur', 'time_first'):
+        scheduler = AdvancedSchoolScheduler()
+        scheduler.run_engine(engine, data)
+        pinned = next(c for c in scheduler.schedule if c['ClassID'] == 1)
+        assert (pinned['day'], pinned['start_time_str'], pinned['roomid'], pinned['pinned']) == (
+            'Tuesday', '13:30', [2], True), engine
+        assert not overlaps(scheduler.schedule), engine
+
+
+def test_two_phase_packs_days_around_fixed_sessions():
+    # The pinned Monday meeting takes Monday for the course, so the other session goes on Tuesday
+    pinned = [{'Courses': [course(1, 'A', session('1:00', [1], 7, start='8:00 AM'),
+                                  session('1:00', [1], 7, day=['Monday', 'Tuesday']))]}]
+    scheduler = AdvancedSchoolScheduler()
+    scheduler.generate_schedule_two_phase(pinned, max_workers=1)
+    assert sorted((c['day'], c['start_time_str']) for c in scheduler.schedule) == [
+        ('Monday', '08:00'), ('Tuesday', '08:00')]
+    # Likewise a TTh pattern leaves Wednesday for the course's other session
+    pattern = [{'Courses': [course(1, 'A', session('1:00', [1], 7, day=[], pattern='TTh'),
+                                   session('1:00', [1], 7, day=['Tuesday', 'Wednesday']))]}]
+    scheduler.generate_schedule_two_phase(pattern, max_workers=1)
+    assert sorted((c['day'], c['start_time_str']) for c in scheduler.schedule) == [
+        ('Thursday', '08:00'), ('Tuesday', '08:00'), ('Wednesday', '08:00')]
+
+
+def test_genetic_places_a_pattern_as_a_unit():
+    data = [{'Courses': [course(1, 'A', session('1:00', [1], 7, day=[], pattern='TTh'))]}]
+    scheduler = AdvancedSchoolScheduler()
+    scheduler.generate_schedule_genetic(data)
+    assert sorted((c['day'], c['start_time_str'], c['pattern']) for c in scheduler.schedule) == [
+        ('Thursday', '08:00', 'TTh'), ('Tuesday', '08:00', 'TTh')]
+    assert not scheduler.unscheduled_classes
+
+
+def test_incremental_export_rewrites_only_changed_entities(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    data = [{'Courses': [course(i, f'S{i}', session('1:00', [i], 10 + i)) for i in range(3)]}]
+    scheduler = AdvancedSchoolScheduler()
+    scheduler.generate_schedule(data)
+    scheduler.export_all_weekly_grids(incremental=True)
+    scheduler.export_all_excel_schedules(incremental=True)
+    capsys.readouterr()
+    scheduler.export_all_weekly_grids(incremental=True)
+    scheduler.export_all_excel_schedules(incremental=True)
+    out = capsys.readouterr().out
+    assert 'Weekly grids: 0 written, 9 unchanged and skipped' in out
+    assert 'Exported 0 Excel schedules (9 unchanged and skipped)' in out
+    # Moving one class touches its section, room and employee only
+    moved = scheduler.schedule[0]
+    moved['start_time'] += 60
+    moved['end_time'] += 60
+    scheduler.export_all_weekly_grids(incremental=True)
+    scheduler.export_all_excel_schedules(incremental=True)
+    out = capsys.readouterr().out
+    assert 'Weekly grids: 3 written, 6 unchanged and skipped' in out
+    assert 'Exported 3 Excel schedules (6 unchanged and skipped)' in out
+
+
+def test_parallel_merges_infeasible_requests_and_splits_logs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = [{'Courses': [
+        course(1, 'A', session('1:00', [1], 7)),
+        course(2, 'B', session('5:00', [2], 8)),   # longer than any block: dropped by the precheck
+    ]}]
+    scheduler = AdvancedSchoolScheduler()
+    scheduler.infeasible_requests = [{'ClassID': 'stale'}]
+    scheduler.generate_schedule_parallel(data, engine='backtracking', max_workers=1)
+    assert [entry['ClassID'] for entry in scheduler.infeasible_requests] == [2]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['logs_component1.txt', 'logs_component2.txt']
+
+
+def test_incremental_export_removes_entities_gone_from_the_schedule(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = [{'Courses': [course(i, f'S{i}', session('1:00', [i], 10 + i)) for i in range(2)]}]
+    scheduler = AdvancedSchoolScheduler()
+    scheduler.generate_schedule(data)
+    scheduler.export_all_weekly_grids(incremental=True)
+    scheduler.export_all_excel_schedules(incremental=True)
+    scheduler.generate_schedule([{'Courses': data[0]['Courses'][:1]}])
+    scheduler.export_all_weekly_grids(incremental=True)
+    scheduler.export_all_excel_schedules(incremental=True)
+    gone = ['section_S1', 'room_1', 'employee_11']
+    weekly = json.loads((tmp_path / '.weekly_manifest.json').read_text())
+    excel = json.loads((tmp_path / 'excel_schedules' / '.export_manifest.json').read_text())
+    assert sorted(weekly) == ['employee_10_weekly.csv', 'room_0_weekly.csv', 'section_S0_weekly.csv']
+    assert sorted(excel) == ['employee_10_schedule.xlsx', 'room_0_schedule.xlsx', 'section_S0_schedule.xlsx']
+    assert not [name for name in gone if (tmp_path / f'{name}_weekly.csv').exists()
+                or (tmp_path / 'excel_schedules' / f'{name}_schedule.xlsx').exists()]
@@ -0,0 +1,20 @@
+import hashlib
+import json
+import zipfile
+
+from export_bundle import ExportBundle
+
+
+def test_manifest_lists_entries_rows_and_hashes(tmp_path):
+    filename = tmp_path / 'bundle.zip'
+    with ExportBundle(filename) as bundle:
+        bundle.add_csv('section_2A_weekly.csv', [['Time', 'Day', 'Classes'], ['08:00', 'Monday', 'Math']],
+                       'section', '2A', entries=1)
+        bundle.add('excel_schedules/room_1_schedule.xlsx', b'workbook', 'room', 1, entries=3)
+    with zipfile.ZipFile(filename) as archive:
+        manifest = json.loads(archive.read('manifest.json'))['files']
+        assert archive.read('excel_schedules/room_1_schedule.xlsx') == b'workbook'
+    csv_entry, xlsx_entry = manifest
+    assert (csv_entry['entries'], csv_entry['rows']) == (1, 1)
+    assert xlsx_entry['entries'] == 3 and 'rows' not in xlsx_entry
+    assert xlsx_entry['sha256'] == hashlib.sha256(b'workbook').hexdigest()
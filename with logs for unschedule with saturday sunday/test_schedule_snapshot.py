@@ -0,0 +1,38 @@
+from advanced_scheduler import AdvancedSchoolScheduler
+from schedule_snapshot import ScheduleSnapshot, is_snapshot, write_snapshot
+
+
+def placed(class_id, section, day, start_time, duration, roomid, employee_id, **extra):
+    return dict(ClassID=class_id, coursename=f'Course {class_id}', section=section, day=day,
+                start_time=start_time, end_time=start_time + duration, duration=duration, roomid=roomid,
+                employee_id=employee_id, start_time_str=f"{start_time // 60:02d}:{start_time % 60:02d}",
+                end_time_str=f"{(start_time + duration) // 60:02d}:{(start_time + duration) % 60:02d}", **extra)
+
+
+SCHEDULE = [
+    placed(1, '2A', 'Monday', 480, 90, [303], 77),
+    placed(2, '2A', 'Tuesday', 780, 75, [], 78, room_mode='any', room_options=[303, 304], pinned=True),
+    placed('GE-1', '2B', 'Monday', 480, 60, [305], 77, sections=['2B', '2C'], type='overload'),
+]
+
+
+def test_snapshot_round_trip(tmp_path):
+    filename = tmp_path / 'schedule.snap'
+    write_snapshot(filename, SCHEDULE)
+    assert is_snapshot(filename)
+    with ScheduleSnapshot(filename) as snap:
+        assert len(snap) == 3
+        assert snap.columns['start_time'].tolist() == [480, 780, 480]
+        classes = snap.classes()
+    assert classes == SCHEDULE
+
+
+def test_load_schedule_from_snapshot_rebuilds_indexes(tmp_path):
+    filename = tmp_path / 'schedule.snap'
+    write_snapshot(filename, SCHEDULE)
+    scheduler = AdvancedSchoolScheduler()
+    scheduler.load_schedule(str(filename))
+    assert scheduler.schedule == SCHEDULE
+    assert [c['ClassID'] for c in scheduler.sections['2C']] == ['GE-1']
+    assert len(scheduler.employees[77]) == 2
+    assert not scheduler._is_free('room', 303, 'Monday', 480, 30)
@@ -0,0 +1,45 @@
+from scheduler import SchoolScheduler
+from time_grid import StartTable, compute_slot_quantum, parse_patterns, pattern_label, slot_range
+
+
+def test_slot_quantum_is_gcd_of_durations_and_boundaries():
+    assert compute_slot_quantum([60, 120]) == 60
+    assert compute_slot_quantum([60, 90, 120]) == 30
+    assert compute_slot_quantum([75, 60]) == 15
+    assert compute_slot_quantum([], ()) == 30
+
+
+def test_slot_range_rounds_partial_slots_up():
+    assert slot_range(480, 75, 15) == (32, 37)
+    assert slot_range(485, 10, 15) == (32, 33)
+
+
+def test_scheduler_places_quarter_hour_sessions_back_to_back():
+    data = [{'Courses': [{'courseid': 1, 'section': 'A',
+                          'classschedule': [{'duration': '1:15', 'roomtype': 1, 'employeeid': 1}] * 3}]}]
+    scheduler = SchoolScheduler()
+    scheduler.generate_schedule(data)
+    assert scheduler.slot_quantum == 15
+    assert [c['start_time_str'] for c in scheduler.schedule] == ['08:00', '09:15', '10:30']
+
+
+def test_start_table_keeps_sessions_inside_the_windows():
+    table = StartTable(60)
+    # 8:00-12:00 and 13:00-17:00: a 2-hour session never spans the lunch break
+    assert table.starts(120) == (480, 540, 600, 780, 840, 900)
+    # 17:30-20:30 overload window
+    assert StartTable(30).starts(120, 'overload') == (1050, 1080, 1110)
+    assert StartTable(30).starts(240, 'overload') == ()
+
+
+def test_start_table_day_windows_override_one_day():
+    table = StartTable(60, {'Saturday': {'regular': ((480, 600),)}})
+    assert table.starts(60, day='Saturday') == (480, 540)
+    assert table.starts(60, day='Monday') == table.starts(60)
+
+
+def test_meeting_pattern_codes():
+    assert parse_patterns('MWF') == [('Monday', 'Wednesday', 'Friday')]
+    assert parse_patterns(['MWF', 'TTh']) == [('Monday', 'Wednesday', 'Friday'), ('Tuesday', 'Thursday')]
+    assert parse_patterns(['Monday', 'Wednesday']) == [('Monday', 'Wednesday')]
+    assert pattern_label(('Tuesday', 'Thursday')) == 'TTh'
@@ -0,0 +1,194 @@
+"""
+Shared time-grid helpers for the schedulers and exporters.
+All times are minutes since midnight.
+"""
+
+from math import gcd
+
+SCHOOL_START = 8 * 60      # 8:00 AM
+SCHOOL_END = 17 * 60       # 5:00 PM
+BREAK_START = 12 * 60      # 12:00 PM
+BREAK_END = 13 * 60        # 1:00 PM
+OVERLOAD_START = 17 * 60 + 30  # 5:30 PM
+OVERLOAD_END = 20 * 60 + 30    # 8:30 PM
+
+# Boundaries of the regular school day (with lunch break)
+REGULAR_BOUNDARIES = (SCHOOL_START, BREAK_START, BREAK_END, SCHOOL_END)
+# Regular day plus the evening window used for 'overload' sessions
+ALL_BOUNDARIES = REGULAR_BOUNDARIES + (OVERLOAD_START, OVERLOAD_END)
+
+DEFAULT_QUANTUM = 30
+
+# Teaching windows per schedule 'Type'; the regular day is split by the lunch break
+TYPE_WINDOWS = {
+    'regular': ((SCHOOL_START, BREAK_START), (BREAK_END, SCHOOL_END)),
+    'overload': ((OVERLOAD_START, OVERLOAD_END),),
+}
+
+
+def schedule_type(sched) -> str:
+    """Normalized 'Type' of a classschedule entry ('regular' when missing or unknown)."""
+    sched_type = str(sched.get('Type', 'regular')).lower()
+    return sched_type if sched_type in TYPE_WINDOWS else 'regular'
+
+
+def window_boundaries(types=('regular',), day_windows=None) -> tuple:
+    """Every window edge used by the given types, including per-day overrides from day_windows."""
+    edges = set()
+    for sched_type in types:
+        for start, end in TYPE_WINDOWS.get(sched_type, TYPE_WINDOWS['regular']):
+            edges.update((start, end))
+    for calendar in (day_windows or {}).values():
+        for windows in calendar.values():
+            for start, end in windows:
+                edges.update((start, end))
+    return tuple(sorted(edges))
+
+
+def compute_slot_quantum(durations, boundaries=REGULAR_BOUNDARIES, default=DEFAULT_QUANTUM) -> int:
+    """
+    Slot size for a run: the GCD of every duration and window boundary (and any fixed
+    start times passed in durations). Every start and end then falls on a slot edge,
+    so coarse data gets few candidate starts and odd durations like 1:15 still fit.
+    """
+    quantum = 0
+    for value in list(durations) + list(boundaries):
+        quantum = gcd(quantum, int(value))
+    return quantum or default
+
+
+def slot_range(start_time, duration, quantum):
+    """(first, last + 1) slot indices covered by [start_time, start_time + duration)."""
+    return start_time // quantum, -(-(start_time + duration) // quantum)
+
+
+def format_ampm(minutes) -> str:
+    """Convert minutes to a 12-hour label (e.g., '1:30 PM')"""
+    hours, mins = divmod(minutes, 60)
+    suffix = 'AM' if hours < 12 else 'PM'
+    hours = hours % 12 or 12
+    return f"{hours}:{mins:02d} {suffix}"
+
+
+def slot_label(start_time, quantum) -> str:
+    """Row label for the slot starting at start_time (e.g., '8:00 AM - 8:30 AM')"""
+    return f"{format_ampm(start_time)} - {format_ampm(start_time + quantum)}"
+
+
+# Registrar day codes for weekly meeting patterns ('MWF', 'TTh', ...)
+PATTERN_CODES = {'M': 'Monday', 'T': 'Tuesday', 'W': 'Wednesday', 'Th': 'Thursday',
+                 'F': 'Friday', 'Sa': 'Saturday', 'S': 'Saturday', 'Su': 'Sunday'}
+DAY_CODES = {'Monday': 'M', 'Tuesday': 'T', 'Wednesday': 'W', 'Thursday': 'Th',
+             'Friday': 'F', 'Saturday': 'Sa', 'Sunday': 'Su'}
+
+
+def parse_pattern(pattern) -> tuple:
+    """Days of one meeting pattern, given as a code like 'MWF' / 'TTh' or a list of day names."""
+    if isinstance(pattern, (list, tuple)):
+        return tuple(pattern)
+    days = []
+    i = 0
+    while i < len(pattern):
+        code = pattern[i:i + 2] if pattern[i:i + 2] in PATTERN_CODES else pattern[i]
+        if code not in PATTERN_CODES:
+            raise ValueError(f"Unknown day code '{code}' in meeting pattern '{pattern}'")
+        days.append(PATTERN_CODES[code])
+        i += len(code)
+    return tuple(days)
+
+
+def parse_patterns(value) -> list:
+    """
+    Alternative meeting patterns of a classschedule 'pattern' value: 'MWF', ['MWF', 'TTh'],
+    ['Monday', 'Wednesday'] (one pattern of day names) or [['Monday', 'Wednesday'], ...].
+    """
+    if isinstance(value, str):
+        return [parse_pattern(value)]
+    if value and all(isinstance(v, str) and v in DAY_CODES for v in value):
+        return [tuple(value)]
+    return [parse_pattern(v) for v in value]
+
+
+def pattern_label(days) -> str:
+    """Registrar code of a pattern (e.g. ('Tuesday', 'Thursday') -> 'TTh')."""
+    return ''.join(DAY_CODES.get(day, day) for day in days)
+
+
+def parse_clock(value) -> int:
+    """Minutes since midnight of a fixed start: '13:30', '1:30 PM' or a number of minutes."""
+    if isinstance(value, int):
+        return value
+    text = value.strip().upper()
+    suffix = text[-2:] if text[-2:] in ('AM', 'PM') else ''
+    hours, minutes = map(int, text[:len(text) - len(suffix)].strip().split(':'))
+    if suffix:
+        hours = hours % 12 + (12 if suffix == 'PM' else 0)
+    return hours * 60 + minutes
+
+
+def pinned_slot(sched):
+    """
+    (day, start, room) of a pinned classschedule entry, i.e. one with a fixed 'start', else None.
+    The entry's 'day' must name a single day; room is its 'room' key, None when not fixed.
+    """
+    if 'start' not in sched:
+        return None
+    days = sched.get('day', ['Monday'])
+    if isinstance(days, str):
+        days = [days]
+    if len(days) != 1:
+        raise ValueError(f"Pinned session at {sched['start']} needs exactly one day, got {days}")
+    return days[0], parse_clock(sched['start']), sched.get('room')
+
+
+def combined_sections(section, sched) -> list:
+    """
+    Sections attending one classschedule entry: the course's own section, then any other
+    sections listed under 'sections' (a combined lecture taught once to all of them).
+    """
+    return list(dict.fromkeys([section] + list(sched.get('sections', []))))
+
+
+class StartTable:
+    """
+    Candidate start times keyed by (duration, Type, day calendar), already filtered to the
+    teaching windows of the type, so the lunch break and school hours never need checking
+    again. Entries are built on first use and cached for one slot quantum.
+    day_windows optionally overrides the windows of a day: {day: {Type: ((start, end), ...)}}.
+    """
+
+    def __init__(self, quantum=DEFAULT_QUANTUM, day_windows=None):
+        self.quantum = quantum
+        self.day_windows = day_windows or {}
+        self._starts = {}
+
+    def windows(self, sched_type='regular', day=None) -> tuple:
+        """Teaching windows of a Type on a day."""
+        calendar = self.day_windows.get(day, {})
+        if sched_type in calendar:
+            return tuple(calendar[sched_type])
+        return TYPE_WINDOWS.get(sched_type, TYPE_WINDOWS['regular'])
+
+    def starts(self, duration, sched_type='regular', day=None) -> tuple:
+        """Sorted start times on the slot grid where a session fits entirely inside one window."""
+        windows = self.windows(sched_type, day)
+        key = (duration, sched_type, windows)
+        starts = self._starts.get(key)
+        if starts is None:
+            q = self.quantum
+            starts = self._starts[key] = tuple(
+                t for start, end in windows for t in range(-(-start // q) * q, end - duration + 1, q)
+            )
+        return starts
+
+    def aligned_starts(self, duration, step, sched_type='regular', day=None) -> tuple:
+        """Like starts, but stepping by step minutes from each window start (block-aligned placement)."""
+        windows = self.windows(sched_type, day)
+        key = (duration, sched_type, windows, step)
+        starts = self._starts.get(key)
+        if starts is None:
+            starts = self._starts[key] = tuple(
+                t for start, end in windows for t in range(start, end - duration + 1, step)
+            )
+        return starts
+